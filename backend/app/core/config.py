@@ -26,6 +26,97 @@ class Settings(BaseSettings):
     GROQ_API_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
     
+    # --- PERFORMANCE ---
+    # bcrypt cost factor (stored hashes at another cost are rehashed on login)
+    BCRYPT_ROUNDS: int = 12
+    # Dedicated password hashing threads and how many requests may wait for one
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_DEPTH: int = 32
+    # Max compiled templates kept in memory (LRU)
+    TEMPLATE_CACHE_SIZE: int = 64
+    # Seconds before the in-memory template repository reloads from the DB
+    TEMPLATE_REPOSITORY_TTL_SECONDS: int = 300
+    # Rendered PDF cache: "memory", "disk", "sqlite" or "none"
+    PDF_CACHE_BACKEND: str = "memory"
+    PDF_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    PDF_CACHE_DIR: str = "./.cache/pdf"
+    PDF_CACHE_SQLITE_PATH: str = "./.cache/render_cache.db"
+    # WeasyPrint render pool (0 processes = render inline)
+    PDF_RENDER_PROCESSES: int = 2
+    PDF_RENDER_QUEUE_DEPTH: int = 8
+    PDF_RENDER_TIMEOUT_SECONDS: float = 60.0
+    # Resume uploads: hard size cap, bytes kept in memory before spooling to disk
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_SPOOL_BYTES: int = 1024 * 1024
+    # Resume text extraction: stop reading once the character budget is met;
+    # PDFs of at least PARSE_PARALLEL_MIN_PAGES are split across a process
+    # pool (0 processes = parse in a thread)
+    PARSE_MAX_CHARS: int = 12000
+    PARSE_PROCESSES: int = 2
+    PARSE_QUEUE_DEPTH: int = 8
+    PARSE_PARALLEL_MIN_PAGES: int = 8
+    PARSE_PAGES_PER_TASK: int = 4
+    PARSE_TIMEOUT_SECONDS: float = 30.0
+    # Extracted resume text, keyed by file digest: "memory", "sqlite" or "none"
+    TEXT_CACHE_BACKEND: str = "memory"
+    TEXT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    TEXT_CACHE_TTL_SECONDS: int = 24 * 3600
+    TEXT_CACHE_SQLITE_PATH: str = "./.cache/text_cache.db"
+    # Bulk CV import (/cvs/import): request cap, files per import, files in
+    # flight at once, CVs per insert transaction
+    IMPORT_MAX_BYTES: int = 200 * 1024 * 1024
+    IMPORT_MAX_FILES: int = 500
+    IMPORT_CONCURRENCY: int = 4
+    IMPORT_BATCH_SIZE: int = 50
+    # Background export jobs: worker threads, result lifetime, unfinished
+    # jobs per user, and how long a job may stay "running" before it is
+    # re-queued (its process died mid-render)
+    EXPORT_JOB_WORKERS: int = 2
+    EXPORT_JOB_TTL_SECONDS: int = 3600
+    EXPORT_JOB_MAX_PER_USER: int = 5
+    EXPORT_JOB_STALE_SECONDS: int = 600
+    # Shared LLM HTTP clients (one keep-alive pool per provider)
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_KEEPALIVE_SECONDS: float = 30.0
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    # AI backend: "auto" (LLM, local generator when no key / circuits open),
+    # "llm" (never fall back) or "local" (rule-based, offline)
+    AI_BACKEND: str = "auto"
+    # AI admission: global in-flight cap, wait queue, per-user token bucket
+    AI_MAX_IN_FLIGHT: int = 8
+    AI_QUEUE_DEPTH: int = 32
+    AI_QUEUE_TIMEOUT_SECONDS: float = 20.0
+    AI_USER_RATE_PER_MINUTE: float = 10.0
+    AI_USER_BURST: int = 5
+    # Approximate tokens of resume text in the upload prompt (after compaction)
+    AI_UPLOAD_PROMPT_TOKENS: int = 1000
+    # Server-side chat sessions (ring buffer of turns, LRU across sessions)
+    CHAT_SESSION_MAX_SESSIONS: int = 5000
+    CHAT_SESSION_MAX_TURNS: int = 40
+    CHAT_SESSION_TTL_SECONDS: int = 2 * 3600
+    # Approximate tokens of history sent upstream per turn
+    CHAT_HISTORY_TOKEN_BUDGET: int = 1500
+    # Background CV generations started by /ai/chat (picked up by id)
+    AI_GENERATION_MAX_JOBS: int = 1000
+    AI_GENERATION_TTL_SECONDS: int = 600
+    # Cached AI CV generations: "memory", "sqlite" or "none"
+    AI_CACHE_BACKEND: str = "memory"
+    AI_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    AI_CACHE_TTL_SECONDS: int = 24 * 3600
+    AI_CACHE_SQLITE_PATH: str = "./.cache/ai_cache.db"
+    # Provider router: hedge to the secondary after the primary's p95
+    # (default delay until enough samples), circuit breaker on errors
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 3.0
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    LLM_LATENCY_WINDOW: int = 200
+    LLM_BREAKER_FAILURES: int = 5
+    LLM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    # Override to point a provider at a proxy or a local stand-in server
+    GROQ_BASE_URL: Optional[str] = None
+    OPENAI_BASE_URL: Optional[str] = None
+
     # --- Legacy/Optional ---
     HUGGING_FACE_TOKEN: Optional[str] = None
 
@@ -0,0 +1,74 @@
+import re
+from typing import Any, Optional
+
+# ========================================
+# COLOUR / FONT / CSS SANITIZER
+# ========================================
+# Style inputs are validated once (CVData schema, normalize_cv_dict, render
+# context) and come out already safe to drop into '#{{accent_color}}' or
+# 'font-family: {{font_family}}', so rendered CSS needs no regex cleanup.
+
+DEFAULT_ACCENT = "2c3e50"
+DEFAULT_TEXT = "333333"
+DEFAULT_FONT = "sans-serif"
+
+_HEX_RE = re.compile(r"[0-9a-fA-F]{3}|[0-9a-fA-F]{6}")
+# Characters that could end a declaration / rule or break out of <style>
+_FONT_UNSAFE_RE = re.compile(r"""[;"'#{}<>\\]+""")
+
+# Template-source fixups, applied once when a template is compiled
+CSS_MULTI_HASH_RE = re.compile(r"##+")
+CSS_HASH_GAP_RE = re.compile(r"#\s+(\{\{|[0-9a-fA-F])")
+CSS_EMPTY_HASH_DECL_RE = re.compile(r":(\s*)#\s*;")
+CSS_EMPTY_HASH_END_RE = re.compile(r":(\s*)#\s*\}")
+CSS_HASH_VAR_RE = re.compile(r"#\{\{\s*([\w.]+)\s*\}\}")
+
+
+def clean_hex(color_value: Any, default_hex: str = DEFAULT_TEXT) -> str:
+    """
+    Returns a clean 6-character HEX string WITHOUT the # prefix.
+    This is for data that will be rendered into templates that have #{{color}}.
+
+    Examples:
+        "#2c3e50" -> "2c3e50"
+        "#abc"    -> "aabbcc"
+        "invalid" -> default_hex
+    """
+    if not color_value:
+        return default_hex
+
+    clean = str(color_value).strip().lstrip("#")
+    if _HEX_RE.fullmatch(clean):
+        if len(clean) == 3:
+            clean = "".join(c * 2 for c in clean)
+        return clean
+    return default_hex
+
+
+def css_color(color_value: Any, default_hex: str = DEFAULT_TEXT) -> str:
+    """Same as clean_hex but with the '#' prefix, as stored on CVs and sent to the frontend."""
+    return "#" + clean_hex(color_value, default_hex)
+
+
+def clean_font(font_value: Any, default: str = DEFAULT_FONT) -> str:
+    """Strips characters that could escape a font-family declaration."""
+    if not font_value:
+        return default
+    clean = _FONT_UNSAFE_RE.sub("", str(font_value)).strip()
+    return clean or default
+
+
+def optional_css_color(color_value: Any) -> Optional[str]:
+    """Schema helper: valid colours become '#rrggbb', anything else None (renderer default)."""
+    if not color_value:
+        return None
+    clean = str(color_value).strip().lstrip("#")
+    if not _HEX_RE.fullmatch(clean):
+        return None
+    return css_color(clean)
+
+
+def optional_font(font_value: Any) -> Optional[str]:
+    if font_value is None or font_value == "":
+        return None
+    return clean_font(font_value)
@@ -21,10 +21,11 @@ except ImportError:
 
 # Setup hashing engine
 # Use bcrypt with explicit backend configuration
+# Cost factor comes from config (BCRYPT_ROUNDS) so each environment can tune it
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12,
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
 )
 
 
@@ -89,6 +90,17 @@ def get_password_hash(password: str) -> str:
         raise RuntimeError(f"Password hashing failed: {str(e)}") from e
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    True when a stored hash was made with a different cost factor (or scheme)
+    than the current config, so it should be replaced on the next good login.
+    """
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except (ValueError, TypeError):
+        return False
+
+
 def create_jwt_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT token with the given data.
@@ -0,0 +1,11 @@
+# ========================================
+# TOKEN ESTIMATES
+# ========================================
+# Rough token estimate (~4 chars per token for English text), shared by
+# everything that budgets prompt size; only used for budgeting, never billing.
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // CHARS_PER_TOKEN + 1
@@ -1,3 +1,5 @@
+from typing import List
+
 from sqlalchemy.orm import Session
 from ..models import cv as models
 from ..schemas import cv as schemas
@@ -35,6 +37,18 @@ def create_cv(db: Session, cv_schema: schemas.CVCreate, user_id: int):
     db.refresh(db_obj)
     return db_obj
 
+def create_cvs_bulk(db: Session, cv_schemas: List[schemas.CVCreate], user_id: int) -> List[int]:
+    """Inserts several CVs in one transaction; returns their ids in order."""
+    db_objs = [
+        models.CV(title=cv.title, template_id=cv.template_id, data=cv.data.model_dump(), user_id=user_id)
+        for cv in cv_schemas
+    ]
+    db.add_all(db_objs)
+    db.flush()
+    ids = [obj.id for obj in db_objs]
+    db.commit()
+    return ids
+
 def update_cv(db: Session, cv_id: int, cv_update: schemas.CVUpdate, user_id: int):
     db_cv = get_cv(db, cv_id, user_id)
     if not db_cv:
@@ -59,4 +73,10 @@ def delete_cv(db: Session, cv_id: int, user_id: int):
         db.delete(db_cv)
         db.commit()
         return True
-    return False
\ No newline at end of file
+    return False
+
+def get_user_cvs_by_ids(db: Session, user_id: int, cv_ids):
+    # Single IN query; ids the user does not own are silently skipped
+    if not cv_ids:
+        return []
+    return db.query(models.CV).filter(models.CV.user_id == user_id, models.CV.id.in_(list(cv_ids))).all()
@@ -0,0 +1,73 @@
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from ..models.export_job import ExportJob
+
+def create_job(db: Session, user_id: int, cv_id: int, fmt: str) -> ExportJob:
+    db_obj = ExportJob(id=uuid.uuid4().hex, user_id=user_id, cv_id=cv_id, format=fmt, status="queued")
+    db.add(db_obj)
+    db.commit()
+    db.refresh(db_obj)
+    return db_obj
+
+def get_job(db: Session, job_id: str, user_id: int):
+    return db.query(ExportJob).filter(ExportJob.id == job_id, ExportJob.user_id == user_id).first()
+
+def get_job_by_id(db: Session, job_id: str):
+    return db.query(ExportJob).filter(ExportJob.id == job_id).first()
+
+def get_queued_job_ids(db: Session):
+    rows = db.query(ExportJob.id).filter(ExportJob.status == "queued").order_by(ExportJob.created_at).all()
+    return [r.id for r in rows]
+
+def count_unfinished_jobs(db: Session, user_id: int) -> int:
+    return db.query(ExportJob).filter(
+        ExportJob.user_id == user_id,
+        ExportJob.status.in_(["queued", "running"]),
+    ).count()
+
+def claim_job(db: Session, job_id: str) -> bool:
+    """queued -> running in one UPDATE; False when another worker (or process) got there first."""
+    count = db.query(ExportJob).filter(ExportJob.id == job_id, ExportJob.status == "queued").update(
+        {ExportJob.status: "running", ExportJob.started_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+    db.commit()
+    return count == 1
+
+def requeue_stale_jobs(db: Session, max_running_seconds: int):
+    """Puts jobs stuck in "running" for longer than max_running_seconds back to queued; returns their ids."""
+    cutoff = datetime.utcnow() - timedelta(seconds=max_running_seconds)
+    stale = db.query(ExportJob).filter(ExportJob.status == "running", ExportJob.started_at < cutoff)
+    ids = [r.id for r in stale.with_entities(ExportJob.id).all()]
+    if ids:
+        db.query(ExportJob).filter(ExportJob.id.in_(ids), ExportJob.status == "running").update(
+            {ExportJob.status: "queued", ExportJob.started_at: None},
+            synchronize_session=False,
+        )
+        db.commit()
+    return ids
+
+def mark_done(db: Session, job: ExportJob, content: bytes, media_type: str, filename: str):
+    job.status = "done"
+    job.result = content
+    job.media_type = media_type
+    job.filename = filename
+    job.error = None
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+def mark_failed(db: Session, job: ExportJob, error: str):
+    job.status = "failed"
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+def delete_expired_jobs(db: Session, max_age_seconds: int) -> int:
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    count = db.query(ExportJob).filter(
+        ExportJob.status.in_(["done", "failed"]),
+        ExportJob.finished_at < cutoff,
+    ).delete(synchronize_session=False)
+    db.commit()
+    return count
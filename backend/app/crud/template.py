@@ -8,6 +8,16 @@ def get_template(db: Session, template_id: str):
 def get_all_templates(db: Session):
     return db.query(models.Template).all()
 
+def get_template_summaries(db: Session):
+    # Column projection only: html_content / css_styles never leave the DB
+    return db.query(
+        models.Template.id,
+        models.Template.name,
+        models.Template.category,
+        models.Template.is_premium,
+        models.Template.updated_at,
+    ).order_by(models.Template.id).all()
+
 def create_template(db: Session, template: schemas.TemplateCreate):
     # FIX IS HERE: Convert Pydantic model to Dict before saving
     # We try model_dump() first (Pydantic V2), then dict() (V1 fallback)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from sqlalchemy.orm import Session
 from ..models.user import User  # Direct Import (Fixes AttributeError)
 from ..schemas import user as schemas
@@ -12,12 +14,14 @@ def get_user_by_email(db: Session, email: str):
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(User).offset(skip).limit(limit).all()
 
-def create_user(db: Session, user: schemas.UserCreate):
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
     # Determine role/plan
     # Default is basic, if admin email logic matches, handling is done elsewhere usually
     # or we can hardcode logic here if needed.
     
-    hashed_password = get_password_hash(user.password)
+    # Callers on the event loop hash in the password hasher pool and pass it in
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email, 
         password_hash=hashed_password,
@@ -30,6 +34,10 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.refresh(db_user)
     return db_user
 
+def set_password_hash(db: Session, user_id: int, hashed_password: str):
+    db.query(User).filter(User.id == user_id).update({User.password_hash: hashed_password})
+    db.commit()
+
 def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
     db_user = get_user(db, user_id)
     if not db_user:
@@ -10,6 +10,12 @@ import logging
 from .database import engine, Base, SessionLocal
 # We import init_db specifically to sync templates
 from .crud import init_db 
+from .services.template_repository import template_repository
+from .services.render_pool import render_pool
+from .services.parse_pool import parse_pool
+from .services.password_hasher import password_hasher
+from .services.export_jobs import export_jobs
+from .services.llm_client import llm_clients
 # Import the API router logic
 from . import main_api 
 
@@ -32,15 +38,36 @@ async def lifespan(app: FastAPI):
         # This inserts the Hardcoded Templates into Postgres
         init_db.sync_templates(db)
         logger.info("✅ Templates Synced.")
+
+        # 4. WARM TEMPLATE REPOSITORY (keeps previews off the DB)
+        count = template_repository.load(db)
+        logger.info(f"✅ Template Repository Loaded ({count} templates).")
     except Exception as e:
         logger.error(f"❌ Template Sync Failed: {e}")
     finally:
-        # 4. Close DB Session
+        # 5. Close DB Session
         db.close()
         
+    # 6. Start PDF Render Pool (and the resume parse pool)
+    render_pool.start()
+    parse_pool.start()
+    password_hasher.start()
+
+    # 7. Start Export Job Workers (re-queues unfinished jobs)
+    export_jobs.start()
+
+    # 8. Open Shared LLM Clients (keep-alive pools per provider)
+    providers = llm_clients.start()
+    logger.info(f"✅ LLM Clients Ready ({', '.join(providers) or 'no API keys'}).")
+
     logger.info("✅ Startup Complete.")
     yield
     # --- SHUTDOWN LOGIC ---
+    await llm_clients.aclose()
+    export_jobs.stop()
+    render_pool.shutdown()
+    parse_pool.shutdown()
+    password_hasher.shutdown()
     logger.info("🛑 Server Shutting Down.")
 
 app = FastAPI(title="AI CV Builder", lifespan=lifespan)
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Response
-from typing import List, Dict, Any, Union, cast
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, Response, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Dict, Any, Callable, Optional, Union, cast
 from sqlalchemy.orm import Session
-import jinja2
+import asyncio
+import hashlib
+import json
 import logging
 import re
+import time
 
 # Check for WeasyPrint
 try:
@@ -15,11 +20,26 @@ except ImportError:
 # Local Imports
 from .database import get_db
 from .schemas import user as user_schemas, cv as cv_schemas, ai as ai_schemas, template as template_schemas
-from .crud import user as user_crud, cv as cv_crud, template as template_crud
+from .schemas import export_job as export_job_schemas
+from .crud import user as user_crud, cv as cv_crud, template as template_crud, export_job as export_job_crud
 from .core import security, config
-from .services import ai_service, parser_service, file_service
+from .services import ai_service, parser_service, cv_import
+from .services.template_cache import compiled_templates
+from .services.template_repository import template_repository
+from .services import pdf_cache, export_service, ai_cache, text_cache
+from .services.renderer import normalize_cv_dict, render_template_internal
+from .services.render_pool import render_pool, RenderPoolFull, RenderTimeout, RenderWorkerCrashed
+from .services.parse_pool import parse_pool, extract_text_async
+from .services.export_jobs import export_jobs
+from .services.llm_client import llm_clients
+from .services.llm_router import llm_router
+from .services.ai_admission import ai_admission, AIRateLimited
+from .services.chat_sessions import chat_sessions
+from .services.ai_generations import ai_generations
+from .services.password_hasher import password_hasher, PasswordHasherBusy
 from .models.package import Package
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.formparsers import MultiPartParser, MultiPartException
 
 router = APIRouter()
 bearer = HTTPBearer()
@@ -28,171 +48,50 @@ logger = logging.getLogger("cv_api")
 def get_current_user(creds: HTTPAuthorizationCredentials = Depends(bearer)):
     return security.verify_jwt_token(creds.credentials)
 
-# ---------------------------------------------------------
-# DATA NORMALIZER (Fixes Validation Errors)
-# ---------------------------------------------------------
-def normalize_cv_dict(data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Converts incoming React JSON (camelCase) to Schema-Compliant (snake_case)
-    dictionary that matches the 'CVData' Pydantic model structure.
-    NOW WITH CUSTOM FIELDS SUPPORT!
-    """
-    normalized: Dict[str, Any] = {}
-
-    # 1. Key Mapping (React -> Schema)
-    key_map = {
-        # Basic Fields
-        "fullName": "full_name",
-        "jobTitle": "job_title",
-        "phone": "phone",
-        "email": "email",
-        "summary": "summary",
-        "experience": "experience",
-        "education": "education",
-        "skills": "skills",
-        
-        # NEW: Custom Sidebar Fields
-        "location": "location",
-        "hobbies": "hobbies",
-        "languages": "languages",
-        "certifications": "certifications",
-        
-        # NEW: Social Links
-        "linkedin": "linkedin",
-        "github": "github",
-        "portfolio": "portfolio"
-    }
-
-    # Transfer existing keys
-    for k, v in data.items():
-        if k in key_map:
-            normalized[key_map[k]] = v
-        elif k in key_map.values():
-            normalized[k] = v
-        elif k in ["accentColor", "textColor", "fontFamily"]:
-            normalized[k] = v
-
-    # 2. Strict Defaults for Required Fields
-    required_str_fields = ["full_name", "email", "phone", "job_title", "summary", "experience", "education"]
-    for field in required_str_fields:
-        if field not in normalized or normalized[field] is None:
-            normalized[field] = ""
-    
-    # 3. Handle Skills List
-    skills_raw = normalized.get("skills")
-    if isinstance(skills_raw, str):
-        if skills_raw.strip():
-            normalized["skills"] = [s.strip() for s in skills_raw.split(',') if s.strip()]
-        else:
-            normalized["skills"] = []
-    elif not isinstance(skills_raw, list):
-        normalized["skills"] = []
-
-    # 4. NEW: Handle Custom Lists (Hobbies, Languages, Certifications)
-    for list_field in ["hobbies", "languages", "certifications"]:
-        field_raw = normalized.get(list_field)
-        if isinstance(field_raw, str):
-            if field_raw.strip():
-                normalized[list_field] = [s.strip() for s in field_raw.split(',') if s.strip()]
-            else:
-                normalized[list_field] = []
-        elif not isinstance(field_raw, list):
-            normalized[list_field] = []
-
-    # 5. NEW: Handle Optional String Fields
-    for str_field in ["location", "linkedin", "github", "portfolio"]:
-        if str_field not in normalized or normalized[str_field] is None:
-            normalized[str_field] = ""
-
-    # 6. Generate Initials
-    name = normalized.get("full_name", "")
-    normalized["full_name_initials"] = name[:2].upper() if name else "??"
-
-    # 7. Fix Accent Colors
-    if "accentColor" in normalized: normalized["accent_color"] = normalized["accentColor"]
-    if "textColor" in normalized: normalized["text_color"] = normalized["textColor"]
-    if "fontFamily" in normalized: normalized["font_family"] = normalized["fontFamily"]
-    
-    normalized.setdefault("accent_color", "#2c3e50")
-    normalized.setdefault("text_color", "#333333")
-    
-    return normalized
-
-def render_template_internal(html_content: str, css_content: str, data: Dict[str, Any]) -> str:
-    """
-    Safe Internal Rendering of HTML using Jinja2.
-    Templates have #{{accent_color}} syntax, so we provide colors WITHOUT #.
-    """
-    mapped_data = normalize_cv_dict(data)
-    
-    def strip_hash(color):
-        if not color:
-            return "333333"
-        clean = str(color).replace("#", "")
-        if re.fullmatch(r"[0-9a-fA-F]{3}|[0-9a-fA-F]{6}", clean):
-            if len(clean) == 3:
-                clean = ''.join([c*2 for c in clean])
-            return clean
-        return "333333"
-    
-    if "accent_color" in mapped_data:
-        mapped_data["accent_color"] = strip_hash(mapped_data["accent_color"])
-    if "text_color" in mapped_data:
-        mapped_data["text_color"] = strip_hash(mapped_data["text_color"])
-    
-    env = jinja2.Environment(loader=jinja2.BaseLoader())
-    
-    clean_html = html_content.replace("{{{", "{{").replace("}}}", " | safe }}")
-    clean_css = css_content.replace("{{{", "{{").replace("}}}", " | safe }}")
-    
-    try:
-        t_html = env.from_string(clean_html)
-        t_css = env.from_string(clean_css or "")
-        
-        rendered_body = t_html.render(**mapped_data)
-        rendered_css = t_css.render(**mapped_data)
-        
-        # CSS Cleanup
-        rendered_css = re.sub(r'##+', '#', rendered_css)
-        rendered_css = re.sub(r':\s*#\s*;', ': #333333;', rendered_css)
-        rendered_css = re.sub(r':\s*#\s*\}', ': #333333', rendered_css)
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                {rendered_css}
-                body {{ -webkit-print-color-adjust: exact; print-color-adjust: exact; margin: 0; }}
-            </style>
-        </head>
-        <body>
-            {rendered_body}
-        </body>
-        </html>
-        """
-    except Exception as e:
-        logger.error(f"Render Error: {e}")
-        return f"<h1>Error generating preview</h1><pre>{e}</pre>"
-
-
 # ---------------------------------------------------------
 # AUTH ENDPOINTS
 # ---------------------------------------------------------
+def _hasher_busy(e: PasswordHasherBusy) -> HTTPException:
+    return HTTPException(503, "Too many sign-ins right now, please retry", headers={"Retry-After": str(e.retry_after)})
+
+def _lookup_user(db: Session, email: str):
+    # Ends the read transaction before returning so the pooled connection
+    # isn't held while the request waits for bcrypt (a login storm would
+    # otherwise drain the DB pool and stall every other endpoint)
+    db_user = user_crud.get_user_by_email(db, email)
+    if db_user is not None:
+        db.expunge(db_user)
+    db.rollback()
+    return db_user
+
+# bcrypt runs on the password hasher pool and the (short) DB calls in worker
+# threads, so a login storm never holds API threadpool slots while hashing
 @router.post("/auth/register", response_model=user_schemas.Token)
-def register(user: user_schemas.UserCreate, db: Session = Depends(get_db)):
-    if user_crud.get_user_by_email(db, user.email):
+async def register(user: user_schemas.UserCreate, db: Session = Depends(get_db)):
+    if await asyncio.to_thread(_lookup_user, db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    new_user = user_crud.create_user(db, user)
+    try:
+        hashed = await password_hasher.hash(user.password)
+    except PasswordHasherBusy as e:
+        raise _hasher_busy(e)
+    new_user = await asyncio.to_thread(user_crud.create_user, db, user, hashed)
     token = security.create_jwt_token({"user_id": new_user.id, "email": new_user.email})
     return {"access_token": token, "token_type": "bearer"}
 
 @router.post("/auth/login", response_model=user_schemas.Token)
-def login(user: user_schemas.UserLogin, db: Session = Depends(get_db)):
-    db_user = user_crud.get_user_by_email(db, user.email)
-    if not db_user or not security.verify_password(user.password, str(db_user.password_hash)): 
+async def login(user: user_schemas.UserLogin, db: Session = Depends(get_db)):
+    db_user = await asyncio.to_thread(_lookup_user, db, user.email)
+    stored_hash = str(db_user.password_hash) if db_user else ""
+    try:
+        valid = bool(db_user) and await password_hasher.verify(user.password, stored_hash)
+    except PasswordHasherBusy as e:
+        raise _hasher_busy(e)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    # Hashes from an older BCRYPT_ROUNDS are upgraded while we have the password
+    new_hash = await password_hasher.rehash_if_needed(user.password, stored_hash)
+    if new_hash:
+        await asyncio.to_thread(user_crud.set_password_hash, db, db_user.id, new_hash)
     token = security.create_jwt_token({"user_id": db_user.id, "email": db_user.email})
     return {"access_token": token, "token_type": "bearer"}
 
@@ -203,32 +102,323 @@ def profile(user: dict = Depends(get_current_user), db: Session = Depends(get_db
 # ---------------------------------------------------------
 # AI ENDPOINTS
 # ---------------------------------------------------------
+def _generation_request(req_data: dict, user: dict, regenerate: bool = False) -> ai_schemas.AIGenerationRequest:
+    return ai_schemas.AIGenerationRequest(
+        full_name=req_data.get("full_name", "User"),
+        email=user.get("email", ""),
+        desired_job_title=req_data.get("desired_job_title", ""),
+        top_skills=req_data.get("top_skills", []),
+        experience_level=req_data.get("experience_level", ""),
+        personal_strengths=req_data.get("professional_summary", ""),
+        regenerate=regenerate
+    )
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def _ai_busy(e: AIRateLimited) -> HTTPException:
+    return HTTPException(429, f"{e.reason}, please retry", headers={"Retry-After": str(e.retry_after)})
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that always cleans up when it ends: the body generator
+    is closed (running its finally even if the client went away mid-stream)
+    and on_close runs even when the body was never iterated at all.
+    """
+
+    def __init__(self, content: Any, on_close: Callable[[], None], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            try:
+                if aclose is not None:
+                    await aclose()
+            finally:
+                self._on_close()
+
+def _check_chat_session(req: dict, user_key: str) -> None:
+    """
+    409 {"session_reset": true} when the client names a session the server no
+    longer has (expired, LRU-evicted, process restart) and sent no history to
+    rebuild it from. Runs before admission, so the client can resend its
+    recent history without the turn having been answered out of context.
+    """
+    session_id = req.get("session_id")
+    if session_id and not req.get("history") and not chat_sessions.exists(user_key, session_id):
+        raise HTTPException(409, detail={"session_reset": True, "message": "Chat session expired, resend history"})
+
+def _open_chat_session(req: dict, user_key: str):
+    """
+    Resolves the server-side session for a chat turn. With a known
+    session_id the stored history is used and any client history ignored;
+    otherwise a new session is seeded from the client-sent history.
+    Returns (session_id, trimmed history).
+    """
+    sent_history = [{"role": m['role'], "content": m['content']} for m in req.get('history', [])]
+    # Clients may send history ending with the new message itself; it is
+    # recorded once, with the reply, by _record_chat_turn
+    if sent_history and sent_history[-1]["role"] == "user" and sent_history[-1]["content"] == req.get('message', ''):
+        sent_history.pop()
+    session_id, _ = chat_sessions.open(user_key, req.get("session_id"), seed=sent_history)
+    return session_id, chat_sessions.history(user_key, session_id)
+
+def _record_chat_turn(user_key: str, session_id: str, message: str, reply: str) -> None:
+    chat_sessions.append(user_key, session_id, "user", message)
+    chat_sessions.append(user_key, session_id, "assistant", reply)
+
 @router.post("/ai/chat")
 async def chat_endpoint(req: dict, user: dict = Depends(get_current_user)):
-    history = [{"role": m['role'], "content": m['content']} for m in req.get('history', [])]
-    response = ai_service.chat_with_user(history, req.get('message', ''))
-    
-    if response["action"] == "generate":
-        req_data = response["data"]
-        gen_req = ai_schemas.AIGenerationRequest(
-            full_name=req_data.get("full_name", "User"),
-            email=user.get("email", ""),
-            desired_job_title=req_data.get("desired_job_title", ""),
-            top_skills=req_data.get("top_skills", []),
-            experience_level=req_data.get("experience_level", ""),
-            personal_strengths=req_data.get("professional_summary", "")
-        )
-        cv_data = ai_service.generate_cv_content_from_ai(gen_req)
-        if cv_data.success:
-            return {"reply": response["reply"], "action": "generate", "cv_data": cv_data.data}
-            
-    return response
+    """
+    One chat turn. When the reply triggers CV generation, the generated CV
+    comes back as cv_data; with "async_generation": true the reply returns
+    at once with a generation_id to poll at /ai/generations/{id} instead.
+    """
+    user_key = str(user["user_id"])
+    message = req.get('message', '')
+    _check_chat_session(req, user_key)
+    try:
+        await ai_admission.acquire(user_key)
+    except AIRateLimited as e:
+        raise _ai_busy(e)
+    started = time.monotonic()
+
+    def release_slot() -> None:
+        ai_admission.release(time.monotonic() - started)
+
+    handed_off = False
+    try:
+        # Only admitted turns touch the session store, so a 429 leaves nothing behind
+        session_id, history = _open_chat_session(req, user_key)
+        response = await ai_service.chat_with_user(history, message)
+        _record_chat_turn(user_key, session_id, message, response["reply"])
+
+        if response["action"] == "generate":
+            gen_req = _generation_request(response["data"], user, bool(req.get("regenerate")))
+            if req.get("async_generation"):
+                # Reply now; the generation keeps the admission slot until it finishes
+                generation_id = ai_generations.start(
+                    user_key, ai_service.generate_cv_content_from_ai(gen_req), on_done=release_slot
+                )
+                handed_off = True
+                return {"reply": response["reply"], "action": "generate", "generation_id": generation_id,
+                        "session_id": session_id}
+            cv_data = await ai_service.generate_cv_content_from_ai(gen_req)
+            if cv_data.success:
+                return {"reply": response["reply"], "action": "generate", "cv_data": cv_data.data,
+                        "session_id": session_id}
+
+        return {**response, "session_id": session_id}
+    finally:
+        if not handed_off:
+            release_slot()
+
+@router.get("/ai/generations/{generation_id}")
+async def generation_status_endpoint(generation_id: str, user: dict = Depends(get_current_user)):
+    status = ai_generations.get(str(user["user_id"]), generation_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Generation not found")
+    return status
+
+@router.post("/ai/chat/stream")
+async def chat_stream_endpoint(req: dict, user: dict = Depends(get_current_user)):
+    """
+    Same conversation as /ai/chat, as Server-Sent Events:
+    'delta' events carry reply text as it is generated, 'status' announces
+    the CV generation phase (started as soon as the BUILDING_CV_NOW JSON
+    parses, while the reply may still be streaming), 'reply' carries the
+    final chat text before generation finishes, and a final 'done' event
+    carries the payload /ai/chat would have returned.
+    """
+    user_key = str(user["user_id"])
+    message = req.get('message', '')
+    _check_chat_session(req, user_key)
+    # Admit before the 200 goes out so a rejection can still be a 429
+    try:
+        await ai_admission.acquire(user_key)
+    except AIRateLimited as e:
+        raise _ai_busy(e)
+    started = time.monotonic()
+    released = False
+
+    def release_slot() -> None:
+        # Called from the generator and again when the response closes; first call wins
+        nonlocal released
+        if not released:
+            released = True
+            ai_admission.release(time.monotonic() - started)
+
+    try:
+        session_id, history = _open_chat_session(req, user_key)
+    except Exception:
+        release_slot()
+        raise
+    regenerate = bool(req.get("regenerate"))
+
+    def start_generation(data: dict) -> "asyncio.Future":
+        return asyncio.ensure_future(ai_service.generate_cv_content_from_ai(_generation_request(data, user, regenerate)))
+
+    async def events():
+        generation = None
+        try:
+            response = None
+            async for item in ai_service.stream_chat_with_user(history, message):
+                if item["type"] == "delta":
+                    yield _sse("delta", {"text": item["text"]})
+                elif item["type"] == "generate":
+                    # Pipeline: generation runs while the rest of the reply streams
+                    generation = start_generation(item["data"])
+                    yield _sse("status", {"phase": "generating"})
+                else:
+                    response = {k: v for k, v in item.items() if k != "type"}
+            _record_chat_turn(user_key, session_id, message, response["reply"])
+
+            if response["action"] == "generate":
+                if generation is None:
+                    generation = start_generation(response["data"])
+                    yield _sse("status", {"phase": "generating"})
+                yield _sse("reply", {"reply": response["reply"], "action": "generate", "session_id": session_id})
+                cv_data = await generation
+                if cv_data.success:
+                    response = {"reply": response["reply"], "action": "generate", "cv_data": cv_data.data}
+                    yield _sse("cv_data", {"cv_data": cv_data.data})
+            yield _sse("done", {**response, "session_id": session_id})
+        finally:
+            if generation is not None and not generation.done():
+                generation.cancel()
+            release_slot()
+
+    return _ClosingStreamingResponse(
+        events(),
+        on_close=release_slot,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Slack for multipart boundaries and part headers on top of the file itself
+UPLOAD_FORM_OVERHEAD = 16 * 1024
+
+class _UploadParser(MultiPartParser):
+    """
+    MultiPartParser that closes every file it spooled whenever parsing
+    fails (older Starlette only does for its own errors, not for a
+    rejection raised from the body stream), and optionally checks the
+    first SNIFF_BYTES of each file part with sniff(head, filename) as soon
+    as they arrive, so a disguised file is refused before the rest of the
+    body is read.
+    """
+    # Upload bytes stay in memory up to this size, then roll over to a temp file
+    spool_max_size = config.settings.UPLOAD_SPOOL_BYTES
+
+    def __init__(self, *args: Any, sniff: Optional[Callable[[bytes, str], Any]] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.sniff = sniff
+        self.spooled: List[UploadFile] = []
+        self._head = b""
+        self._sniffed = True
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        upload = self._current_part.file
+        if upload is not None:
+            self.spooled.append(upload)
+            self._head, self._sniffed = b"", self.sniff is None
+
+    def _check_head(self) -> None:
+        self._sniffed = True
+        self.sniff(self._head, str(self._current_part.file.filename or ""))  # type: ignore[misc, union-attr]
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._sniffed and self._current_part.file is not None:
+            self._head += data[start:min(end, start + parser_service.SNIFF_BYTES - len(self._head))]
+            if len(self._head) >= parser_service.SNIFF_BYTES:
+                self._check_head()
+        super().on_part_data(data, start, end)
+
+    def on_part_end(self) -> None:
+        if not self._sniffed and self._current_part.file is not None:
+            self._check_head()  # file shorter than SNIFF_BYTES
+        super().on_part_end()
+
+    async def parse(self):  # type: ignore[override]
+        try:
+            return await super().parse()
+        except BaseException:
+            for upload in self.spooled:
+                upload.file.close()
+            raise
+
+async def _receive_form(request: Request, limit: int, max_files: int,
+                        sniff: Optional[Callable[[bytes, str], Any]] = None):
+    """
+    Streams a multipart body into spooled temp files instead of buffering
+    it. Oversized bodies are refused from Content-Length before anything
+    is read, or as soon as the running total passes the cap when the
+    client streams without one; with sniff, each file's magic bytes are
+    checked from its first chunk. Files spooled before a rejection are
+    closed. Raises parser_service.UploadRejected.
+    """
+    too_large = parser_service.UploadRejected(413, f"Upload too large (max {limit // (1024 * 1024)} MB)")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit + UPLOAD_FORM_OVERHEAD:
+        raise too_large
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise parser_service.UploadRejected(400, "Expected a multipart file upload")
+
+    async def capped_body():
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit + UPLOAD_FORM_OVERHEAD:
+                raise too_large
+            yield chunk
+
+    try:
+        return await _UploadParser(request.headers, capped_body(), max_files=max_files, max_fields=10,
+                                   sniff=sniff).parse()
+    except MultiPartException as e:
+        raise parser_service.UploadRejected(400, e.message)
+
+async def _receive_upload(request: Request) -> UploadFile:
+    """The single resume file of an upload, spooled, size-checked and sniffed."""
+    limit = config.settings.UPLOAD_MAX_BYTES
+    # Magic bytes first: wrong or disguised files never reach a parser
+    form = await _receive_form(request, limit, max_files=1,
+                               sniff=lambda head, name: parser_service.sniff(head, name or "resume.pdf"))
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        await form.close()
+        raise parser_service.UploadRejected(400, "Missing 'file' field")
+    if upload.size is not None and upload.size > limit:
+        await form.close()
+        raise parser_service.UploadRejected(413, f"File too large (max {limit // (1024 * 1024)} MB)")
+    return cast(UploadFile, upload)
 
 @router.post("/ai/upload-resume")
-async def upload_endpoint(file: UploadFile = File(...), user: dict = Depends(get_current_user)):
-    content = await file.read()
-    fname = str(file.filename) if file.filename else "resume.pdf"
-    text = parser_service.extract_text(content, fname)
+async def upload_endpoint(request: Request, user: dict = Depends(get_current_user)):
+    try:
+        upload = await _receive_upload(request)
+    except parser_service.UploadRejected as e:
+        raise HTTPException(e.status_code, e.reason)
+    try:
+        fname = str(upload.filename) if upload.filename else "resume.pdf"
+        # Re-uploads of the same file skip parsing entirely
+        max_chars = config.settings.PARSE_MAX_CHARS
+        cache_key = text_cache.make_key(await asyncio.to_thread(text_cache.file_digest, upload.file), fname, max_chars)
+        cached = text_cache.text_cache.get(cache_key)
+        if cached is not None:
+            return {"success": True, "extracted_text": cached.decode("utf-8")}
+        # Parsed off the event loop, reading the spooled file in place; pages
+        # past the character budget are never extracted
+        text = await extract_text_async(upload.file, fname, max_chars)
+        if text:
+            text_cache.text_cache.set(cache_key, text.encode("utf-8"))
+    finally:
+        await upload.close()
     return {"success": True, "extracted_text": text}
 
 # ---------------------------------------------------------
@@ -316,92 +506,187 @@ def delete_cv_endpoint(cv_id: int, db: Session = Depends(get_db), user: dict = D
         raise HTTPException(status_code=404, detail="CV not found")
     return {"success": True, "message": "CV deleted"}
 
-@router.get("/cvs/{cv_id}/export/{type}")
-def export_endpoint(cv_id: int, type: str, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
-    db_cv = cv_crud.get_cv(db, int(cv_id), int(user["user_id"]))
+def _load_export(db: Session, cv_id: int, user_id: int):
+    db_cv = cv_crud.get_cv(db, cv_id, user_id)
     if not db_cv:
         raise HTTPException(404, "CV not found")
+    tmpl = template_repository.get_or_default(str(db_cv.template_id))
+    if not tmpl: raise HTTPException(404, "Default Template missing")
+    return export_service.cv_data_to_dict(db_cv.data), tmpl
 
-    data_source = db_cv.data
-    if hasattr(data_source, "model_dump"):
-        cv_dict = data_source.model_dump()
-    elif hasattr(data_source, "dict"):
-        cv_dict = data_source.dict()
-    else:
-        cv_dict = dict(data_source) # type: ignore
-
-    # Ensure we have a Dict[str, Any] and decode any bytes keys/values that may exist.
-    def _ensure_str_keys(o: Any) -> Any:
-        if isinstance(o, dict):
-            new = {}
-            for k, v in o.items():
-                if isinstance(k, (bytes, bytearray)):
-                    try:
-                        key = k.decode("utf-8")
-                    except Exception:
-                        key = k.decode("latin-1", errors="ignore")
-                else:
-                    key = k if isinstance(k, str) else str(k)
-                new[key] = _ensure_str_keys(v)
-            return new
-        if isinstance(o, list):
-            return [_ensure_str_keys(i) for i in o]
-        if isinstance(o, (bytes, bytearray)):
-            try:
-                return o.decode("utf-8")
-            except Exception:
-                return o.decode("latin-1", errors="ignore")
-        return o
+@router.get("/cvs/{cv_id}/export/{type}")
+async def export_endpoint(cv_id: int, type: str, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    cv_dict, tmpl = await asyncio.to_thread(_load_export, db, int(cv_id), int(user["user_id"]))
 
     try:
-        if not isinstance(cv_dict, dict):
-            cv_dict = dict(cv_dict)  # type: ignore
-    except Exception:
-        cv_dict = {}
-
-    cv_dict = _ensure_str_keys(cv_dict)
+        result = await export_service.render_export_async(cv_dict, tmpl, type)
+    except ValueError:
+        raise HTTPException(400, "Unknown format")
+    except RenderPoolFull as e:
+        raise HTTPException(503, "PDF renderer busy, please retry", headers={"Retry-After": str(e.retry_after)})
+    except RenderTimeout:
+        raise HTTPException(504, "PDF rendering timed out")
+    except RenderWorkerCrashed:
+        raise HTTPException(500, "PDF rendering failed")
+
+    headers = {}
+    if type == 'docx':
+        headers["Content-Disposition"] = f"attachment; filename={result.filename}"
+    return Response(content=result.content, media_type=result.media_type, headers=headers)
+
+@router.post("/cvs/export/batch")
+def batch_export_endpoint(payload: Dict[str, Any], db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    """
+    Exports several CVs into one streamed ZIP.
+    Body: {"cv_ids": [1, 2, ...] | "all", "type": "pdf" | "docx" | "html"}
+    """
+    fmt = payload.get("type", "pdf")
+    if fmt not in export_service.EXPORT_MEDIA_TYPES:
+        raise HTTPException(400, "Unknown format")
 
-    template_id_str = str(db_cv.template_id)
-    tmpl = template_crud.get_template(db, template_id_str)
-    if not tmpl: 
-        tmpl = template_crud.get_template(db, "modern")
+    user_id = int(user["user_id"])
+    cv_ids = payload.get("cv_ids", "all")
+    if cv_ids == "all":
+        cvs = cv_crud.get_all_user_cvs(db, user_id)
+    elif isinstance(cv_ids, list):
+        try:
+            ids = [int(i) for i in cv_ids]
+        except (TypeError, ValueError):
+            raise HTTPException(422, "cv_ids must be a list of integers or 'all'")
+        # Archive entries follow the order of the request (first mention of an id)
+        order = {cv_id: n for n, cv_id in enumerate(dict.fromkeys(ids))}
+        cvs = sorted(cv_crud.get_user_cvs_by_ids(db, user_id, set(order)), key=lambda c: order[c.id])
+    else:
+        raise HTTPException(422, "cv_ids must be a list of integers or 'all'")
+
+    if not cvs:
+        raise HTTPException(404, "No CVs found")
+
+    # Resolve everything now: the DB session is gone once streaming starts
+    items = []
+    for db_cv in cvs:
+        tmpl = template_repository.get_or_default(str(db_cv.template_id))
+        if not tmpl:
+            raise HTTPException(404, "Default Template missing")
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", str(db_cv.title or "cv")).strip("-")[:40] or "cv"
+        items.append(export_service.BatchItem(f"{db_cv.id}-{slug}", export_service.cv_data_to_dict(db_cv.data), tmpl))
+
+    return StreamingResponse(
+        export_service.stream_zip(export_service.iter_batch_renders(items, fmt)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=resumes-{fmt}.zip"},
+    )
 
-    if not tmpl: raise HTTPException(404, "Default Template missing")
+@router.post("/cvs/import")
+async def import_cvs_endpoint(request: Request, user: dict = Depends(get_current_user)):
+    """
+    Bulk import. Multipart body with resume files (PDF / DOCX / TXT) and/or
+    ZIP archives of them under "files"; optional form fields
+    structure = "regex" (default) | "ai" and template_id.
+    Streams NDJSON progress (see cv_import.run_import).
+    """
+    max_files = config.settings.IMPORT_MAX_FILES
+    max_bytes = config.settings.IMPORT_MAX_BYTES
+    try:
+        form = await _receive_form(request, max_bytes, max_files=max_files)
+    except parser_service.UploadRejected as e:
+        raise HTTPException(e.status_code, e.reason)
 
-    if type == 'pdf':
-        pdf_bytes = file_service.create_pdf_from_template(cast(str, tmpl.html_content), cast(str, tmpl.css_styles), cv_dict)
-        return Response(content=pdf_bytes, media_type="application/pdf")
-            
-    elif type == 'html':
-        full_html = render_template_internal(cast(str, tmpl.html_content), cast(str, tmpl.css_styles), cv_dict)
-        return Response(content=full_html, media_type="text/html")
-        
-    elif type == 'docx':
-        clean_docx_data = normalize_cv_dict(cv_dict)
-        docx_bytes = file_service.create_docx_from_data(clean_docx_data)
-        filename = "resume.docx"
-        return Response(
-            content=docx_bytes, 
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+    handed_off = False
+    try:
+        mode = str(form.get("structure") or "regex")
+        if mode not in cv_import.STRUCTURE_MODES:
+            raise HTTPException(422, f"structure must be one of {', '.join(cv_import.STRUCTURE_MODES)}")
+        template_id = str(form.get("template_id") or "modern")
+        uploads = [f for f in form.getlist("files") + form.getlist("file") if not isinstance(f, str)]
+
+        sources: List[cv_import.ImportSource] = []
+        for upload in uploads:
+            if str(upload.filename or "").lower().endswith(".zip"):
+                sources += await asyncio.to_thread(cv_import.zip_sources, upload.file, max_files, max_bytes)
+            else:
+                sources += cv_import.upload_sources([upload])
+        if not sources:
+            raise HTTPException(400, "No resume files found (PDF, DOCX or TXT)")
+        if len(sources) > max_files:
+            raise HTTPException(400, f"Too many files (max {max_files})")
+
+        response = StreamingResponse(
+            cv_import.run_import(sources, mode, user, template_id, cleanup=form.close),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
-
-    raise HTTPException(400, "Unknown format")
+        # From here the stream closes the spooled uploads when it ends
+        handed_off = True
+        return response
+    except cv_import.ImportRejected as e:
+        raise HTTPException(400, str(e))
+    finally:
+        if not handed_off:
+            await form.close()
+
+@router.post("/cvs/{cv_id}/export-jobs/{type}", status_code=202, response_model=export_job_schemas.ExportJobStatus)
+def create_export_job(cv_id: int, type: str, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    """
+    Queues an export and returns immediately; poll /export-jobs/{job_id}
+    and fetch the file from /export-jobs/{job_id}/download when done.
+    """
+    if type not in export_service.EXPORT_MEDIA_TYPES:
+        raise HTTPException(400, "Unknown format")
+    if not cv_crud.get_cv(db, cv_id, int(user["user_id"])):
+        raise HTTPException(404, "CV not found")
+    if export_job_crud.count_unfinished_jobs(db, int(user["user_id"])) >= config.settings.EXPORT_JOB_MAX_PER_USER:
+        raise HTTPException(429, "Too many export jobs in progress, please retry",
+                            headers={"Retry-After": str(export_jobs.retry_after())})
+
+    job = export_job_crud.create_job(db, int(user["user_id"]), cv_id, type)
+    export_jobs.enqueue(job.id)
+    return job
+
+@router.get("/export-jobs/{job_id}", response_model=export_job_schemas.ExportJobStatus)
+def get_export_job(job_id: str, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    job = export_job_crud.get_job(db, job_id, int(user["user_id"]))
+    if not job:
+        raise HTTPException(404, "Export job not found")
+    return job
+
+@router.get("/export-jobs/{job_id}/download")
+def download_export_job(job_id: str, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    job = export_job_crud.get_job(db, job_id, int(user["user_id"]))
+    if not job:
+        raise HTTPException(404, "Export job not found")
+    if job.status == "failed":
+        raise HTTPException(422, f"Export failed: {job.error}")
+    if job.status != "done":
+        raise HTTPException(409, f"Export job is {job.status}")
+
+    content = bytes(job.result)
+    chunk = 64 * 1024
+    return StreamingResponse(
+        (content[i:i + chunk] for i in range(0, len(content), chunk)),
+        media_type=job.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={job.filename}",
+            "Content-Length": str(len(content)),
+        },
+    )
 
 @router.post("/generate-pdf")
-def generate_pdf_direct(payload: Dict[str, Any], db: Session = Depends(get_db)):
+def generate_pdf_direct(payload: Dict[str, Any]):
     """
     Direct Preview endpoint for frontend live preview.
+    Templates come from the in-memory repository, so no DB session is needed.
     """
     raw_data = payload.get("data", {})
     t_id = payload.get("template_id", "modern")
     
-    tmpl = template_crud.get_template(db, str(t_id))
-    if not tmpl: 
-        tmpl = template_crud.get_template(db, "modern")
+    tmpl = template_repository.get_or_default(str(t_id))
 
     if tmpl:
-        full_html = render_template_internal(cast(str, tmpl.html_content), cast(str, tmpl.css_styles), raw_data)
+        full_html = render_template_internal(
+            cast(str, tmpl.html_content), cast(str, tmpl.css_styles), raw_data,
+            template_id=str(tmpl.id), updated_at=tmpl.updated_at
+        )
         return Response(content=full_html, media_type="text/html")
     
     return Response(content="<h1>Template Error</h1>", media_type="text/html")
@@ -413,9 +698,33 @@ def generate_pdf_direct(payload: Dict[str, Any], db: Session = Depends(get_db)):
 def get_templates(db: Session = Depends(get_db)):
     return template_crud.get_all_templates(db)
 
+@router.get("/templates/summary", response_model=List[template_schemas.TemplateSummary])
+def get_template_summaries(request: Request, db: Session = Depends(get_db)):
+    """
+    Lightweight template listing (id, name, category, is_premium) for the
+    store and selector. Full bodies stay available via /templates/{id}.
+    Honors If-None-Match with a 304 against a strong ETag.
+    """
+    rows = template_crud.get_template_summaries(db)
+    summaries = [template_schemas.TemplateSummary.model_validate(r).model_dump() for r in rows]
+
+    fingerprint = json.dumps(
+        [[r.id, r.name, r.category, bool(r.is_premium), r.updated_at.isoformat() if r.updated_at else ""] for r in rows],
+        separators=(",", ":"),
+    )
+    etag = '"' + hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = [tag.strip() for tag in if_none_match.split(",") if tag.strip()]
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=summaries, headers=headers)
+
 @router.get("/templates/{id}", response_model=template_schemas.TemplateFull)
-def get_single_template(id: str, db: Session = Depends(get_db)):
-    t = template_crud.get_template(db, id)
+def get_single_template(id: str):
+    t = template_repository.get(id)
     if not t: raise HTTPException(404, "Template not found")
     return t
 
@@ -441,6 +750,8 @@ def delete_template_endpoint(
     try:
         db.delete(template)
         db.commit()
+        template_repository.invalidate(template_id)
+        compiled_templates.invalidate(template_id)
         return {"success": True, "message": f"Template {template_id} deleted"}
     except Exception as e:
         db.rollback()
@@ -460,9 +771,49 @@ def admin_create(t: template_schemas.TemplateCreate, db: Session = Depends(get_d
             html_content=t.html_content,
             css_styles=t.css_styles
         )
-        return template_crud.update_template(db, exist, update_data)
-    
-    return template_crud.create_template(db, t)
+        saved = template_crud.update_template(db, exist, update_data)
+    else:
+        saved = template_crud.create_template(db, t)
+
+    template_repository.invalidate(t.id)
+    return saved
+
+@router.put("/admin/templates/{template_id}", response_model=template_schemas.Template)
+def admin_update(template_id: str, t: template_schemas.TemplateUpdate, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    if user.get("email") != config.settings.ADMIN_EMAIL: 
+        raise HTTPException(403, "Admin Access Required")
+
+    exist = template_crud.get_template(db, template_id)
+    if not exist:
+        raise HTTPException(404, "Template not found")
+
+    saved = template_crud.update_template(db, exist, t)
+    template_repository.invalidate(template_id)
+    return saved
+
+@router.get("/admin/stats")
+def admin_stats(user: dict = Depends(get_current_user)):
+    """
+    In-process cache counters (Admin only)
+    """
+    if user.get("email") != config.settings.ADMIN_EMAIL:
+        raise HTTPException(403, "Admin Access Required")
+    return {
+        "template_cache": compiled_templates.stats(),
+        "template_repository": template_repository.stats(),
+        "pdf_cache": pdf_cache.pdf_cache.stats(),
+        "render_pool": render_pool.stats(),
+        "parse_pool": parse_pool.stats(),
+        "export_jobs": export_jobs.stats(),
+        "llm_clients": llm_clients.stats(),
+        "llm_router": llm_router.stats(),
+        "ai_cache": ai_cache.ai_cache.stats(),
+        "text_cache": text_cache.text_cache.stats(),
+        "ai_admission": ai_admission.stats(),
+        "chat_sessions": chat_sessions.stats(),
+        "ai_generations": ai_generations.stats(),
+        "password_hasher": password_hasher.stats(),
+    }
 
 # ---------------------------------------------------------
 # SETUP ENDPOINT (Keep for template syncing)
@@ -536,6 +887,7 @@ def setup_production_db(db: Session = Depends(get_db)):
             existing.css_styles = data["css"]
             
     db.commit()
+    template_repository.invalidate()
     return {"status": "success", "logs": log}
 # Package CRUD endpoints
 @router.get("/admin/packages")
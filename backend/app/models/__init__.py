@@ -1,3 +1,4 @@
 # This file marks the 'models' directory as a package. No contents needed.
 from .package import Package
-from .package import Package
\ No newline at end of file
+from .package import Package
+from .export_job import ExportJob
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, LargeBinary, ForeignKey, func
+from ..database import Base
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    id = Column(String, primary_key=True, index=True)   # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    cv_id = Column(Integer, nullable=False)
+    format = Column(String, nullable=False)              # pdf | docx | html
+    status = Column(String, default="queued", nullable=False, index=True)  # queued | running | done | failed
+    error = Column(Text, nullable=True)
+
+    # Rendered output (kept until the job expires)
+    result = Column(LargeBinary, nullable=True)
+    media_type = Column(String, nullable=True)
+    filename = Column(String, nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ExportJob(id='{self.id}', cv_id={self.cv_id}, status='{self.status}')>"
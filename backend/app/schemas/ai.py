@@ -14,6 +14,9 @@ class AIGenerationRequest(BaseModel):
     title: Optional[str] = "My AI CV" 
     template_id: Optional[str] = "modern" 
 
+    # Skip the generation cache and ask the model again
+    regenerate: bool = False
+
 # OUTPUT SCHEMAS - ENHANCED VERSION
 class AIConciseCVContent(BaseModel):
     full_name: str  # ← ADDED
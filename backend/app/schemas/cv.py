@@ -1,7 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List, Optional
 import datetime
 
+from ..core import sanitizer
+
 class CVData(BaseModel):
     """
     Detail of all structured CV fields (mirrors most frontend form fields).
@@ -28,6 +30,21 @@ class CVData(BaseModel):
     github: Optional[str] = ""
     portfolio: Optional[str] = ""
 
+    # Theme options (same keys as the frontend ThemeToolbar)
+    accentColor: Optional[str] = None
+    textColor: Optional[str] = None
+    fontFamily: Optional[str] = None
+
+    @field_validator("accentColor", "textColor", mode="before")
+    @classmethod
+    def _clean_color(cls, v):
+        return sanitizer.optional_css_color(v)
+
+    @field_validator("fontFamily", mode="before")
+    @classmethod
+    def _clean_font(cls, v):
+        return sanitizer.optional_font(v)
+
 class CVCreate(BaseModel):
     title: str
     data: CVData
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+class ExportJobStatus(BaseModel):
+    id: str
+    cv_id: int
+    format: str
+    status: str  # queued | running | done | failed
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
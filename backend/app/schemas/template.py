@@ -36,3 +36,12 @@ class Template(TemplateInDBBase):
 
 class TemplateFull(TemplateInDBBase):
     pass
+
+# Lightweight listing entry (no html/css bodies)
+class TemplateSummary(BaseModel):
+    id: str
+    name: Optional[str] = None
+    category: Optional[str] = None
+    is_premium: Optional[bool] = False
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,136 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from ..core.config import settings
+
+
+class AIRateLimited(Exception):
+    """Raised when an AI request is not admitted; surfaced as 429 + Retry-After."""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AIAdmission:
+    """
+    Admission control in front of the LLM calls.
+
+    - Per-user token bucket (rate_per_minute, burst): one token per request.
+    - Global cap on in-flight requests.
+    - Bounded wait queue. A request is shed up front when the estimated
+      wait (recent latency x queue position) already exceeds the queue
+      deadline, and shed from the queue when the deadline passes.
+
+    Everything runs on the event loop, so the counters need no lock.
+    """
+
+    def __init__(self, max_in_flight: int, queue_depth: int, queue_timeout_seconds: float,
+                 user_rate_per_minute: float, user_burst: int, max_tracked_users: int = 10000):
+        self.max_in_flight = max(1, max_in_flight)
+        self.queue_depth = max(0, queue_depth)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.user_rate = user_rate_per_minute / 60.0
+        self.user_burst = max(1, user_burst)
+        self.max_tracked_users = max_tracked_users
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._slots: Any = None  # asyncio.Semaphore, created on the serving loop
+        self._avg_seconds = 2.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.shed = 0
+
+    # --- per-user token bucket ---
+    def _take_token(self, user_key: str) -> None:
+        if self.user_rate <= 0:
+            return
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(user_key, (float(self.user_burst), now))
+        tokens = min(float(self.user_burst), tokens + (now - updated) * self.user_rate)
+        if tokens < 1.0:
+            self._buckets[user_key] = (tokens, now)
+            self.rate_limited += 1
+            raise AIRateLimited(math.ceil((1.0 - tokens) / self.user_rate), "Too many AI requests")
+        self._buckets[user_key] = (tokens - 1.0, now)
+        while len(self._buckets) > self.max_tracked_users:
+            self._buckets.popitem(last=False)
+
+    def _refund_token(self, user_key: str) -> None:
+        # Shed requests were never served, so they don't count against the user
+        if user_key in self._buckets:
+            tokens, updated = self._buckets[user_key]
+            self._buckets[user_key] = (min(float(self.user_burst), tokens + 1.0), updated)
+
+    # --- global cap + queue ---
+    def _shed(self, user_key: str, wait_estimate: float) -> AIRateLimited:
+        self.shed += 1
+        self._refund_token(user_key)
+        return AIRateLimited(max(1, math.ceil(wait_estimate)), "AI service busy")
+
+    def _wait_estimate(self, position: int) -> float:
+        return self._avg_seconds * math.ceil(position / self.max_in_flight)
+
+    async def acquire(self, user_key: str) -> None:
+        """Admits one request for user_key or raises AIRateLimited. Pair with release()."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._take_token(user_key)
+
+        occupied = self.in_flight + self.waiting
+        if occupied >= self.max_in_flight:
+            position = occupied - self.max_in_flight + 1
+            estimate = self._wait_estimate(position)
+            if position > self.queue_depth or estimate > self.queue_timeout_seconds:
+                raise self._shed(user_key, estimate)
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            raise self._shed(user_key, self._wait_estimate(max(1, self.waiting)))
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self, elapsed: float) -> None:
+        self.in_flight -= 1
+        self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+        self._slots.release()
+
+    @asynccontextmanager
+    async def slot(self, user_key: str) -> AsyncIterator[None]:
+        await self.acquire(user_key)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "shed": self.shed,
+            "avg_request_seconds": round(self._avg_seconds, 3),
+        }
+
+
+ai_admission = AIAdmission(
+    max_in_flight=settings.AI_MAX_IN_FLIGHT,
+    queue_depth=settings.AI_QUEUE_DEPTH,
+    queue_timeout_seconds=settings.AI_QUEUE_TIMEOUT_SECONDS,
+    user_rate_per_minute=settings.AI_USER_RATE_PER_MINUTE,
+    user_burst=settings.AI_USER_BURST,
+)
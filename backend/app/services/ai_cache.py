@@ -0,0 +1,36 @@
+import hashlib
+import json
+from typing import Any, Dict
+
+from ..core.config import settings
+from .blob_cache import build_store
+
+
+def _collapse(text: Any) -> str:
+    return " ".join(str(text or "").split())
+
+
+def make_key(model_name: str, mode: str, inputs: Dict[str, Any]) -> str:
+    """
+    Content address of a generation: model + prompt mode + normalized inputs.
+    Whitespace differences (re-uploads, retries with stray spaces) map to the
+    same key; anything that changes the prompt yields a new one.
+    """
+    normalized: Dict[str, Any] = {}
+    for name, value in inputs.items():
+        if isinstance(value, (list, tuple)):
+            normalized[name] = [_collapse(v) for v in value if _collapse(v)]
+        else:
+            normalized[name] = _collapse(value)
+    payload = {"model": model_name, "mode": mode, "inputs": normalized}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+ai_cache = build_store(
+    settings.AI_CACHE_BACKEND,
+    settings.AI_CACHE_MAX_BYTES,
+    sqlite_path=settings.AI_CACHE_SQLITE_PATH,
+    table="ai_cache",
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+)
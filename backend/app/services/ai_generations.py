@@ -0,0 +1,69 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..schemas import ai as ai_schemas
+
+
+class GenerationJobs:
+    """
+    CV generations running in the background after /ai/chat has already
+    answered. The client picks the result up by id. Kept in memory on the
+    event loop (results are small and short-lived); bounded by count and age.
+    """
+
+    def __init__(self, max_jobs: int, ttl_seconds: float):
+        self.max_jobs = max(1, max_jobs)
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, Tuple[str, asyncio.Future, float]]" = OrderedDict()
+        self.started = 0
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for job_id, (_, task, created) in list(self._jobs.items()):
+            if now - created > self.ttl_seconds:
+                task.cancel()
+                del self._jobs[job_id]
+        while len(self._jobs) > self.max_jobs:
+            _, (_, task, _) = self._jobs.popitem(last=False)
+            task.cancel()
+
+    def start(self, user_key: str, work: Awaitable[ai_schemas.AIResponse],
+              on_done: Optional[Callable[[], None]] = None) -> str:
+        job_id = uuid.uuid4().hex
+        task = asyncio.ensure_future(work)
+        if on_done is not None:
+            task.add_done_callback(lambda _: on_done())
+        self._jobs[job_id] = (user_key, task, time.monotonic())
+        self.started += 1
+        self._prune()
+        return job_id
+
+    def get(self, user_key: str, job_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._jobs.get(job_id)
+        if entry is None or entry[0] != user_key:
+            return None
+        task = entry[1]
+        if not task.done():
+            return {"status": "pending"}
+        if task.cancelled():
+            return {"status": "failed", "error": {"detail": "Generation cancelled"}}
+        if task.exception() is not None:
+            return {"status": "failed", "error": {"detail": str(task.exception())}}
+        result: ai_schemas.AIResponse = task.result()
+        if not result.success:
+            return {"status": "failed", "error": result.error}
+        return {"status": "done", "cv_data": result.data}
+
+    def stats(self) -> Dict[str, Any]:
+        running = sum(1 for _, task, _ in self._jobs.values() if not task.done())
+        return {"jobs": len(self._jobs), "running": running, "started": self.started}
+
+
+ai_generations = GenerationJobs(
+    max_jobs=settings.AI_GENERATION_MAX_JOBS,
+    ttl_seconds=settings.AI_GENERATION_TTL_SECONDS,
+)
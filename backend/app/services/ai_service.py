@@ -1,4 +1,3 @@
-import os
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -9,9 +8,12 @@ load_dotenv()  # Backup check in current dir
 
 import json
 import re
-from typing import List, Dict, Any
-from openai import OpenAI
+from typing import List, Dict, Any, AsyncIterator
 from ..schemas import ai as ai_schemas
+from . import ai_cache
+from .llm_router import llm_router
+from . import local_generator, resume_compactor, resume_scanner
+from ..core.config import settings
 
 # No longer using local models - removed transformers imports
 MODEL_ID = "microsoft/Phi-3-mini-4k-instruct"  # Kept for reference only
@@ -19,15 +21,12 @@ model = None
 tokenizer = None
 
 def get_client():
-    # Priority: Groq > OpenAI > None
-    api_key = os.getenv("GROQ_API_KEY") or os.getenv("OPENAI_API_KEY")
-    base_url = "https://api.groq.com/openai/v1" if os.getenv("GROQ_API_KEY") else None
-    
-    if not api_key:
+    """Preferred healthy provider's shared AsyncOpenAI client (Groq > OpenAI), or None without keys."""
+    order = llm_router.route()
+    if not order:
         print("⚠️ Warning: No API Key found in .env. Falling back might fail.")
         return None
-        
-    return OpenAI(api_key=api_key, base_url=base_url)
+    return llm_router.clients.get(order[0])[0]
 
 def clean_json_response(text):
     # Remove markdown ```json ... ```
@@ -35,49 +34,35 @@ def clean_json_response(text):
     clean = re.sub(r'```', '', clean)
     return clean.strip()
 
+def use_local_backend() -> bool:
+    """AI_BACKEND: "local" always, "llm" never, "auto" when no provider is usable (no key / circuits open)."""
+    backend = (settings.AI_BACKEND or "auto").lower()
+    if backend == "local":
+        return True
+    if backend == "llm":
+        return False
+    return not llm_router.available()
+
 # --- PDF TEXT CLEANING ---
 def clean_pdf_text(text: str) -> str:
-    text = text.replace('\x00', '')
-    text = re.sub(r'[^\x20-\x7E\n]', '', text) 
-    return text.strip()
+    return resume_scanner.clean_text(text)
 
 def extract_personal_info_regex(cv_text: str) -> dict:
     """Reliable Regex extraction to catch data the AI misses."""
-    info = {"full_name": "", "email": "", "phone": "", "job_title": ""}
-    
-    # 1. Email
-    email_match = re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', cv_text)
-    if email_match: 
-        info["email"] = email_match.group(0)
-    
-    # 2. Phone
-    phone_match = re.search(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]', cv_text)
-    if phone_match: 
-        info["phone"] = phone_match.group(0).strip()
-    
-    # 3. Name Heuristics (Look at first 5 lines, avoid 'Curriculum Vitae' etc)
-    lines = [l for l in cv_text.split('\n') if l.strip()]
-    blacklist = ["Curriculum", "Vitae", "Resume", "Page", "Contact", "Phone", "Email", "Address", "Education"]
-    
-    for line in lines[:5]:
-        clean_line = line.strip()
-        # Conditions: Short, no digits, no @, not blacklisted
-        if len(clean_line.split()) <= 4 and not any(c.isdigit() for c in clean_line) and "@" not in clean_line:
-            if not any(b.upper() in clean_line.upper() for b in blacklist):
-                info["full_name"] = clean_line
-                break
-                
-    return info
+    found = resume_scanner.scan(cv_text)
+    return {
+        "full_name": found.full_name,
+        "email": found.email,
+        "phone": found.phone,
+        "job_title": "",
+        "linkedin": found.linkedin,
+        "github": found.github,
+    }
 
 # --- THE SMART CHAT FUNCTION ---
-def chat_with_user(history: List[Dict[str, Any]], latest_message: str) -> Dict[str, Any]:
-    client = get_client()
-    if not client:
-        return {"reply": "API Key Missing. Check Server Logs.", "action": "chat", "data": None}
-
-    model_name = "llama-3.3-70b-versatile" if os.getenv("GROQ_API_KEY") else "gpt-4o-mini"
+BUILD_MARKER = "BUILDING_CV_NOW"
 
-    system_prompt = """
+CHAT_SYSTEM_PROMPT = """
     You are the "AI Career Architect", embedded inside a Resume Builder App.
     
     CRITICAL INSTRUCTIONS ON FILE UPLOADS:
@@ -106,44 +91,103 @@ def chat_with_user(history: List[Dict[str, Any]], latest_message: str) -> Dict[s
     }
     """
 
-    messages = [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": latest_message}]
+def build_chat_messages(history: List[Dict[str, Any]], latest_message: str) -> List[Dict[str, Any]]:
+    return [{"role": "system", "content": CHAT_SYSTEM_PROMPT}] + history + [{"role": "user", "content": latest_message}]
+
+def parse_chat_reply(reply: str) -> Dict[str, Any]:
+    """Splits a finished reply into chat text and, after BUILDING_CV_NOW, the generation JSON."""
+    if BUILD_MARKER in reply:
+        parts = reply.split(BUILD_MARKER)
+        text_part = parts[0].strip()
+        try:
+            json_part = clean_json_response(parts[1])
+            data = json.loads(json_part)
+            return {"reply": text_part or "Generative Process Started...", "action": "generate", "data": data}
+        except:
+            pass
+
+    return {"reply": reply, "action": "chat", "data": None}
+
+async def chat_with_user(history: List[Dict[str, Any]], latest_message: str) -> Dict[str, Any]:
+    if use_local_backend():
+        return local_generator.local_chat_reply(history, latest_message)
+    if not get_client():
+        return {"reply": "API Key Missing. Check Server Logs.", "action": "chat", "data": None}
+
+    messages = build_chat_messages(history, latest_message)
 
     try:
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=600
-        )
-        reply = response.choices[0].message.content
-        
-        if "BUILDING_CV_NOW" in reply:
-            parts = reply.split("BUILDING_CV_NOW")
-            text_part = parts[0].strip()
-            try:
-                json_part = clean_json_response(parts[1])
-                data = json.loads(json_part)
-                return {"reply": text_part or "Generative Process Started...", "action": "generate", "data": data}
-            except:
-                pass
-        
-        return {"reply": reply, "action": "chat", "data": None}
+        reply = await llm_router.chat(messages, temperature=0.7, max_tokens=600)
+        return parse_chat_reply(reply)
 
     except Exception as e:
         print(f"Chat Error: {e}")
         return {"reply": "Connection hiccup.", "action": "chat", "data": None}
 
+async def stream_chat_with_user(history: List[Dict[str, Any]], latest_message: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of chat_with_user.
+
+    Yields {"type": "delta", "text": ...} while tokens arrive, then one
+    {"type": "result", ...} with the same shape chat_with_user returns.
+    Text after BUILDING_CV_NOW is never forwarded: a tail the length of
+    the marker is held back until it can no longer be the marker's start.
+    As soon as the JSON after the marker parses, one
+    {"type": "generate", "data": ...} is yielded so callers can start
+    CV generation before the stream has finished.
+    """
+    if use_local_backend():
+        result = local_generator.local_chat_reply(history, latest_message)
+        yield {"type": "delta", "text": result["reply"]}
+        yield {"type": "result", **result}
+        return
+    if not get_client():
+        yield {"type": "result", "reply": "API Key Missing. Check Server Logs.", "action": "chat", "data": None}
+        return
+
+    messages = build_chat_messages(history, latest_message)
+    reply = ""
+    sent = 0          # chars of reply already forwarded
+    building = False  # marker seen, the rest is generation JSON
+    announced = False # "generate" item already yielded
+
+    try:
+        async for piece in llm_router.stream_chat(messages, temperature=0.7, max_tokens=600):
+            reply += piece
+            if building:
+                if not announced and "}" in piece:
+                    parsed = parse_chat_reply(reply)
+                    if parsed["action"] == "generate":
+                        announced = True
+                        yield {"type": "generate", "data": parsed["data"]}
+                continue
+            marker_at = reply.find(BUILD_MARKER, max(0, sent - len(BUILD_MARKER)))
+            if marker_at != -1:
+                building = True
+                safe_end = marker_at
+            else:
+                safe_end = len(reply) - (len(BUILD_MARKER) - 1)
+            if safe_end > sent:
+                yield {"type": "delta", "text": reply[sent:safe_end]}
+                sent = safe_end
+
+        if not building and len(reply) > sent:
+            yield {"type": "delta", "text": reply[sent:]}
+        yield {"type": "result", **parse_chat_reply(reply)}
+
+    except Exception as e:
+        print(f"Chat Error: {e}")
+        yield {"type": "result", "reply": "Connection hiccup.", "action": "chat", "data": None}
+
 
 # --- CV GENERATION ---
-def generate_cv_content_from_ai(request: ai_schemas.AIGenerationRequest) -> ai_schemas.AIResponse:
+async def generate_cv_content_from_ai(request: ai_schemas.AIGenerationRequest) -> ai_schemas.AIResponse:
     print(f"Processing CV Generation Request...")
     try:
-        client = get_client()
-        if not client: 
+        local = use_local_backend()
+        if not local and not get_client():
             raise ValueError("No API Key")
 
-        model_name = "llama-3.3-70b-versatile" if os.getenv("GROQ_API_KEY") else "gpt-4o-mini"
-        
         # Check upload context
         raw_text = ""
         is_upload_mode = False
@@ -152,12 +196,45 @@ def generate_cv_content_from_ai(request: ai_schemas.AIGenerationRequest) -> ai_s
         if request.personal_strengths and "SUMMARIZE THIS RESUME:" in request.personal_strengths:
             is_upload_mode = True
             full_text = request.personal_strengths.replace("SUMMARIZE THIS RESUME:", "")
-            raw_text = clean_pdf_text(full_text)[:4000]  # Increased limit for Cloud
-            
-            # RUN REGEX NOW
-            extracted_regex = extract_personal_info_regex(raw_text)
+            # RUN REGEX NOW (whole document, before compaction drops anything)
+            extracted_regex = extract_personal_info_regex(clean_pdf_text(full_text))
+            # Sections fitted to the token budget instead of a blind [:4000]
+            raw_text = resume_compactor.compact_resume(full_text, settings.AI_UPLOAD_PROMPT_TOKENS)
             print(f"📋 Regex Identified: {extracted_regex}")
         
+        # LOCAL BACKEND (offline / every provider circuit open): rule-based, never cached
+        if local:
+            content = local_generator.generate_local(request, raw_text, extracted_regex)
+            return ai_schemas.AIResponse(success=True, data=content)
+
+        # CACHE LOOKUP (same inputs + model -> same answer, no LLM call)
+        if is_upload_mode:
+            # Regex fields come from the whole document, which raw_text may not cover
+            cache_inputs = {
+                "text": raw_text,
+                "desired_job_title": request.desired_job_title,
+                "full_name": extracted_regex.get("full_name"),
+                "email": extracted_regex.get("email"),
+                "phone": extracted_regex.get("phone"),
+            }
+        else:
+            cache_inputs = {
+                "full_name": request.full_name,
+                "email": request.email,
+                "desired_job_title": request.desired_job_title,
+                "experience_level": request.experience_level,
+                "top_skills": request.top_skills,
+            }
+        model_name = llm_router.model_for()
+        cache_key = ai_cache.make_key(model_name, "upload" if is_upload_mode else "create", cache_inputs)
+        if not request.regenerate:
+            cached = ai_cache.ai_cache.get(cache_key)
+            if cached is not None:
+                print("⚡ AI Cache Hit")
+                return ai_schemas.AIResponse(
+                    success=True, data=ai_schemas.AIGeneratedContent.model_validate_json(cached)
+                )
+
         # PROMPTING
         if is_upload_mode:
             prompt = f"""
@@ -203,13 +280,12 @@ def generate_cv_content_from_ai(request: ai_schemas.AIGenerationRequest) -> ai_s
             """
         
         # CALL API
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[{"role": "user", "content": prompt}],
+        content = await llm_router.chat(
+            [{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
         
-        data = json.loads(response.choices[0].message.content)
+        data = json.loads(content)
         
         # === THE IDENTITY GUARD (Anti-Hallucination) ===
         if is_upload_mode:
@@ -231,20 +307,22 @@ def generate_cv_content_from_ai(request: ai_schemas.AIGenerationRequest) -> ai_s
             if "@" not in data.get("email", "") and extracted_regex.get("email"):
                 data["email"] = extracted_regex["email"]
 
-        return ai_schemas.AIResponse(success=True, data=ai_schemas.AIGeneratedContent(**data))
+        content = ai_schemas.AIGeneratedContent(**data)
+        ai_cache.ai_cache.set(cache_key, content.model_dump_json().encode("utf-8"))
+        return ai_schemas.AIResponse(success=True, data=content)
 
     except Exception as e:
         print(f"Gen Error: {e}")
         return ai_schemas.AIResponse(success=False, error={"detail": str(e)})
 
-def generate_full_cv_package(req):
-    res = generate_cv_content_from_ai(req)
+async def generate_full_cv_package(req):
+    res = await generate_cv_content_from_ai(req)
     if not res.success: 
         return None
     return res.data
 
-def generate_cv_content(req): 
-    return generate_full_cv_package(req)
+async def generate_cv_content(req): 
+    return await generate_full_cv_package(req)
 
 def load_model(): 
     pass
\ No newline at end of file
@@ -0,0 +1,361 @@
+import abc
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# With a TTL, each stored value is prefixed with its write time
+_STORED_AT = struct.Struct("!d")
+
+
+class BlobStore(abc.ABC):
+    """
+    Size-bounded key -> bytes store with LRU eviction and hit/miss counters.
+    Subclasses implement the storage hooks and guard their own state, so a
+    store can keep slow I/O outside its lock; counters and the optional TTL
+    live here.
+    """
+    backend = "base"
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._get(key)
+        expired = False
+        if value is not None and self.ttl_seconds:
+            (stored_at,) = _STORED_AT.unpack_from(value)
+            if time.time() - stored_at > self.ttl_seconds:
+                self._delete(key)
+                expired = True
+                value = None
+            else:
+                value = value[_STORED_AT.size:]
+        with self._lock:
+            self.expired += expired
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if self.ttl_seconds:
+            value = _STORED_AT.pack(time.time()) + value
+        # Entries bigger than the whole budget would evict everything for nothing
+        if len(value) > self.max_bytes:
+            return
+        evicted = self._set(key, value)
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def delete(self, key: str) -> None:
+        self._delete(key)
+
+    def clear(self) -> None:
+        self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        entries, total = self._usage()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend,
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    # --- storage hooks (called without the lock; each store guards its own state) ---
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[bytes]:
+        """Stored value (TTL prefix included) or None; counts as a use for LRU."""
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: bytes) -> int:
+        """Stores value, evicts down to max_bytes and returns the number of entries evicted."""
+
+    @abc.abstractmethod
+    def _delete(self, key: str) -> None:
+        """Removes key if present."""
+
+    @abc.abstractmethod
+    def _clear(self) -> None:
+        """Removes every entry."""
+
+    @abc.abstractmethod
+    def _usage(self) -> Tuple[int, int]:
+        """(entries, bytes) currently stored."""
+
+
+class MemoryBlobStore(BlobStore):
+    backend = "memory"
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 0):
+        super().__init__(max_bytes, ttl_seconds)
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._total = 0
+
+    def _get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total -= len(old)
+            self._entries[key] = value
+            self._total += len(value)
+
+            evicted = 0
+            while self._total > self.max_bytes and self._entries:
+                _, old = self._entries.popitem(last=False)
+                self._total -= len(old)
+                evicted += 1
+            return evicted
+
+    def _delete(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total -= len(old)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+
+    def _usage(self):
+        with self._lock:
+            return len(self._entries), self._total
+
+
+class DiskBlobStore(BlobStore):
+    """
+    One file per entry in a local directory. LRU order is rebuilt from mtimes on startup.
+
+    The lock only guards the in-memory index (key -> size, in LRU order);
+    reading, writing and removing files happens outside it, so one slow disk
+    operation doesn't stall every other lookup. A file removed between the
+    index check and the read is just a miss.
+    """
+    backend = "disk"
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: float = 0):
+        super().__init__(max_bytes, ttl_seconds)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+
+        existing = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.startswith(".") or not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            existing.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(existing):
+            self._index[name] = size
+            self._total += size
+        self._remove_files(self._pop_over_budget())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _forget(self, key: str) -> bool:
+        """Drops key from the index (lock held); True if it was there."""
+        if key not in self._index:
+            return False
+        self._total -= self._index.pop(key)
+        return True
+
+    def _pop_over_budget(self) -> List[str]:
+        """Takes least recently used keys off the index until within max_bytes (lock held)."""
+        victims = []
+        while self._total > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            victims.append(key)
+        return victims
+
+    def _remove_files(self, keys: List[str]) -> None:
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _get(self, key):
+        with self._lock:
+            if key not in self._index:
+                return None
+        try:
+            with open(self._path(key), "rb") as fh:
+                value = fh.read()
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        return value
+
+    def _set(self, key, value):
+        # Write to a temp file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(value)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            self._forget(key)
+            self._index[key] = len(value)
+            self._total += len(value)
+            victims = self._pop_over_budget()
+        self._remove_files(victims)
+        return len(victims)
+
+    def _delete(self, key):
+        with self._lock:
+            removed = self._forget(key)
+        if removed:
+            self._remove_files([key])
+
+    def _clear(self):
+        with self._lock:
+            keys = list(self._index)
+            self._index.clear()
+            self._total = 0
+        self._remove_files(keys)
+
+    def _usage(self):
+        with self._lock:
+            return len(self._index), self._total
+
+
+class SQLiteBlobStore(BlobStore):
+    """Blob table in a local SQLite file (independent of the main DATABASE_URL)."""
+    backend = "sqlite"
+
+    def __init__(self, path: str, max_bytes: int, table: str = "blob_cache", ttl_seconds: float = 0):
+        super().__init__(max_bytes, ttl_seconds)
+        self.path = path
+        self.table = table
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # One shared connection: every hook holds the lock while it uses it
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_last_access ON {table} (last_access)")
+        self._conn.commit()
+
+    def _get(self, key):
+        with self._lock:
+            row = self._conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return bytes(row[0])
+
+    def _set(self, key, value):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), len(value), time.time()),
+            )
+            self._conn.commit()
+            return self._evict()
+
+    def _evict(self) -> int:
+        (total,) = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        evicted = 0
+        while total > self.max_bytes:
+            row = self._conn.execute(
+                f"SELECT key, size FROM {self.table} ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (row[0],))
+            total -= row[1]
+            evicted += 1
+        if evicted:
+            self._conn.commit()
+        return evicted
+
+    def _delete(self, key):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def _usage(self):
+        with self._lock:
+            count, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+            return count, total
+
+
+class NullBlobStore(BlobStore):
+    """Caching disabled: every lookup is a miss."""
+    backend = "none"
+
+    def _get(self, key):
+        return None
+
+    def _set(self, key, value):
+        return 0
+
+    def _delete(self, key):
+        pass
+
+    def _clear(self):
+        pass
+
+    def _usage(self):
+        return 0, 0
+
+
+def build_store(backend: str, max_bytes: int, directory: str = "", sqlite_path: str = "",
+                table: str = "blob_cache", ttl_seconds: float = 0) -> BlobStore:
+    """Creates the store selected in config ("memory", "disk", "sqlite" or "none")."""
+    backend = (backend or "memory").lower()
+    if backend == "disk":
+        return DiskBlobStore(directory, max_bytes, ttl_seconds=ttl_seconds)
+    if backend == "sqlite":
+        return SQLiteBlobStore(sqlite_path, max_bytes, table=table, ttl_seconds=ttl_seconds)
+    if backend in ("none", "off", "disabled"):
+        return NullBlobStore(max_bytes)
+    return MemoryBlobStore(max_bytes, ttl_seconds=ttl_seconds)
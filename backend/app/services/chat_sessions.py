@@ -0,0 +1,145 @@
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+# Per-turn excerpt length kept in the summary of dropped turns
+SUMMARY_EXCERPT_CHARS = 160
+
+
+def trim_history(turns: List[Dict[str, str]], token_budget: int) -> List[Dict[str, str]]:
+    """
+    Keeps the newest turns that fit in token_budget. Older turns are folded
+    into one compact system note made of short excerpts of what the user
+    said, so facts like the target job title survive without the full text.
+    """
+    kept: List[Dict[str, str]] = []
+    used = 0
+    for turn in reversed(turns):
+        cost = estimate_tokens(turn["content"])
+        if kept and used + cost > token_budget:
+            break
+        kept.append(turn)
+        used += cost
+    kept.reverse()
+
+    dropped = turns[:len(turns) - len(kept)]
+    if not dropped:
+        return kept
+
+    excerpts = [
+        " ".join(t["content"].split())[:SUMMARY_EXCERPT_CHARS]
+        for t in dropped if t["role"] == "user" and t["content"].strip()
+    ]
+    # The summary itself gets a quarter of the budget, newest excerpts first
+    summary_budget = max(1, token_budget // 4) * CHARS_PER_TOKEN
+    lines: List[str] = []
+    for excerpt in reversed(excerpts):
+        if sum(len(x) for x in lines) + len(excerpt) > summary_budget:
+            break
+        lines.insert(0, f"- {excerpt}")
+    if not lines:
+        return kept
+    note = "Earlier in this conversation the user said:\n" + "\n".join(lines)
+    return [{"role": "system", "content": note}] + kept
+
+
+class ChatSession:
+    __slots__ = ("turns", "last_used")
+
+    def __init__(self, max_turns: int):
+        self.turns: Deque[Dict[str, str]] = deque(maxlen=max_turns)
+        self.last_used = time.monotonic()
+
+
+class ChatSessionStore:
+    """
+    Server-side chat history keyed by (user id, session id).
+
+    Each session is a ring buffer of the last max_turns turns; sessions are
+    evicted LRU beyond max_sessions and dropped after ttl_seconds idle.
+    history() returns the turns trimmed to the token budget, so the prompt
+    sent upstream stays flat however long the conversation runs.
+    Only touched from the event loop, so no lock.
+    """
+
+    def __init__(self, max_sessions: int, max_turns: int, token_budget: int, ttl_seconds: float):
+        self.max_sessions = max(1, max_sessions)
+        self.max_turns = max(2, max_turns)
+        self.token_budget = token_budget
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[Tuple[str, str], ChatSession]" = OrderedDict()
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def _lookup(self, user_key: str, session_id: Optional[str]) -> Optional[ChatSession]:
+        if not session_id:
+            return None
+        key = (user_key, session_id)
+        session = self._sessions.get(key)
+        if session is None:
+            return None
+        if self.ttl_seconds and time.monotonic() - session.last_used > self.ttl_seconds:
+            del self._sessions[key]
+            self.expired += 1
+            return None
+        self._sessions.move_to_end(key)
+        session.last_used = time.monotonic()
+        return session
+
+    def exists(self, user_key: str, session_id: Optional[str]) -> bool:
+        return self._lookup(user_key, session_id) is not None
+
+    def open(self, user_key: str, session_id: Optional[str] = None,
+             seed: Optional[List[Dict[str, str]]] = None) -> Tuple[str, bool]:
+        """
+        Returns (session_id, existed). Unknown or missing ids start a new
+        session, seeded with the client-sent history when there is one.
+        """
+        if self._lookup(user_key, session_id) is not None:
+            return session_id, True  # type: ignore[return-value]
+
+        session_id = uuid.uuid4().hex
+        session = ChatSession(self.max_turns)
+        for turn in seed or []:
+            session.turns.append({"role": turn["role"], "content": turn["content"]})
+        self._sessions[(user_key, session_id)] = session
+        self.created += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        return session_id, False
+
+    def history(self, user_key: str, session_id: str) -> List[Dict[str, str]]:
+        session = self._lookup(user_key, session_id)
+        if session is None:
+            return []
+        return trim_history(list(session.turns), self.token_budget)
+
+    def append(self, user_key: str, session_id: str, role: str, content: str) -> None:
+        session = self._lookup(user_key, session_id)
+        if session is not None and content:
+            session.turns.append({"role": role, "content": content})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "max_turns": self.max_turns,
+            "token_budget": self.token_budget,
+            "created": self.created,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+
+chat_sessions = ChatSessionStore(
+    max_sessions=settings.CHAT_SESSION_MAX_SESSIONS,
+    max_turns=settings.CHAT_SESSION_MAX_TURNS,
+    token_budget=settings.CHAT_HISTORY_TOKEN_BUDGET,
+    ttl_seconds=settings.CHAT_SESSION_TTL_SECONDS,
+)
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import zipfile
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from ..core.config import settings
+from ..crud import cv as cv_crud
+from ..database import SessionLocal
+from ..schemas import ai as ai_schemas, cv as cv_schemas
+from . import ai_service, local_generator, parser_service, resume_compactor
+from .ai_admission import ai_admission, AIRateLimited
+from .parse_pool import parse_pool
+from .render_pool import RenderPoolFull, RenderTimeout
+
+logger = logging.getLogger("cv_api")
+
+STRUCTURE_MODES = ("regex", "ai")
+
+
+class ImportSource(NamedTuple):
+    name: str
+    load: Callable[[], bytes]  # called in a worker thread when the file's turn comes
+
+
+class ImportRejected(Exception):
+    """Raised when an import request is refused up front (bad archive, too many files)."""
+
+
+# ---------------------------------------------------------
+# SOURCES
+# ---------------------------------------------------------
+def zip_sources(archive: Any, max_files: int, max_bytes: int) -> List[ImportSource]:
+    """
+    Members of an uploaded ZIP that parser_service can read. Sizes come from
+    the central directory, so oversized members and zip bombs are refused
+    before anything is inflated.
+    """
+    try:
+        zf = zipfile.ZipFile(archive)
+    except (zipfile.BadZipFile, OSError, EOFError):
+        raise ImportRejected("Not a valid ZIP archive")
+
+    members = [
+        info for info in zf.infolist()
+        if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+        and parser_service.kind_for(info.filename)
+    ]
+    if len(members) > max_files:
+        raise ImportRejected(f"Too many files (max {max_files})")
+    if sum(info.file_size for info in members) > max_bytes:
+        raise ImportRejected(f"Archive too large once extracted (max {max_bytes // (1024 * 1024)} MB)")
+
+    sources = []
+    for info in members:
+        if info.file_size > settings.UPLOAD_MAX_BYTES:
+            sources.append(ImportSource(info.filename, _too_large))
+        else:
+            sources.append(ImportSource(info.filename, lambda info=info: zf.read(info)))
+    return sources
+
+
+def _too_large() -> bytes:
+    raise parser_service.UploadRejected(413, f"File too large (max {settings.UPLOAD_MAX_BYTES // (1024 * 1024)} MB)")
+
+
+def _stem(name: str) -> str:
+    return os.path.splitext(os.path.basename(name))[0] or "Imported CV"
+
+
+def _read_upload(upload: Any) -> bytes:
+    upload.file.seek(0)
+    # Bounded even when the spooled size is unknown
+    data = upload.file.read(settings.UPLOAD_MAX_BYTES + 1)
+    if len(data) > settings.UPLOAD_MAX_BYTES:
+        _too_large()
+    return data
+
+
+def upload_sources(uploads: List[Any]) -> List[ImportSource]:
+    """Directly uploaded files; like ZIP members, each is capped at UPLOAD_MAX_BYTES."""
+    sources = []
+    for i, upload in enumerate(uploads):
+        name = str(upload.filename or f"resume-{i}.pdf")
+        if upload.size is not None and upload.size > settings.UPLOAD_MAX_BYTES:
+            sources.append(ImportSource(name, _too_large))
+        else:
+            sources.append(ImportSource(name, lambda upload=upload: _read_upload(upload)))
+    return sources
+
+
+# ---------------------------------------------------------
+# PER-FILE PIPELINE
+# ---------------------------------------------------------
+def cv_data_from_content(content: ai_schemas.AIConciseCVContent, linkedin: str = "", github: str = "") -> Dict[str, Any]:
+    """AI / local generator output -> CVData fields (same mapping as the editor)."""
+    return {
+        "full_name": content.full_name,
+        "email": content.email,
+        "phone": content.phone or "",
+        "job_title": content.desired_job_title,
+        "summary": content.professional_summary,
+        "experience": "\n".join(f"• {p}" for p in content.experience_points),
+        "education": content.education_formatted,
+        "skills": content.suggested_skills,
+        "linkedin": linkedin,
+        "github": github,
+    }
+
+
+async def _parse(data: bytes, name: str) -> str:
+    """parser_service on the parse pool (a worker thread when the pool is disabled)."""
+    if parse_pool.processes == 0:
+        return await asyncio.to_thread(parser_service.extract_text, data, name, settings.PARSE_MAX_CHARS)
+    while True:
+        try:
+            future = parse_pool.submit(parser_service.extract_text, data, name, settings.PARSE_MAX_CHARS)
+            break
+        except RenderPoolFull as e:
+            await asyncio.sleep(min(e.retry_after, 1))
+    return await asyncio.wrap_future(future)
+
+
+async def _structure(text: str, mode: str, user: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Returns (CVData fields, mode actually used). AI falls back to regex when not admitted."""
+    info = ai_service.extract_personal_info_regex(ai_service.clean_pdf_text(text))
+    request = ai_schemas.AIGenerationRequest(
+        full_name=info["full_name"] or "Candidate Name",
+        email=user.get("email", ""),
+        desired_job_title="",
+        experience_level="",
+        top_skills=[],
+        personal_strengths="SUMMARIZE THIS RESUME:" + text,
+    )
+    if mode == "ai" and not ai_service.use_local_backend():
+        try:
+            async with ai_admission.slot(str(user["user_id"])):
+                result = await ai_service.generate_cv_content_from_ai(request)
+            if result.success and result.data is not None:
+                return cv_data_from_content(result.data, info["linkedin"], info["github"]), "ai"
+        except AIRateLimited:
+            pass
+
+    compacted = resume_compactor.compact_resume(text, settings.AI_UPLOAD_PROMPT_TOKENS)
+    content = local_generator.generate_local(request, compacted, info)
+    return cv_data_from_content(content, info["linkedin"], info["github"]), "regex"
+
+
+async def _process(source: ImportSource, mode: str, user: Dict[str, Any], template_id: str) -> Dict[str, Any]:
+    """One file -> {"file", "status", ...}; a valid CVCreate is carried under "cv"."""
+    result: Dict[str, Any] = {"file": source.name}
+    try:
+        data = await asyncio.to_thread(source.load)
+        parser_service.sniff(data[:parser_service.SNIFF_BYTES], source.name)
+        text = await _parse(data, source.name)
+        del data
+        if not text.strip():
+            raise ValueError("No text could be extracted")
+        fields, used = await _structure(text, mode, user)
+        if fields["email"] == user.get("email"):
+            # The importer's address is only a placeholder for the request schema
+            fields["email"] = ""
+        title = fields["full_name"] if fields["full_name"] not in ("", "Candidate Name") else _stem(source.name)
+        result["cv"] = cv_schemas.CVCreate(title=title, template_id=template_id, data=cv_schemas.CVData(**fields))
+        result.update(status="parsed", chars=len(text), structured=used)
+    except parser_service.UploadRejected as e:
+        result.update(status="failed", error=e.reason)
+    except RenderTimeout:
+        result.update(status="failed", error="Parsing timed out")
+    except Exception as e:
+        result.update(status="failed", error=str(e) or type(e).__name__)
+    return result
+
+
+# ---------------------------------------------------------
+# IMPORT STREAM (NDJSON)
+# ---------------------------------------------------------
+def _ndjson(event: Dict[str, Any]) -> bytes:
+    return (json.dumps(event) + "\n").encode("utf-8")
+
+
+def _insert_batch(db: Any, cvs: List[cv_schemas.CVCreate], user_id: int) -> List[int]:
+    try:
+        return cv_crud.create_cvs_bulk(db, cvs, user_id)
+    except Exception:
+        db.rollback()
+        raise
+
+
+async def run_import(sources: List[ImportSource], mode: str, user: Dict[str, Any], template_id: str,
+                     cleanup: Optional[Callable[[], Any]] = None) -> AsyncIterator[bytes]:
+    """
+    Imports sources and streams NDJSON progress lines:
+      {"type": "start", ...}, one {"type": "file", ...} per resume as it is
+      parsed, one {"type": "batch", ...} per committed transaction, then
+      {"type": "done", ...}.
+    Up to IMPORT_CONCURRENCY files are in flight (parsing on the parse pool);
+    parsed CVs are inserted IMPORT_BATCH_SIZE at a time. The generator opens
+    its own DB session since the request's is gone once streaming starts,
+    and awaits cleanup() (closing the spooled uploads) when it ends.
+    """
+    started = time.monotonic()
+    user_id = int(user["user_id"])
+    total = len(sources)
+    window = max(1, settings.IMPORT_CONCURRENCY)
+    pending = list(reversed(sources))
+    running: Dict["asyncio.Task[Dict[str, Any]]", str] = {}
+    batch: List[Tuple[str, cv_schemas.CVCreate]] = []
+    imported = failed = processed = 0
+    db = SessionLocal()
+    try:
+        yield _ndjson({"type": "start", "files": total, "structure": mode})
+        while pending or running:
+            while pending and len(running) < window:
+                source = pending.pop()
+                running[asyncio.ensure_future(_process(source, mode, user, template_id))] = source.name
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                del running[task]
+                result = task.result()
+                processed += 1
+                cv = result.pop("cv", None)
+                if cv is None:
+                    failed += 1
+                else:
+                    batch.append((result["file"], cv))
+                yield _ndjson({"type": "file", "index": processed, "total": total, **result})
+
+            if batch and (len(batch) >= settings.IMPORT_BATCH_SIZE or not (pending or running)):
+                files = [name for name, _ in batch]
+                try:
+                    ids = await asyncio.to_thread(_insert_batch, db, [cv for _, cv in batch], user_id)
+                except Exception as e:
+                    logger.error(f"❌ Import batch failed: {e}")
+                    failed += len(batch)
+                    yield _ndjson({"type": "batch", "status": "failed", "files": files, "error": "Database error"})
+                else:
+                    imported += len(ids)
+                    yield _ndjson({"type": "batch", "status": "committed", "files": files, "cv_ids": ids})
+                batch = []
+
+        seconds = round(time.monotonic() - started, 3)
+        logger.info(f"📥 Imported {imported}/{total} CVs for user {user_id} in {seconds}s")
+        yield _ndjson({"type": "done", "imported": imported, "failed": failed, "seconds": seconds})
+    finally:
+        for task in running:
+            task.cancel()
+        db.close()
+        if cleanup is not None:
+            await cleanup()
@@ -0,0 +1,197 @@
+import logging
+import math
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud import cv as cv_crud, export_job as export_job_crud
+from ..database import SessionLocal
+from . import export_service
+from .render_pool import RenderPoolFull
+from .template_repository import template_repository
+
+logger = logging.getLogger("cv_api")
+
+
+class ExportJobQueue:
+    """
+    In-process export worker backed by the export_jobs table.
+
+    Job state lives in the database; the queue itself only carries job ids.
+    No external broker. Every process queues every "queued" job on startup,
+    and a worker only renders a job it claimed with a conditional UPDATE, so
+    each job runs once however many processes share the table. Jobs left
+    "running" by a dead process are re-queued after stale_seconds.
+
+    A DB session is held only to claim/load a job and to store its result,
+    never across the render.
+    """
+
+    PURGE_INTERVAL_SECONDS = 60
+
+    def __init__(self, session_factory: Callable[[], Session], workers: int = 2, job_ttl_seconds: int = 3600,
+                 stale_seconds: int = 600):
+        self._session_factory = session_factory
+        self.workers = max(1, workers)
+        self.job_ttl_seconds = job_ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._avg_seconds = 5.0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._sweep()
+        db = self._session_factory()
+        try:
+            pending = export_job_crud.get_queued_job_ids(db)
+        finally:
+            db.close()
+        for job_id in pending:
+            self._queue.put(job_id)
+        if pending:
+            logger.info(f"🔁 Re-queued {len(pending)} export jobs.")
+
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"export-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    def enqueue(self, job_id: str) -> None:
+        self._queue.put(job_id)
+
+    def retry_after(self) -> int:
+        """Seconds until a user at the per-user cap can expect one of their jobs to finish."""
+        return max(1, math.ceil(self._avg_seconds * (self._queue.qsize() + 1) / self.workers))
+
+    def _work(self) -> None:
+        while True:
+            try:
+                job_id = self._queue.get(timeout=self.PURGE_INTERVAL_SECONDS)
+            except queue.Empty:
+                job_id = ""
+            if job_id is None:
+                return
+            # Checked on every dequeue, so a busy queue still purges
+            if time.monotonic() - self._last_sweep >= self.PURGE_INTERVAL_SECONDS:
+                self._sweep()
+            if job_id:
+                self.process(job_id)
+
+    def _sweep(self) -> None:
+        """Deletes expired jobs and re-queues stale running ones."""
+        with self._lock:
+            self._last_sweep = time.monotonic()
+        db = self._session_factory()
+        try:
+            export_job_crud.delete_expired_jobs(db, self.job_ttl_seconds)
+            for job_id in export_job_crud.requeue_stale_jobs(db, self.stale_seconds):
+                self._queue.put(job_id)
+        except Exception as e:
+            logger.error(f"Export job purge failed: {e}")
+        finally:
+            db.close()
+
+    def process(self, job_id: str) -> None:
+        started = time.monotonic()
+        try:
+            task = self._claim(job_id)
+            if task is None:
+                return
+            cv_dict, tmpl, fmt = task
+            while True:
+                try:
+                    result = export_service.render_export(cv_dict, tmpl, fmt)
+                    break
+                except RenderPoolFull as e:
+                    # Background jobs wait for a render slot instead of failing
+                    time.sleep(e.retry_after)
+        except Exception as e:
+            logger.error(f"Export job {job_id} failed: {e}")
+            self._finish(job_id, error=str(e))
+            return
+
+        self._finish(job_id, result=result)
+        with self._lock:
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - started)
+
+    def _claim(self, job_id: str) -> Optional[Tuple[Dict[str, Any], Any, str]]:
+        """Claims a queued job and loads what the render needs; None if there is nothing to render."""
+        db = self._session_factory()
+        try:
+            if not export_job_crud.claim_job(db, job_id):
+                with self._lock:
+                    self.skipped += 1
+                return None
+            job = export_job_crud.get_job_by_id(db, job_id)
+            db_cv = cv_crud.get_cv(db, job.cv_id, job.user_id)
+            tmpl = template_repository.get_or_default(str(db_cv.template_id)) if db_cv else None
+            if not db_cv or not tmpl:
+                export_job_crud.mark_failed(db, job, "CV not found" if not db_cv else "Default Template missing")
+                self._count(failed=True)
+                return None
+            return export_service.cv_data_to_dict(db_cv.data), tmpl, job.format
+        finally:
+            db.close()
+
+    def _finish(self, job_id: str, result: Optional[export_service.ExportResult] = None,
+                error: Optional[str] = None) -> None:
+        db = self._session_factory()
+        try:
+            job = export_job_crud.get_job_by_id(db, job_id)
+            if job is None:
+                return  # deleted while rendering
+            if result is not None:
+                export_job_crud.mark_done(db, job, result.content, result.media_type, result.filename)
+            else:
+                export_job_crud.mark_failed(db, job, error or "Export failed")
+        except Exception as e:
+            logger.error(f"Export job {job_id}: could not store the result: {e}")
+            db.rollback()
+            result = None
+        finally:
+            db.close()
+        self._count(failed=result is None)
+
+    def _count(self, failed: bool) -> None:
+        with self._lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "queued": self._queue.qsize(),
+                "completed": self.completed,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "avg_job_seconds": round(self._avg_seconds, 3),
+            }
+
+
+export_jobs = ExportJobQueue(
+    SessionLocal,
+    workers=settings.EXPORT_JOB_WORKERS,
+    job_ttl_seconds=settings.EXPORT_JOB_TTL_SECONDS,
+    stale_seconds=settings.EXPORT_JOB_STALE_SECONDS,
+)
@@ -0,0 +1,237 @@
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+import time
+import zipfile
+
+from . import file_service, pdf_cache
+from .render_pool import render_pool, RenderPoolFull, RenderTimeout
+from .renderer import normalize_cv_dict, render_template_internal
+
+logger = logging.getLogger("cv_api")
+
+EXPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "html": "text/html",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+# ---------------------------------------------------------
+# EXPORT RENDERING (shared by sync export, export jobs, batch export)
+# ---------------------------------------------------------
+class ExportResult(NamedTuple):
+    content: bytes
+    media_type: str
+    filename: str
+
+
+def _ensure_str_keys(o: Any) -> Any:
+    """Decodes any bytes keys/values that may exist in a stored CV blob."""
+    if isinstance(o, dict):
+        new = {}
+        for k, v in o.items():
+            if isinstance(k, (bytes, bytearray)):
+                try:
+                    key = k.decode("utf-8")
+                except Exception:
+                    key = k.decode("latin-1", errors="ignore")
+            else:
+                key = k if isinstance(k, str) else str(k)
+            new[key] = _ensure_str_keys(v)
+        return new
+    if isinstance(o, list):
+        return [_ensure_str_keys(i) for i in o]
+    if isinstance(o, (bytes, bytearray)):
+        try:
+            return o.decode("utf-8")
+        except Exception:
+            return o.decode("latin-1", errors="ignore")
+    return o
+
+
+def cv_data_to_dict(data_source: Any) -> Dict[str, Any]:
+    """Turns a CV row's data column (dict, pydantic model, ...) into a plain Dict[str, Any]."""
+    if hasattr(data_source, "model_dump"):
+        cv_dict = data_source.model_dump()
+    elif hasattr(data_source, "dict"):
+        cv_dict = data_source.dict()
+    else:
+        cv_dict = data_source
+
+    try:
+        if not isinstance(cv_dict, dict):
+            cv_dict = dict(cv_dict)  # type: ignore
+    except Exception:
+        cv_dict = {}
+
+    return _ensure_str_keys(cv_dict)
+
+
+def _pdf_task(cv_dict: Dict[str, Any], tmpl: Any) -> Tuple[Any, ...]:
+    """The render_pool task (fn + args) that renders tmpl, or its diagnostic error PDF."""
+    return (file_service.create_pdf_or_error, tmpl.html_content, tmpl.css_styles, cv_dict,
+            str(tmpl.id), tmpl.updated_at)
+
+
+def _store_pdf(cache_key: str, pdf_bytes: bytes, error: Any) -> bytes:
+    if error is not None:
+        logger.error(f"PDF Render Error: {error}")
+        return pdf_bytes
+    pdf_cache.pdf_cache.set(cache_key, pdf_bytes)
+    return pdf_bytes
+
+
+def render_pdf_cached(cv_dict: Dict[str, Any], tmpl: Any) -> bytes:
+    """
+    PDF bytes for a CV: served from pdf_cache when possible, otherwise rendered
+    in the render pool. A template that fails to render yields the (uncached)
+    diagnostic error PDF, produced by the same pool task. RenderPoolFull /
+    RenderTimeout / RenderWorkerCrashed propagate to the caller.
+    """
+    cache_key = pdf_cache.make_key(cv_dict, str(tmpl.id), tmpl.updated_at)
+    pdf_bytes = pdf_cache.pdf_cache.get(cache_key)
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    pdf_bytes, error = render_pool.run(*_pdf_task(cv_dict, tmpl))
+    return _store_pdf(cache_key, pdf_bytes, error)
+
+
+async def render_pdf_cached_async(cv_dict: Dict[str, Any], tmpl: Any) -> bytes:
+    """render_pdf_cached() for async callers: awaits the pool instead of blocking a thread on it."""
+    cache_key = pdf_cache.make_key(cv_dict, str(tmpl.id), tmpl.updated_at)
+    pdf_bytes = pdf_cache.pdf_cache.get(cache_key)
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    pdf_bytes, error = await asyncio.wrap_future(render_pool.submit(*_pdf_task(cv_dict, tmpl)))
+    return _store_pdf(cache_key, pdf_bytes, error)
+
+
+def render_export(cv_dict: Dict[str, Any], tmpl: Any, fmt: str) -> ExportResult:
+    """Renders a CV in one of EXPORT_MEDIA_TYPES. Raises ValueError for unknown formats."""
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    if fmt == "pdf":
+        content = render_pdf_cached(cv_dict, tmpl)
+    elif fmt == "html":
+        content = render_template_internal(
+            tmpl.html_content, tmpl.css_styles, cv_dict,
+            template_id=str(tmpl.id), updated_at=tmpl.updated_at
+        ).encode("utf-8")
+    else:
+        content = file_service.create_docx_from_data(normalize_cv_dict(cv_dict))
+
+    return ExportResult(content, EXPORT_MEDIA_TYPES[fmt], f"resume.{fmt}")
+
+
+async def render_export_async(cv_dict: Dict[str, Any], tmpl: Any, fmt: str) -> ExportResult:
+    """render_export() for async routes: PDFs await the render pool, HTML/DOCX run on a thread."""
+    if fmt != "pdf":
+        return await asyncio.to_thread(render_export, cv_dict, tmpl, fmt)
+    content = await render_pdf_cached_async(cv_dict, tmpl)
+    return ExportResult(content, EXPORT_MEDIA_TYPES[fmt], f"resume.{fmt}")
+
+
+# ---------------------------------------------------------
+# BATCH EXPORT (streaming ZIP)
+# ---------------------------------------------------------
+class BatchItem(NamedTuple):
+    name: str               # archive member name without extension
+    cv_dict: Dict[str, Any]
+    tmpl: Any
+
+
+def _batch_pdf_entry(item: BatchItem, cache_key: Optional[str], future: Future) -> Tuple[str, bytes]:
+    """Waits for one batch render; failures become an error entry instead of ending the archive."""
+    try:
+        content, error = future.result()
+    except RenderTimeout:
+        return f"{item.name}.error.txt", b"PDF rendering timed out"
+    except Exception as e:
+        logger.error(f"PDF Render Error ({item.name}): {e}")
+        return f"{item.name}.error.txt", f"PDF rendering failed: {e}".encode("utf-8")
+    if error is not None:
+        logger.error(f"PDF Render Error ({item.name}): {error}")
+    elif cache_key is not None:
+        pdf_cache.pdf_cache.set(cache_key, content)
+    return f"{item.name}.pdf", content
+
+
+def iter_batch_renders(items: List[BatchItem], fmt: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yields (member name, content) in the order of items.
+
+    PDFs run in parallel on the render pool, at most one in-flight render per
+    worker, submitted ahead of the entry being yielded; cache hits take a
+    read-ahead slot without rendering. A CV that fails to render yields a
+    "<name>.error.txt" entry in its place.
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    if fmt != "pdf":
+        for item in items:
+            yield f"{item.name}.{fmt}", render_export(item.cv_dict, item.tmpl, fmt).content
+        return
+
+    window = max(1, render_pool.processes)
+    pending = deque(items)
+    ahead: Deque[Tuple[BatchItem, Optional[str], Future]] = deque()
+
+    while pending or ahead:
+        while pending and len(ahead) < window:
+            item = pending[0]
+            cache_key: Optional[str] = pdf_cache.make_key(item.cv_dict, str(item.tmpl.id), item.tmpl.updated_at)
+            cached = pdf_cache.pdf_cache.get(cache_key)
+            if cached is not None:
+                future: Future = Future()
+                future.set_result((cached, None))
+                cache_key = None
+            else:
+                try:
+                    # With entries of our own ahead, yield those instead of waiting for a free slot
+                    task = _pdf_task(item.cv_dict, item.tmpl)
+                    future = render_pool.submit(*task) if ahead else render_pool.submit_blocking(*task)
+                except RenderPoolFull:
+                    break
+            pending.popleft()
+            ahead.append((item, cache_key, future))
+
+        # The pool enforces the render timeout (and recycles a hung worker)
+        yield _batch_pdf_entry(*ahead.popleft())
+
+
+class _ZipSink:
+    """Write-only, non-seekable sink: zipfile falls back to data descriptors."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        return chunk
+
+
+def stream_zip(entries: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Writes entries into a ZIP and yields it chunk by chunk; never holds the whole archive."""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w") as zf:  # type: ignore[arg-type]
+        for name, content in entries:
+            # PDFs and DOCX are already compressed
+            compress = zipfile.ZIP_DEFLATED if name.endswith((".html", ".txt")) else zipfile.ZIP_STORED
+            zf.writestr(zipfile.ZipInfo(name, date_time=time.localtime()[:6]), content, compress_type=compress)
+            yield sink.drain()
+    yield sink.drain()
+
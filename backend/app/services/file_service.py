@@ -1,145 +1,181 @@
-import pystache
-from weasyprint import HTML, CSS
+from weasyprint import HTML, CSS, default_url_fetcher
+from weasyprint.text.fonts import FontConfiguration
+from collections import OrderedDict
+import hashlib
 import io
 import docx
 import re
+import threading
 
-def ensure_clean_hex(color_value, default_hex="333333"):
-    """
-    Returns a clean 6-character HEX string WITHOUT the # prefix.
-    This is for data that will be rendered into templates that have #{{color}}.
-    
-    Examples:
-        "#2c3e50" -> "2c3e50"
-        "2c3e50"  -> "2c3e50"
-        "invalid" -> "333333" (default)
-    """
-    if not color_value:
-        return default_hex
+from . import renderer
+
+# ---------------------------------------------------------
+# SHARED WEASYPRINT RESOURCES (per process)
+# ---------------------------------------------------------
+# Stylesheets only vary by template + accent/text colour + font, so the same
+# few compiled CSS strings come back over and over. Parsed CSS objects are
+# cached by the hash of the compiled CSS (covers every input that can affect
+# it), together with one FontConfiguration and a caching url_fetcher.
+STYLESHEET_CACHE_SIZE = 32
+URL_CACHE_SIZE = 64
+URL_CACHE_MAX_ITEM_BYTES = 5 * 1024 * 1024
+
+_resource_lock = threading.Lock()
+_font_config = None
+_stylesheets = OrderedDict()
+_fetched_urls = OrderedDict()
+
+
+def get_font_config():
+    global _font_config
+    with _resource_lock:
+        if _font_config is None:
+            _font_config = FontConfiguration()
+        return _font_config
 
-    s = str(color_value).strip()
-    clean_hex = s.lstrip("#")
 
-    if re.fullmatch(r"[0-9a-fA-F]{3}|[0-9a-fA-F]{6}", clean_hex):
-        if len(clean_hex) == 3:
-            clean_hex = ''.join([c*2 for c in clean_hex])
-        return clean_hex
+def cached_url_fetcher(url, *args, **kwargs):
+    """default_url_fetcher with a small LRU for remote fonts and images (data: URLs bypass it)."""
+    if url.startswith("data:"):
+        return default_url_fetcher(url, *args, **kwargs)
 
-    return default_hex
+    with _resource_lock:
+        hit = _fetched_urls.get(url)
+        if hit is not None:
+            _fetched_urls.move_to_end(url)
+            return dict(hit)
 
-def create_pdf_from_template(template_html: str, template_css: str, cv_data: dict) -> bytes:
+    result = default_url_fetcher(url, *args, **kwargs)
+    if "file_obj" in result:
+        result["string"] = result.pop("file_obj").read()
+
+    if len(result.get("string") or b"") <= URL_CACHE_MAX_ITEM_BYTES:
+        with _resource_lock:
+            _fetched_urls[url] = dict(result)
+            while len(_fetched_urls) > URL_CACHE_SIZE:
+                _fetched_urls.popitem(last=False)
+    return result
+
+
+def get_stylesheet(compiled_css: str):
+    """Parsed WeasyPrint CSS for a compiled stylesheet, parsed once per process."""
+    key = hashlib.sha1(compiled_css.encode("utf-8")).hexdigest()
+    with _resource_lock:
+        style = _stylesheets.get(key)
+        if style is not None:
+            _stylesheets.move_to_end(key)
+            return style
+
+    style = CSS(string=compiled_css, font_config=get_font_config(), url_fetcher=cached_url_fetcher)
+
+    with _resource_lock:
+        _stylesheets[key] = style
+        while len(_stylesheets) > STYLESHEET_CACHE_SIZE:
+            _stylesheets.popitem(last=False)
+    return style
+
+def create_pdf_from_template(template_html: str, template_css: str, cv_data: dict, strict: bool = False,
+                             template_id: str = "", updated_at=None) -> bytes:
     """
     Renders CV template with Mustache and generates PDF using WeasyPrint.
     
     Templates should have CSS like: --primary: #{{accent_color}};
     And we pass accent_color WITHOUT the # (e.g., "2c3e50").
+
+    With strict=True render errors are raised instead of being turned into
+    an error PDF (used by callers that cache the result).
     """
     
-    # Extract and Clean Colors (NO # prefix - templates add it)
-    accent = ensure_clean_hex(
-        cv_data.get('accentColor') or cv_data.get('accent_color'), 
-        "2c3e50"
-    )
-    text_col = ensure_clean_hex(
-        cv_data.get('textColor') or cv_data.get('text_color'), 
-        "333333"
-    )
-    
-    # Extract and Sanitize Font
-    font_name = cv_data.get('fontFamily') or cv_data.get('font_family') or "sans-serif"
-    font_name = re.sub(r'[;"\'#]+', '', font_name).strip()
-
-    # Prepare Render Data for Mustache
-    render_data = {
-        **cv_data,
-        "accent_color": accent,
-        "text_color": text_col,
-        "font_family": font_name,
-        "experience": (cv_data.get('experience') or '').replace('\n', '<br/>'),
-        "education": (cv_data.get('education') or '').replace('\n', '<br/>'),
-        "summary": (cv_data.get('summary') or '').replace('\n', '<br/>'),
-        "skills": cv_data.get('skills') if isinstance(cv_data.get('skills'), list) else []
-    }
-
-    if isinstance(cv_data.get('skills'), str):
-        render_data["skills"] = [s.strip() for s in cv_data.get('skills').split(',') if s.strip()]
-
     try:
-        # Render Templates
-        compiled_html = pystache.render(template_html, render_data)
-        compiled_css = pystache.render(template_css, render_data)
-        
-        # CSS Post-Processing (Safety Net)
-        if "##" in compiled_css:
-            compiled_css = compiled_css.replace("##", "#")
-        
-        compiled_css = re.sub(r':\s*#\s*;', f': #{text_col};', compiled_css)
-        compiled_css = re.sub(r':\s*#\s*\}', f': #{text_col}', compiled_css)
-        compiled_css = re.sub(r'#\s+([0-9a-fA-F])', r'#\1', compiled_css)
+        # Render Templates (compiled once per template version, CSS fixups included)
+        rendered = renderer.render(template_html, template_css, cv_data, template_id, updated_at)
+        compiled_html, compiled_css = rendered.body, rendered.css
 
         # Generate PDF
-        doc = HTML(string=compiled_html)
-        style = CSS(string=compiled_css)
-        pdf_bytes = doc.write_pdf(stylesheets=[style], presentational_hints=True)
+        doc = HTML(string=compiled_html, url_fetcher=cached_url_fetcher)
+        style = get_stylesheet(compiled_css)
+        pdf_bytes = doc.write_pdf(stylesheets=[style], font_config=get_font_config(), presentational_hints=True)
         
         return pdf_bytes
 
     except Exception as e:
-        # Generate error PDF with diagnostic info
-        err_html = f"""
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: monospace;
-                    padding: 40px;
-                    background-color: #fff5f5;
-                    color: #c53030;
-                }}
-                h1 {{
-                    border-bottom: 3px solid #c53030;
-                    padding-bottom: 10px;
-                }}
-                .error-box {{
-                    background: white;
-                    border: 2px solid #fc8181;
-                    border-radius: 8px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }}
-                .debug-info {{
-                    background: #f7fafc;
-                    border-left: 4px solid #4299e1;
-                    padding: 15px;
-                    margin-top: 20px;
-                    font-size: 12px;
-                }}
-            </style>
-        </head>
-        <body>
-            <h1>⚠️ PDF Generation Error</h1>
-            <div class="error-box">
-                <strong>Error Message:</strong>
-                <pre>{str(e)}</pre>
-            </div>
-            <div class="debug-info">
-                <strong>Debug Information:</strong><br/>
-                • Accent Color: {accent}<br/>
-                • Text Color: {text_col}<br/>
-                • Font Family: {font_name}<br/>
-                <br/>
-                <strong>Common Fixes:</strong><br/>
-                1. Check that CSS template uses #{{{{accent_color}}}} (with hash)<br/>
-                2. Verify color values are valid 6-char hex codes<br/>
-                3. Run /api/setup_production to resync templates
-            </div>
-        </body>
-        </html>
-        """
-        try:
-            return HTML(string=err_html).write_pdf()
-        except:
-            return b"PDF Generation Failed - See Server Logs"
+        if strict:
+            raise
+        return _error_pdf(e, cv_data)
+
+
+def create_pdf_or_error(template_html: str, template_css: str, cv_data: dict,
+                        template_id: str = "", updated_at=None):
+    """
+    (pdf bytes, None) on success, or (diagnostic error PDF, error message)
+    when the template fails to render. One call, so the render pool can hand
+    back the error PDF without a second render (callers skip caching it).
+    """
+    try:
+        return create_pdf_from_template(template_html, template_css, cv_data, True, template_id, updated_at), None
+    except Exception as e:
+        return _error_pdf(e, cv_data), str(e)
+
+
+def _error_pdf(e: Exception, cv_data: dict) -> bytes:
+    """Error PDF with diagnostic info, shown instead of the CV when rendering fails."""
+    context = renderer.build_context(cv_data)
+    accent, text_col, font_name = context["accent_color"], context["text_color"], context["font_family"]
+    # Generate error PDF with diagnostic info
+    err_html = f"""
+    <html>
+    <head>
+        <style>
+            body {{
+                font-family: monospace;
+                padding: 40px;
+                background-color: #fff5f5;
+                color: #c53030;
+            }}
+            h1 {{
+                border-bottom: 3px solid #c53030;
+                padding-bottom: 10px;
+            }}
+            .error-box {{
+                background: white;
+                border: 2px solid #fc8181;
+                border-radius: 8px;
+                padding: 20px;
+                margin: 20px 0;
+            }}
+            .debug-info {{
+                background: #f7fafc;
+                border-left: 4px solid #4299e1;
+                padding: 15px;
+                margin-top: 20px;
+                font-size: 12px;
+            }}
+        </style>
+    </head>
+    <body>
+        <h1>⚠️ PDF Generation Error</h1>
+        <div class="error-box">
+            <strong>Error Message:</strong>
+            <pre>{str(e)}</pre>
+        </div>
+        <div class="debug-info">
+            <strong>Debug Information:</strong><br/>
+            • Accent Color: {accent}<br/>
+            • Text Color: {text_col}<br/>
+            • Font Family: {font_name}<br/>
+            <br/>
+            <strong>Common Fixes:</strong><br/>
+            1. Check that CSS template uses #{{{{accent_color}}}} (with hash)<br/>
+            2. Verify color values are valid 6-char hex codes<br/>
+            3. Run /api/setup_production to resync templates
+        </div>
+    </body>
+    </html>
+    """
+    try:
+        return HTML(string=err_html).write_pdf()
+    except:
+        return b"PDF Generation Failed - See Server Logs"
 
 
 def create_docx_from_data(cv_data: dict) -> bytes:
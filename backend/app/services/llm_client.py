@@ -0,0 +1,150 @@
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+from ..core.config import settings
+
+# Provider name -> (API key setting, default base URL, model)
+PROVIDERS: Dict[str, Tuple[str, str, str]] = {
+    "groq": ("GROQ_API_KEY", "https://api.groq.com/openai/v1", "llama-3.3-70b-versatile"),
+    "openai": ("OPENAI_API_KEY", "https://api.openai.com/v1", "gpt-4o-mini"),
+}
+# Priority: Groq > OpenAI
+PROVIDER_ORDER = ("groq", "openai")
+
+
+def _api_key(provider: str) -> Optional[str]:
+    key_name = PROVIDERS[provider][0]
+    # settings reads backend/.env; ai_service also loads the repo-root .env into os.environ
+    return getattr(settings, key_name, None) or os.getenv(key_name)
+
+
+def _base_url(provider: str) -> str:
+    override = getattr(settings, f"{provider.upper()}_BASE_URL", None)
+    return override or PROVIDERS[provider][1]
+
+
+class LLMClients:
+    """
+    One long-lived AsyncOpenAI client per configured provider.
+
+    Every client sits on its own httpx.AsyncClient, so connections (and TLS
+    sessions) are kept alive and reused across requests instead of being
+    rebuilt per call. Created in the app lifespan; falls back to lazy
+    creation for scripts that never run it.
+    """
+
+    def __init__(self, max_connections: int, max_keepalive: int, keepalive_seconds: float, timeout_seconds: float):
+        self.max_connections = max(1, max_connections)
+        self.max_keepalive = max(0, max_keepalive)
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout_seconds = timeout_seconds
+        self._clients: Dict[str, AsyncOpenAI] = {}
+        self.requests = 0
+        self.errors = 0
+
+    def _build(self, provider: str, api_key: str) -> AsyncOpenAI:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_seconds,
+            ),
+            timeout=httpx.Timeout(self.timeout_seconds, connect=10.0),
+        )
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=_base_url(provider),
+            http_client=http_client,
+        )
+
+    def start(self) -> List[str]:
+        """Creates clients for every provider with an API key. Returns their names."""
+        for provider in PROVIDER_ORDER:
+            api_key = _api_key(provider)
+            if api_key and provider not in self._clients:
+                self._clients[provider] = self._build(provider, api_key)
+        return list(self._clients)
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            try:
+                await client.close()
+            except Exception:
+                # Connections opened on a loop that is already gone can't be closed cleanly
+                pass
+
+    def providers(self) -> List[str]:
+        if not self._clients:
+            self.start()
+        return [p for p in PROVIDER_ORDER if p in self._clients]
+
+    def get(self, provider: Optional[str] = None) -> Tuple[Optional[AsyncOpenAI], str]:
+        """Returns (client, model) for the given or preferred provider; client is None without keys."""
+        available = self.providers()
+        if provider is None:
+            provider = available[0] if available else PROVIDER_ORDER[0]
+        return self._clients.get(provider), PROVIDERS[provider][2]
+
+    def _client_for(self, provider: Optional[str], max_retries: Optional[int]) -> Tuple[AsyncOpenAI, str]:
+        client, model_name = self.get(provider)
+        if client is None:
+            raise ValueError("No API Key")
+        if max_retries is not None:
+            client = client.with_options(max_retries=max_retries)
+        return client, model_name
+
+    async def chat(self, messages: List[Dict[str, Any]], provider: Optional[str] = None,
+                   max_retries: Optional[int] = None, **kwargs: Any) -> str:
+        """One chat completion; returns the message content. Raises ValueError without an API key."""
+        client, model_name = self._client_for(provider, max_retries)
+        self.requests += 1
+        try:
+            response = await client.chat.completions.create(model=model_name, messages=messages, **kwargs)
+        except Exception:
+            self.errors += 1
+            raise
+        return response.choices[0].message.content or ""
+
+    async def stream_chat(self, messages: List[Dict[str, Any]], provider: Optional[str] = None,
+                          max_retries: Optional[int] = None, **kwargs: Any) -> AsyncIterator[str]:
+        """Streaming chat completion; yields content deltas as they arrive."""
+        client, model_name = self._client_for(provider, max_retries)
+        self.requests += 1
+        try:
+            stream = await client.chat.completions.create(
+                model=model_name, messages=messages, stream=True, **kwargs
+            )
+        except Exception:
+            self.errors += 1
+            raise
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            # A stream dropped early (lost a hedge, client went away) releases its connection now
+            await stream.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "providers": [p for p in PROVIDER_ORDER if p in self._clients],
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+llm_clients = LLMClients(
+    max_connections=settings.LLM_MAX_CONNECTIONS,
+    max_keepalive=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_seconds=settings.LLM_KEEPALIVE_SECONDS,
+    timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+)
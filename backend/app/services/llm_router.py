@@ -0,0 +1,360 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from openai import APITimeoutError
+
+from ..core.config import settings
+from .llm_client import LLMClients, PROVIDERS, llm_clients
+
+
+class LatencyWindow:
+    """
+    Rolling latency samples with percentiles.
+
+    Calls that were cancelled (lost a hedge, caller went away) or timed out
+    are kept as censored samples: all we know is that the latency exceeded
+    their elapsed time. Dropping them would leave only the fast calls and
+    pull the hedge delay down, so percentiles use a Kaplan-Meier estimate
+    that counts them.
+    """
+
+    MIN_SAMPLES = 20
+
+    def __init__(self, size: int):
+        # (seconds, censored)
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=max(1, size))
+
+    def record(self, seconds: float, censored: bool = False) -> None:
+        self.samples.append((seconds, censored))
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.samples) < self.MIN_SAMPLES:
+            return None
+        # Product-limit estimate; at equal times completions sort before censored samples
+        ordered = sorted(self.samples)
+        at_risk = len(ordered)
+        survival = 1.0
+        for seconds, censored in ordered:
+            if not censored:
+                survival *= 1.0 - 1.0 / at_risk
+                if 1.0 - survival >= q - 1e-9:
+                    return seconds
+            at_risk -= 1
+        # The quantile lies beyond every completed call: use the longest wait seen
+        return ordered[-1][0]
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.50), self.percentile(0.95)
+        return {
+            "samples": len(self.samples),
+            "censored": sum(1 for _, censored in self.samples if censored),
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+        }
+
+
+class ProviderHealth:
+    """
+    Latency windows and consecutive-failure circuit breaker for one provider.
+
+    `latency` holds whole chat completions and sets the chat hedge delay;
+    `first_chunk` holds the time to a stream's first chunk and sets the
+    stream hedge delay. After the cooldown the breaker is half-open and lets
+    exactly one probe call through: its success closes the breaker, its
+    failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, window: int, failure_threshold: int, cooldown_seconds: float):
+        self.latency = LatencyWindow(window)
+        self.first_chunk = LatencyWindow(window)
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+        self.probes = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def allows(self) -> bool:
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.probing)
+
+    def begin(self) -> bool:
+        """Called as a call is launched; True when it is the half-open probe (end it with end_probe)."""
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            self.probes += 1
+            return True
+        return False
+
+    def end_probe(self) -> None:
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.errors += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "errors": self.errors,
+            "wins": self.wins,
+            "probes": self.probes,
+            **self.latency.stats(),
+            "first_chunk": self.first_chunk.stats(),
+        }
+
+
+class ProviderRouter:
+    """
+    Routes LLM calls across the configured providers (Groq > OpenAI).
+
+    - Open-circuit providers are skipped while a healthy one is available.
+    - When the primary has not answered within its own p95 (or the default
+      delay until enough samples exist), the same request is hedged to the
+      secondary. The first success wins and the other call is cancelled.
+    - An error from the primary fails over to the secondary right away.
+    Streams are hedged the same way on time to first chunk: the stream that
+    yields first is kept, and errors after that chunk are not retried.
+    """
+
+    def __init__(self, clients: LLMClients, hedge_enabled: bool, hedge_default_delay: float,
+                 hedge_min_delay: float, window: int, failure_threshold: int, cooldown_seconds: float):
+        self.clients = clients
+        self.hedge_enabled = hedge_enabled
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.health: Dict[str, ProviderHealth] = {
+            name: ProviderHealth(window, failure_threshold, cooldown_seconds) for name in PROVIDERS
+        }
+        self.hedges = 0
+        self.failovers = 0
+
+    def route(self) -> List[str]:
+        """Configured providers in try order: healthy first, open circuits last."""
+        configured = self.clients.providers()
+        healthy = [p for p in configured if self.health[p].allows()]
+        return healthy + [p for p in configured if p not in healthy]
+
+    def available(self) -> bool:
+        """True when at least one configured provider's circuit is not open."""
+        return any(self.health[p].allows() for p in self.clients.providers())
+
+    def model_for(self, provider: Optional[str] = None) -> str:
+        order = self.route()
+        provider = provider or (order[0] if order else "groq")
+        return PROVIDERS[provider][2]
+
+    def _hedge_delay(self, window: LatencyWindow) -> float:
+        p95 = window.percentile(0.95)
+        return max(self.hedge_min_delay, p95 if p95 is not None else self.hedge_default_delay)
+
+    async def _call(self, provider: str, probe: bool, messages: List[Dict[str, Any]], **kwargs: Any) -> str:
+        health = self.health[provider]
+        health.requests += 1
+        started = time.monotonic()
+        try:
+            # Retries are the router's job; client-side ones would delay failover
+            content = await self.clients.chat(messages, provider=provider, max_retries=0, **kwargs)
+        except asyncio.CancelledError:
+            health.latency.record(time.monotonic() - started, censored=True)
+            raise
+        except Exception as e:
+            if isinstance(e, (APITimeoutError, asyncio.TimeoutError)):
+                health.latency.record(time.monotonic() - started, censored=True)
+            health.record_failure()
+            raise
+        finally:
+            if probe:
+                health.end_probe()
+        health.latency.record(time.monotonic() - started)
+        health.record_success()
+        return content
+
+    async def chat(self, messages: List[Dict[str, Any]], **kwargs: Any) -> str:
+        """One chat completion through the router. Raises ValueError without an API key."""
+        order = self.route()
+        if not order:
+            raise ValueError("No API Key")
+        primary = order[0]
+        secondary = order[1] if len(order) > 1 else None
+
+        tasks: Dict["asyncio.Task[str]", str] = {}
+
+        def launch(provider: str) -> None:
+            # The half-open probe is claimed here, before anything awaits
+            probe = self.health[provider].begin()
+            tasks[asyncio.ensure_future(self._call(provider, probe, messages, **kwargs))] = provider
+
+        launch(primary)
+        backup_started = False
+        last_error: Optional[BaseException] = None
+        try:
+            timeout = self._hedge_delay(self.health[primary].latency) if (secondary and self.hedge_enabled) else None
+            while tasks:
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary slower than its p95: hedge to the secondary
+                    self.hedges += 1
+                    backup_started = True
+                    launch(secondary)  # type: ignore[arg-type]
+                    timeout = None
+                    continue
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.exception() is None:
+                        self.health[provider].wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    if secondary and not backup_started:
+                        self.failovers += 1
+                        backup_started = True
+                        launch(secondary)
+                        timeout = None
+            raise last_error  # type: ignore[misc]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _first_chunk(self, provider: str, messages: List[Dict[str, Any]],
+                           **kwargs: Any) -> Tuple[Optional[str], AsyncIterator[str]]:
+        """Opens a stream and waits for its first chunk. Returns (chunk or None when empty, stream)."""
+        health = self.health[provider]
+        health.requests += 1
+        started = time.monotonic()
+        stream = self.clients.stream_chat(messages, provider=provider, max_retries=0, **kwargs)
+        try:
+            first: Optional[str] = await stream.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except asyncio.CancelledError:
+            health.first_chunk.record(time.monotonic() - started, censored=True)
+            await stream.aclose()
+            raise
+        except Exception as e:
+            if isinstance(e, (APITimeoutError, asyncio.TimeoutError)):
+                health.first_chunk.record(time.monotonic() - started, censored=True)
+            health.record_failure()
+            raise
+        health.first_chunk.record(time.monotonic() - started)
+        return first, stream
+
+    async def stream_chat(self, messages: List[Dict[str, Any]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Streaming chat completion through the router. The secondary is
+        started when the primary has sent nothing within its first-chunk p95
+        (or fails before its first chunk); whichever stream yields first is
+        kept and the other is cancelled.
+        """
+        order = self.route()
+        if not order:
+            raise ValueError("No API Key")
+        primary = order[0]
+        secondary = order[1] if len(order) > 1 else None
+
+        tasks: Dict["asyncio.Task[Tuple[Optional[str], AsyncIterator[str]]]", Tuple[str, bool]] = {}
+
+        def launch(provider: str) -> None:
+            probe = self.health[provider].begin()
+            tasks[asyncio.ensure_future(self._first_chunk(provider, messages, **kwargs))] = (provider, probe)
+
+        launch(primary)
+        backup_started = False
+        last_error: Optional[BaseException] = None
+        winner: Optional[Tuple[str, bool, Optional[str], AsyncIterator[str]]] = None
+        try:
+            timeout = (self._hedge_delay(self.health[primary].first_chunk)
+                       if (secondary and self.hedge_enabled) else None)
+            while tasks and winner is None:
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # No chunk within the primary's first-chunk p95: hedge to the secondary
+                    self.hedges += 1
+                    backup_started = True
+                    launch(secondary)  # type: ignore[arg-type]
+                    timeout = None
+                    continue
+                for task in done:
+                    provider, probe = tasks.pop(task)
+                    if task.exception() is None:
+                        first, stream = task.result()
+                        if winner is None:
+                            winner = (provider, probe, first, stream)
+                            continue
+                        # Both produced a chunk in the same tick: keep the first
+                        await stream.aclose()  # type: ignore[attr-defined]
+                    else:
+                        last_error = task.exception()
+                        if secondary and not backup_started:
+                            self.failovers += 1
+                            backup_started = True
+                            launch(secondary)
+                            timeout = None
+                    if probe:
+                        self.health[provider].end_probe()
+        finally:
+            for task, (provider, probe) in tasks.items():
+                if not task.cancel() and not task.cancelled() and task.exception() is None:
+                    # Finished before it could be cancelled: close the unused stream
+                    await task.result()[1].aclose()  # type: ignore[attr-defined]
+                if probe:
+                    self.health[provider].end_probe()
+        if winner is None:
+            raise last_error  # type: ignore[misc]
+
+        provider, probe, first, stream = winner
+        health = self.health[provider]
+        health.wins += 1
+        try:
+            if first is not None:
+                yield first
+            async for piece in stream:
+                yield piece
+        except Exception:
+            health.record_failure()
+            raise
+        else:
+            health.record_success()
+        finally:
+            await stream.aclose()  # type: ignore[attr-defined]
+            if probe:
+                health.end_probe()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "order": self.route(),
+            "hedge_enabled": self.hedge_enabled,
+            "hedges": self.hedges,
+            "failovers": self.failovers,
+            "providers": {p: self.health[p].stats() for p in self.clients.providers()},
+        }
+
+
+llm_router = ProviderRouter(
+    llm_clients,
+    hedge_enabled=settings.LLM_HEDGE_ENABLED,
+    hedge_default_delay=settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS,
+    hedge_min_delay=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+    window=settings.LLM_LATENCY_WINDOW,
+    failure_threshold=settings.LLM_BREAKER_FAILURES,
+    cooldown_seconds=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+)
@@ -0,0 +1,138 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from ..schemas import ai as ai_schemas
+from .resume_scanner import split_sections
+
+# ========================================
+# LOCAL (OFFLINE) CV GENERATOR
+# ========================================
+# Deterministic, rule-based stand-in for the LLM: used when no API key is
+# configured, when AI_BACKEND = "local", and while every provider circuit
+# is open. Same inputs always give the same output.
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•▪●]|\d+[.)])\s+")
+_SKILL_SPLIT_RE = re.compile(r"\s*(?:,|;|\||•)\s*")
+
+MAX_POINTS = 6
+MAX_SKILLS = 12
+
+
+def _bullets(lines: List[str]) -> List[str]:
+    points = [_BULLET_RE.sub("", l) for l in lines if _BULLET_RE.match(l)]
+    return (points or lines)[:MAX_POINTS]
+
+
+def _skills(lines: List[str]) -> List[str]:
+    found: List[str] = []
+    for line in lines:
+        for part in _SKILL_SPLIT_RE.split(_BULLET_RE.sub("", line)):
+            if part and len(part) <= 40 and part.lower() not in (s.lower() for s in found):
+                found.append(part)
+    return found[:MAX_SKILLS]
+
+
+def _summary_from_request(request: ai_schemas.AIGenerationRequest, skills: List[str]) -> str:
+    level = (request.experience_level or "").strip()
+    title = (request.desired_job_title or "Professional").strip()
+    lead = f"{level} {title}".strip() if level and level.lower() not in title.lower() else title
+    if skills:
+        return f"{lead} with hands-on experience in {', '.join(skills[:3])}. Focused on delivering reliable results and growing with the team."
+    return f"{lead} focused on delivering reliable results and growing with the team."
+
+
+def generate_local(request: ai_schemas.AIGenerationRequest, raw_text: str = "",
+                   extracted_regex: Optional[Dict[str, Any]] = None) -> ai_schemas.AIGeneratedContent:
+    """Fills AIGeneratedContent from the request fields and, for uploads, the resume text."""
+    extracted_regex = extracted_regex or {}
+    skills = [s.strip() for s in request.top_skills if s and s.strip()]
+
+    if raw_text:
+        sections = split_sections(raw_text)
+        summary_lines = sections.get("summary") or sections.get("header", [])[1:4]
+        text_skills = _skills(sections.get("skills", []))
+        return ai_schemas.AIGeneratedContent(
+            full_name=extracted_regex.get("full_name") or request.full_name or "Candidate Name",
+            email=extracted_regex.get("email") or request.email or "",
+            phone=extracted_regex.get("phone") or "",
+            desired_job_title=request.desired_job_title or "Professional",
+            professional_summary=" ".join(summary_lines)[:600] or _summary_from_request(request, text_skills),
+            experience_points=_bullets(sections.get("experience", [])),
+            education_formatted="\n".join(sections.get("education", [])[:4]),
+            suggested_skills=text_skills or skills,
+        )
+
+    title = request.desired_job_title or "Professional"
+    points = [f"Delivered {title.lower()} work using {skill}" for skill in skills[:3]]
+    points.append("Collaborated with cross-functional teams to ship on schedule")
+    return ai_schemas.AIGeneratedContent(
+        full_name=request.full_name,
+        email=request.email,
+        phone="",
+        desired_job_title=title,
+        professional_summary=_summary_from_request(request, skills),
+        experience_points=points,
+        education_formatted="",
+        suggested_skills=skills,
+    )
+
+
+# --- SCRIPTED CHAT (same flow as the LLM system prompt) ---
+_QUESTIONS = (
+    "Great! What is your target **Job Title**?",
+    "Nice. What are your **Key Skills**? (comma separated)",
+    "And your **Experience Level**? (e.g. Junior, Mid, Senior)",
+)
+# How an assistant turn is recognised as asking each question (the
+# frontend greeting asks for the job title too)
+_QUESTION_KEYS = ("job title", "key skills", "experience level")
+
+
+def _asked(prompt: str) -> Optional[int]:
+    text = prompt.lower()
+    for index, key in enumerate(_QUESTION_KEYS):
+        if key in text:
+            return index
+    return None
+
+
+def local_chat_reply(history: List[Dict[str, Any]], latest_message: str) -> Dict[str, Any]:
+    """
+    Walks the greeting -> job title -> skills -> experience flow, then
+    triggers generation like the LLM would. Each answer is filed under the
+    question the preceding assistant turn asked (the next open one when no
+    known question precedes it). A user turn repeating the one right before
+    it is ignored, so re-sent or trimmed history can't shift answers into
+    the wrong slot.
+    """
+    turns = list(history) + [{"role": "user", "content": latest_message}]
+    answers: Dict[int, str] = {}
+    pending: Optional[int] = None
+    previous = None
+    for turn in turns:
+        content = (turn.get("content") or "").strip()
+        if turn.get("role") == "assistant":
+            pending = _asked(content)
+            previous = None
+        elif turn.get("role") == "user" and content and content != previous:
+            previous = content
+            slot = pending
+            if slot is None:
+                slot = next((i for i in range(len(_QUESTIONS)) if i not in answers), None)
+            if slot is not None:
+                answers[slot] = content
+            pending = None
+
+    missing = [i for i in range(len(_QUESTIONS)) if i not in answers]
+    if missing:
+        return {"reply": _QUESTIONS[missing[0]], "action": "chat", "data": None}
+
+    job, skills, level = (answers[i] for i in range(len(_QUESTIONS)))
+    skill_list = [s for s in _SKILL_SPLIT_RE.split(skills) if s]
+    data = {
+        "desired_job_title": job,
+        "top_skills": skill_list,
+        "experience_level": level,
+        "professional_summary": "",
+    }
+    return {"reply": "Perfect, building your CV now!", "action": "generate", "data": data}
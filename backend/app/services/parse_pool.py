@@ -0,0 +1,105 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, List, Optional, Tuple
+
+from ..core.config import settings
+from . import parser_service
+from .render_pool import RenderPool, RenderPoolFull
+
+# ========================================
+# RESUME PARSING OFF THE EVENT LOOP
+# ========================================
+# Same bounded spawn pool as the PDF renderer, sized separately. Workers only
+# import parser_service (pypdf / python-docx), never WeasyPrint.
+parse_pool = RenderPool(
+    processes=settings.PARSE_PROCESSES,
+    queue_depth=settings.PARSE_QUEUE_DEPTH,
+    timeout_seconds=settings.PARSE_TIMEOUT_SECONDS,
+)
+
+
+def _worker_path(upload: BinaryIO) -> Tuple[str, bool]:
+    """
+    A path the parse workers can open themselves, so page-range tasks carry
+    a file name instead of the document. The upload's own file when it has
+    one on disk, else a temp copy (in-memory and unnamed spools); the flag
+    says whether the caller must delete it.
+    """
+    name = getattr(upload, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name, False
+    fd, path = tempfile.mkstemp(prefix="parse-", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            upload.seek(0)
+            shutil.copyfileobj(upload, f)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, True
+
+
+async def _extract_pdf_parallel(upload: BinaryIO, filename: str, page_count: int,
+                                max_chars: Optional[int]) -> str:
+    """
+    Splits the pages into ranges and extracts one wave of ranges per pool
+    process at a time. Later waves are skipped once the budget is met, so a
+    long document only pays for the pages that are actually used. Any pool
+    failure other than RenderPoolFull falls back to the in-thread parser.
+    """
+    print(f"📄 Processing file: {filename} ({page_count} pages, parallel)")
+    path, temporary = await asyncio.to_thread(_worker_path, upload)
+    step = max(1, settings.PARSE_PAGES_PER_TASK)
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    wave = max(1, parse_pool.processes)
+
+    pages: List[str] = []
+    collected = 0
+    try:
+        for i in range(0, len(ranges), wave):
+            futures = [
+                asyncio.wrap_future(parse_pool.submit(parser_service.extract_pdf_range, path, start, stop, max_chars))
+                for start, stop in ranges[i:i + wave]
+            ]
+            for chunk in await asyncio.gather(*futures):
+                pages.extend(chunk)
+                collected += sum(len(p) + 1 for p in chunk)
+            if max_chars and collected >= max_chars:
+                break
+    except RenderPoolFull:
+        raise
+    except Exception as e:
+        # Worker crash, timeout, bad task: the upload itself may be fine
+        print(f"⚠️ Parallel parsing failed ({e!r}), parsing in a thread instead")
+        return await asyncio.to_thread(parser_service.extract_text, upload, filename, max_chars)
+    finally:
+        if temporary:
+            os.unlink(path)
+
+    text_content = "\n".join(pages)
+    if max_chars:
+        text_content = text_content[:max_chars]
+    print(f"✅ Extracted {len(text_content)} characters.")
+    return text_content
+
+
+async def extract_text_async(upload: BinaryIO, filename: str, max_chars: Optional[int] = None) -> str:
+    """
+    parser_service.extract_text without blocking the event loop. Long PDFs
+    are extracted page-parallel on the parse pool; everything else (and any
+    PDF while the pool is full) is parsed in a worker thread.
+    """
+    if parser_service.kind_for(filename) == "pdf" and parse_pool.processes > 0:
+        # Short PDFs are extracted in the same pass that counts their pages
+        text, page_count = await asyncio.to_thread(
+            parser_service.extract_short_pdf, upload, filename, settings.PARSE_PARALLEL_MIN_PAGES, max_chars
+        )
+        if text is not None:
+            return text
+        try:
+            return await _extract_pdf_parallel(upload, filename, page_count, max_chars)
+        except RenderPoolFull:
+            pass
+    return await asyncio.to_thread(parser_service.extract_text, upload, filename, max_chars)
@@ -1,29 +1,149 @@
-
 import io
+from typing import BinaryIO, List, Optional, Tuple, Union
+
 import pypdf
 import docx
 
-def extract_text(file_bytes: bytes, filename: str) -> str:
+# Magic bytes checked before any parser touches an upload
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"  # .docx is a zip container
+# PDF readers accept the header anywhere in the first 1KB
+SNIFF_BYTES = 1024
+
+KINDS = {".pdf": "pdf", ".docx": "docx", ".txt": "txt"}
+
+# Bump whenever extraction output changes; cached texts are keyed on it
+PARSER_VERSION = "1"
+
+
+class UploadRejected(Exception):
+    """Raised for uploads refused before parsing; carries the HTTP status to return."""
+
+    def __init__(self, status_code: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+
+
+def kind_for(filename: str) -> Optional[str]:
+    name = filename.lower()
+    for ext, kind in KINDS.items():
+        if name.endswith(ext):
+            return kind
+    return None
+
+
+def sniff(head: bytes, filename: str) -> str:
+    """
+    Returns the parser kind for an upload from its extension, after checking
+    the first bytes really are that kind of file. Raises UploadRejected (415).
+    """
+    kind = kind_for(filename)
+    if kind is None:
+        raise UploadRejected(415, "Unsupported file type (use PDF, DOCX or TXT)")
+    if kind == "pdf" and PDF_MAGIC not in head[:SNIFF_BYTES]:
+        raise UploadRejected(415, "File is not a valid PDF")
+    if kind == "docx" and not head.startswith(ZIP_MAGIC):
+        raise UploadRejected(415, "File is not a valid DOCX")
+    if kind == "txt" and b"\x00" in head:
+        raise UploadRejected(415, "File is not a text file")
+    return kind
+
+
+def extract_pdf_range(source: Union[bytes, str, BinaryIO, pypdf.PdfReader], start: int = 0,
+                      stop: Optional[int] = None, max_chars: Optional[int] = None) -> List[str]:
+    """
+    Text of pages [start, stop) (to the end without stop), stopping once max_chars have been collected.
+    Module-level so parse pool workers can run it on a file path: the file is
+    read lazily, so a worker only loads the xref and the pages it extracts.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return extract_pdf_range(f, start, stop, max_chars)
+    if isinstance(source, pypdf.PdfReader):
+        reader = source
+    else:
+        reader = pypdf.PdfReader(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+    pages: List[str] = []
+    collected = 0
+    end = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+    for index in range(start, end):
+        text = reader.pages[index].extract_text() or ""
+        pages.append(text)
+        collected += len(text) + 1
+        if max_chars and collected >= max_chars:
+            break
+    return pages
+
+
+def extract_short_pdf(source: BinaryIO, filename: str, max_pages: int,
+                      max_chars: Optional[int] = None) -> Tuple[Optional[str], int]:
+    """
+    Opens the PDF once. Below max_pages its text is extracted from that same
+    reader and returned with the page count; longer documents return
+    (None, page_count) untouched so the caller can split them.
+    ("", 0) when the PDF can't be read.
+    """
+    try:
+        source.seek(0)
+        reader = pypdf.PdfReader(source)
+        page_count = len(reader.pages)
+        if page_count >= max_pages:
+            return None, page_count
+        print(f"📄 Processing file: {filename}")
+        text_content = "\n".join(extract_pdf_range(reader, max_chars=max_chars))
+    except Exception as e:
+        print(f"❌ Parsing Error: {e}")
+        return "", 0
+    if max_chars:
+        text_content = text_content[:max_chars]
+    print(f"✅ Extracted {len(text_content)} characters.")
+    return text_content, page_count
+
+
+def extract_text(source: Union[bytes, BinaryIO], filename: str, max_chars: Optional[int] = None) -> str:
+    """
+    Extracts plain text from a PDF, DOCX or TXT upload. source is either the
+    raw bytes or a seekable binary file (e.g. the spooled upload), which the
+    parsers read in place instead of copying it into another buffer.
+    With max_chars, reading stops once that much text has been collected
+    and the result is cut to it.
+    """
     text_content = ""
+    stream: BinaryIO = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
     try:
         # Debug print
         print(f"📄 Processing file: {filename}")
-        
-        if filename.lower().endswith(".pdf"):
-            reader = pypdf.PdfReader(io.BytesIO(file_bytes))
-            text_content = "\n".join([page.extract_text() for page in reader.pages])
-            
-        elif filename.lower().endswith(".docx"):
-            doc = docx.Document(io.BytesIO(file_bytes))
-            text_content = "\n".join([p.text for p in doc.paragraphs])
-            
-        elif filename.lower().endswith(".txt"):
-            text_content = file_bytes.decode("utf-8")
-            
+        stream.seek(0)
+        kind = kind_for(filename)
+
+        if kind == "pdf":
+            text_content = "\n".join(extract_pdf_range(stream, max_chars=max_chars))
+
+        elif kind == "docx":
+            doc = docx.Document(stream)
+            paragraphs: List[str] = []
+            collected = 0
+            for p in doc.paragraphs:
+                paragraphs.append(p.text)
+                collected += len(p.text) + 1
+                if max_chars and collected >= max_chars:
+                    break
+            text_content = "\n".join(paragraphs)
+
+        elif kind == "txt":
+            if max_chars:
+                # UTF-8 is at most 4 bytes per character; a cut last character is dropped
+                text_content = stream.read(max_chars * 4).decode("utf-8", errors="ignore")
+            else:
+                text_content = stream.read().decode("utf-8")
+
+        if max_chars:
+            text_content = text_content[:max_chars]
         print(f"✅ Extracted {len(text_content)} characters.")
-        
+
     except Exception as e:
         print(f"❌ Parsing Error: {e}")
         return ""
-        
+
     return text_content
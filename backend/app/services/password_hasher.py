@@ -0,0 +1,128 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from ..core import security
+from ..core.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when every hashing worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing busy")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Dedicated, bounded thread pool for bcrypt.
+
+    bcrypt releases the GIL, so a few threads hash in parallel without
+    holding API threadpool slots. Admission is capped at workers +
+    queue_depth; beyond that callers get PasswordHasherBusy (surfaced as
+    503 + Retry-After), so a login storm queues here instead of starving
+    every other endpoint.
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = max(1, workers)
+        self.queue_depth = max(0, queue_depth)
+        self.capacity = self.workers + self.queue_depth
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._avg_seconds = 0.25
+        self._avg_wait_seconds = 0.0
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self._avg_seconds * self.capacity / self.workers))
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise PasswordHasherBusy(self.retry_after())
+            self.in_flight += 1
+        self.start()
+        queued_at = time.monotonic()
+
+        def job() -> T:
+            started = time.monotonic()
+            with self._lock:
+                self.running += 1
+                self._avg_wait_seconds = 0.8 * self._avg_wait_seconds + 0.2 * (started - queued_at)
+            try:
+                return fn(*args)
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(security.verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password)
+
+    async def rehash_if_needed(self, plain_password: str, hashed_password: str) -> Optional[str]:
+        """New hash at the current cost for an outdated one; None when current or when busy."""
+        if not security.password_needs_rehash(hashed_password):
+            return None
+        try:
+            new_hash = await self.hash(plain_password)
+        except PasswordHasherBusy:
+            return None  # next login will try again
+        with self._lock:
+            self.rehashed += 1
+        return new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "rounds": settings.BCRYPT_ROUNDS,
+                "in_flight": self.in_flight,
+                "running": self.running,
+                "queued": self.in_flight - self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "avg_hash_seconds": round(self._avg_seconds, 3),
+                "avg_wait_seconds": round(self._avg_wait_seconds, 3),
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_depth=settings.PASSWORD_HASH_QUEUE_DEPTH,
+)
@@ -0,0 +1,60 @@
+import hashlib
+import json
+from datetime import datetime
+from importlib import metadata
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from .blob_cache import build_store
+from .renderer import RENDER_VERSION
+
+# Colour / font options are keyed separately in normalized form
+STYLE_KEYS = ("accentColor", "accent_color", "textColor", "text_color", "fontFamily", "font_family")
+
+
+def _renderer_version() -> str:
+    try:
+        weasyprint = metadata.version("weasyprint")
+    except metadata.PackageNotFoundError:
+        weasyprint = ""
+    return f"{RENDER_VERSION}/weasyprint-{weasyprint}"
+
+
+# Renders from another renderer / WeasyPrint version never match
+RENDERER = _renderer_version()
+
+
+def _style_options(cv_data: Dict[str, Any]) -> Dict[str, str]:
+    accent = cv_data.get("accentColor") or cv_data.get("accent_color") or ""
+    text = cv_data.get("textColor") or cv_data.get("text_color") or ""
+    font = cv_data.get("fontFamily") or cv_data.get("font_family") or ""
+    return {
+        "accent": str(accent).strip().lstrip("#").lower(),
+        "text": str(text).strip().lstrip("#").lower(),
+        "font": str(font).strip(),
+    }
+
+
+def make_key(cv_data: Dict[str, Any], template_id: str, template_updated_at: Optional[datetime]) -> str:
+    """
+    Content address of a rendered PDF: canonical CV JSON + template version
+    + colour/font options + renderer version. Any change to one of them
+    yields a new key.
+    """
+    payload = {
+        "renderer": RENDERER,
+        "cv": {k: v for k, v in cv_data.items() if k not in STYLE_KEYS},
+        "template": [str(template_id), template_updated_at.isoformat() if template_updated_at else ""],
+        "style": _style_options(cv_data),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+pdf_cache = build_store(
+    settings.PDF_CACHE_BACKEND,
+    settings.PDF_CACHE_MAX_BYTES,
+    directory=settings.PDF_CACHE_DIR,
+    sqlite_path=settings.PDF_CACHE_SQLITE_PATH,
+    table="pdf_cache",
+)
@@ -0,0 +1,242 @@
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from . import file_service
+
+
+class RenderPoolFull(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("PDF renderer busy")
+        self.retry_after = retry_after
+
+
+class RenderTimeout(Exception):
+    """Raised when a render does not finish within the configured timeout."""
+
+
+class RenderWorkerCrashed(Exception):
+    """Raised when a worker process dies mid-task (OOM, segfault in a native lib)."""
+
+
+def _worker_main(conn: Any) -> None:
+    """Worker process loop: runs (fn, args, kwargs) tasks until the pipe closes."""
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        fn, args, kwargs = task
+        try:
+            reply = (True, fn(*args, **kwargs))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Result or exception that can't be pickled
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """One spawned worker process and the parent end of its pipe."""
+
+    def __init__(self, context: Any):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+
+class RenderPool:
+    """
+    Dedicated process pool for CPU-bound WeasyPrint renders.
+
+    Keeps PDF layout out of the API threadpool and off the GIL. Admission is
+    bounded at processes + queue_depth; beyond that callers get RenderPoolFull
+    (surfaced as 503 + Retry-After) instead of piling up behind the pool.
+    processes=0 renders inline, which is handy for local development.
+
+    Each task runs on its own worker process, driven by one of `processes`
+    threads. A task that exceeds timeout_seconds gets its worker killed and
+    replaced (a hung render can't be cancelled any other way), and only then
+    is its admission slot released. A crashed worker is replaced the same way.
+    """
+
+    def __init__(self, processes: int, queue_depth: int, timeout_seconds: float):
+        self.processes = max(0, processes)
+        self.queue_depth = max(0, queue_depth)
+        self.timeout_seconds = timeout_seconds
+        self.capacity = max(1, self.processes) + self.queue_depth
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        # spawn: workers must not inherit the server's threads / DB sockets
+        self._context = multiprocessing.get_context("spawn")
+        self._drivers: Optional[ThreadPoolExecutor] = None
+        self._idle: List[_Worker] = []
+        self._workers: Set[_Worker] = set()
+        self._lock = threading.Lock()
+        self._avg_seconds = 1.0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.recycled = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._drivers is None and self.processes > 0:
+                self._drivers = ThreadPoolExecutor(max_workers=self.processes, thread_name_prefix="render-pool")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            drivers, self._drivers = self._drivers, None
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+        if drivers is not None:
+            drivers.shutdown(wait=False, cancel_futures=True)
+        for worker in workers:
+            worker.kill()
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                self._workers.discard(worker)
+        worker = _Worker(self._context)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _checkin(self, worker: _Worker) -> None:
+        with self._lock:
+            if self._drivers is not None and worker in self._workers:
+                self._idle.append(worker)
+                return
+        worker.kill()  # pool was shut down meanwhile
+
+    def _recycle(self, worker: _Worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+            self.recycled += 1
+        worker.kill()
+
+    def _execute(self, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """Runs on a driver thread: one task on one worker, killing the worker on timeout."""
+        worker = self._checkout()
+        try:
+            worker.conn.send((fn, args, kwargs))
+            reply = worker.conn.recv() if worker.conn.poll(self.timeout_seconds) else None
+        except (EOFError, OSError):
+            self._recycle(worker)
+            raise RenderWorkerCrashed("Worker process exited unexpectedly")
+        except BaseException:
+            self._checkin(worker)  # e.g. the task itself could not be pickled
+            raise
+
+        if reply is None:
+            self._recycle(worker)
+            with self._lock:
+                self.timeouts += 1
+            raise RenderTimeout(f"Render exceeded {self.timeout_seconds}s")
+
+        self._checkin(worker)
+        ok, value = reply
+        if not ok:
+            raise value
+        return value
+
+    def retry_after(self) -> int:
+        workers = max(1, self.processes)
+        return max(1, math.ceil(self._avg_seconds * self.capacity / workers))
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queues fn on the pool, or raises RenderPoolFull when admission is closed."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise RenderPoolFull(self.retry_after())
+        return self._launch(fn, args, kwargs)
+
+    def submit_blocking(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Like submit(), but waits for an admission slot instead of raising RenderPoolFull."""
+        self._slots.acquire()
+        return self._launch(fn, args, kwargs)
+
+    def _launch(self, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Future:
+        """Starts a task that already holds an admission slot; the slot is freed when it finishes."""
+        started = time.monotonic()
+        with self._lock:
+            self.in_flight += 1
+
+        def _release(_: Future) -> None:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+            self._slots.release()
+
+        try:
+            if self.processes == 0:
+                future: Future = Future()
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                self.start()
+                future = self._drivers.submit(self._execute, fn, args, kwargs)  # type: ignore[union-attr]
+        except Exception:
+            _release(Future())
+            raise
+
+        future.add_done_callback(_release)
+        return future
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """submit() and wait; raises RenderTimeout / RenderWorkerCrashed from the worker side."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def render_pdf(self, template_html: str, template_css: str, cv_data: dict,
+                   template_id: str = "", updated_at: Any = None) -> Tuple[bytes, Optional[str]]:
+        """(pdf bytes, None), or (diagnostic error PDF, error message) when the template fails."""
+        return self.run(
+            file_service.create_pdf_or_error, template_html, template_css, cv_data, template_id, updated_at
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "capacity": self.capacity,
+                "workers": len(self._workers),
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "recycled": self.recycled,
+                "avg_render_seconds": round(self._avg_seconds, 3),
+            }
+
+
+render_pool = RenderPool(
+    processes=settings.PDF_RENDER_PROCESSES,
+    queue_depth=settings.PDF_RENDER_QUEUE_DEPTH,
+    timeout_seconds=settings.PDF_RENDER_TIMEOUT_SECONDS,
+)
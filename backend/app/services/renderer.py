@@ -0,0 +1,228 @@
+"""
+Single Mustache renderer shared by the HTML preview and the PDF export.
+
+Stored templates are compiled once (pystache.parse) and kept in
+compiled_templates. CSS source fixups that used to run as regex passes over
+every rendered stylesheet are applied to the template source at compile time.
+"""
+from typing import Any, Dict, NamedTuple
+import logging
+import re
+
+import pystache
+from pystache.parsed import ParsedTemplate
+
+from ..core import sanitizer
+from .template_cache import compiled_templates
+
+logger = logging.getLogger("cv_api")
+
+# Context keys that are always emitted as clean 6-char hex (no '#')
+COLOUR_KEYS = ("accent_color", "text_color")
+
+# Part of the rendered-PDF cache key: bump it with any change here or in
+# file_service (context, CSS fixups, stylesheet) that alters the output for
+# the same CV and template, or persistent caches keep serving old PDFs
+RENDER_VERSION = 1
+
+
+# ---------------------------------------------------------
+# DATA NORMALIZER (Fixes Validation Errors)
+# ---------------------------------------------------------
+def normalize_cv_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts incoming React JSON (camelCase) to Schema-Compliant (snake_case)
+    dictionary that matches the 'CVData' Pydantic model structure.
+    NOW WITH CUSTOM FIELDS SUPPORT!
+    """
+    normalized: Dict[str, Any] = {}
+
+    # 1. Key Mapping (React -> Schema)
+    key_map = {
+        # Basic Fields
+        "fullName": "full_name",
+        "jobTitle": "job_title",
+        "phone": "phone",
+        "email": "email",
+        "summary": "summary",
+        "experience": "experience",
+        "education": "education",
+        "skills": "skills",
+        
+        # NEW: Custom Sidebar Fields
+        "location": "location",
+        "hobbies": "hobbies",
+        "languages": "languages",
+        "certifications": "certifications",
+        
+        # NEW: Social Links
+        "linkedin": "linkedin",
+        "github": "github",
+        "portfolio": "portfolio"
+    }
+
+    # Transfer existing keys
+    for k, v in data.items():
+        if k in key_map:
+            normalized[key_map[k]] = v
+        elif k in key_map.values():
+            normalized[k] = v
+        elif k in ["accentColor", "textColor", "fontFamily"]:
+            normalized[k] = v
+
+    # 2. Strict Defaults for Required Fields
+    required_str_fields = ["full_name", "email", "phone", "job_title", "summary", "experience", "education"]
+    for field in required_str_fields:
+        if field not in normalized or normalized[field] is None:
+            normalized[field] = ""
+    
+    # 3. Handle Skills List
+    skills_raw = normalized.get("skills")
+    if isinstance(skills_raw, str):
+        if skills_raw.strip():
+            normalized["skills"] = [s.strip() for s in skills_raw.split(',') if s.strip()]
+        else:
+            normalized["skills"] = []
+    elif not isinstance(skills_raw, list):
+        normalized["skills"] = []
+
+    # 4. NEW: Handle Custom Lists (Hobbies, Languages, Certifications)
+    for list_field in ["hobbies", "languages", "certifications"]:
+        field_raw = normalized.get(list_field)
+        if isinstance(field_raw, str):
+            if field_raw.strip():
+                normalized[list_field] = [s.strip() for s in field_raw.split(',') if s.strip()]
+            else:
+                normalized[list_field] = []
+        elif not isinstance(field_raw, list):
+            normalized[list_field] = []
+
+    # 5. NEW: Handle Optional String Fields
+    for str_field in ["location", "linkedin", "github", "portfolio"]:
+        if str_field not in normalized or normalized[str_field] is None:
+            normalized[str_field] = ""
+
+    # 6. Generate Initials
+    name = normalized.get("full_name", "")
+    normalized["full_name_initials"] = name[:2].upper() if name else "??"
+
+    # 7. Fix Accent Colors (validated once here, see core/sanitizer)
+    normalized["accent_color"] = sanitizer.css_color(
+        data.get("accentColor") or data.get("accent_color"), sanitizer.DEFAULT_ACCENT
+    )
+    normalized["text_color"] = sanitizer.css_color(
+        data.get("textColor") or data.get("text_color"), sanitizer.DEFAULT_TEXT
+    )
+    font = data.get("fontFamily") or data.get("font_family")
+    if font:
+        normalized["font_family"] = sanitizer.clean_font(font)
+    
+    return normalized
+
+
+# ---------------------------------------------------------
+# COMPILATION (once per template version)
+# ---------------------------------------------------------
+class CompiledTemplate(NamedTuple):
+    html: ParsedTemplate
+    css: ParsedTemplate
+
+
+class RenderedTemplate(NamedTuple):
+    body: str
+    css: str
+    context: Dict[str, Any]
+
+
+def _hash_var_fallback(match: "re.Match") -> str:
+    name = match.group(1)
+    if name in COLOUR_KEYS:
+        return "#{{" + name + "}}"
+    # Any other #{{var}} would leave a bare '#' when empty: fall back to the text colour
+    return "#{{#" + name + "}}{{" + name + "}}{{/" + name + "}}{{^" + name + "}}{{text_color}}{{/" + name + "}}"
+
+
+def prepare_css_source(css: str) -> str:
+    """Compile-time CSS fixups (replaces the per-request post-render regex passes)."""
+    css = css or ""
+    css = sanitizer.CSS_MULTI_HASH_RE.sub("#", css)
+    css = sanitizer.CSS_HASH_GAP_RE.sub(r"#\1", css)
+    css = sanitizer.CSS_EMPTY_HASH_DECL_RE.sub(r":\1#{{text_color}};", css)
+    css = sanitizer.CSS_EMPTY_HASH_END_RE.sub(r":\1#{{text_color}}}", css)
+    css = sanitizer.CSS_HASH_VAR_RE.sub(_hash_var_fallback, css)
+    return css
+
+
+def compile_template(html_content: str, css_content: str) -> CompiledTemplate:
+    return CompiledTemplate(
+        html=pystache.parse(html_content or ""),
+        css=pystache.parse(prepare_css_source(css_content)),
+    )
+
+
+def get_compiled(html_content: str, css_content: str, template_id: str = "", updated_at: Any = None) -> CompiledTemplate:
+    cache_key = compiled_templates.make_key(template_id, updated_at, html_content, css_content)
+    return compiled_templates.get_or_compile(cache_key, lambda: compile_template(html_content, css_content))
+
+
+# ---------------------------------------------------------
+# RENDERING
+# ---------------------------------------------------------
+def build_context(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render context for both HTML and PDF: raw keys, normalized snake_case keys,
+    clean colours/font and newline-to-<br/> for the long text fields.
+    """
+    normalized = normalize_cv_dict(data)
+    context: Dict[str, Any] = {**data, **normalized}
+
+    # Already sanitized by normalize_cv_dict; templates add the '#' themselves
+    context["accent_color"] = normalized["accent_color"][1:]
+    context["text_color"] = normalized["text_color"][1:]
+    context["font_family"] = normalized.get("font_family") or sanitizer.DEFAULT_FONT
+
+    for field in ("experience", "education", "summary"):
+        context[field] = (context.get(field) or "").replace("\n", "<br/>")
+
+    return context
+
+
+def render(html_content: str, css_content: str, data: Dict[str, Any],
+           template_id: str = "", updated_at: Any = None) -> RenderedTemplate:
+    compiled = get_compiled(html_content, css_content, template_id, updated_at)
+    context = build_context(data)
+    # Renderer keeps per-call state, so one per render (it is cheap to build)
+    renderer = pystache.Renderer()
+    return RenderedTemplate(
+        body=renderer.render(compiled.html, context),
+        css=renderer.render(compiled.css, context),
+        context=context,
+    )
+
+
+def render_template_internal(html_content: str, css_content: str, data: Dict[str, Any],
+                             template_id: str = "", updated_at: Any = None) -> str:
+    """
+    Full standalone HTML document for the live preview and HTML export.
+    Templates have #{{accent_color}} syntax, so colors are provided WITHOUT #.
+    """
+    try:
+        rendered = render(html_content, css_content, data, template_id, updated_at)
+        return f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <style>
+                {rendered.css}
+                body {{ -webkit-print-color-adjust: exact; print-color-adjust: exact; margin: 0; }}
+            </style>
+        </head>
+        <body>
+            {rendered.body}
+        </body>
+        </html>
+        """
+    except Exception as e:
+        logger.error(f"Render Error: {e}")
+        return f"<h1>Error generating preview</h1><pre>{e}</pre>"
@@ -0,0 +1,134 @@
+import re
+from collections import Counter
+from typing import Dict, List, Set
+
+from ..core.tokens import CHARS_PER_TOKEN
+from .resume_scanner import SECTION_ALIASES, clean_text, scan
+
+# ========================================
+# RESUME PROMPT COMPACTION
+# ========================================
+# Sits between the parser and the upload prompt: drops page furniture,
+# collapses whitespace and fits each section into a share of the token
+# budget, so later experience survives instead of a blind [:4000] cut.
+
+# "3", "Page 2", "2 / 5", "Page 1 of 3"
+_PAGE_MARK_RE = re.compile(r"^(?:page\s*)?\d+(?:\s*(?:/|of)\s*\d+)?$", re.IGNORECASE)
+# Lines this close to a page boundary that recur at another boundary are
+# running headers / footers
+BOUNDARY_WINDOW = 2
+# Elsewhere, only short lines repeated this often count as page furniture
+REPEAT_MIN = 3
+SHORT_LINE_CHARS = 60
+
+# Prompt order; sections the scanner doesn't find are simply absent
+SECTION_ORDER = ("header", "summary", "experience", "skills", "education")
+# Relative share of the budget when everything doesn't fit
+SECTION_WEIGHTS = {"header": 1, "summary": 2, "experience": 5, "skills": 1, "education": 1}
+
+
+def _dedupe_lines(text: str) -> str:
+    """
+    Collapses whitespace per line and drops page numbers plus page furniture:
+    repeats of a line that recurs at page boundaries (running headers /
+    footers, the name on every page) and of short lines seen REPEAT_MIN+
+    times. The first occurrence and section headings are always kept; other
+    repeats (the same bullet under two jobs) are content and stay.
+    """
+    lines: List[str] = []
+    # Page marks split the text into pages; its start and end are boundaries too
+    boundaries = [0]
+    for raw in text.split("\n"):
+        line = " ".join(raw.split())
+        if not line:
+            continue
+        if _PAGE_MARK_RE.match(line):
+            boundaries.append(len(lines))
+            continue
+        lines.append(line)
+    boundaries.append(len(lines))
+
+    keys = [line.lower() for line in lines]
+    counts = Counter(keys)
+    near_boundary: Set[int] = set()
+    boundary_hits: Counter = Counter()
+    # Without page marks there is a single page and nothing to recur across
+    edges = sorted(set(boundaries)) if len(boundaries) > 2 else []
+    for edge in edges:
+        window = range(max(0, edge - BOUNDARY_WINDOW), min(len(lines), edge + BOUNDARY_WINDOW))
+        near_boundary.update(window)
+        boundary_hits.update({keys[i] for i in window})
+
+    seen: Set[str] = set()
+    kept: List[str] = []
+    for i, (line, key) in enumerate(zip(lines, keys)):
+        if key in seen and key.rstrip(":").strip() not in SECTION_ALIASES:
+            if i in near_boundary and boundary_hits[key] >= 2:
+                continue
+            if counts[key] >= REPEAT_MIN and len(line) <= SHORT_LINE_CHARS:
+                continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def _allocate(needs: Dict[str, int], budget: int) -> Dict[str, int]:
+    """
+    Water-filling by SECTION_WEIGHTS: sections smaller than their share get
+    what they need, and the rest is split again among the ones that don't fit.
+    """
+    alloc: Dict[str, int] = {}
+    remaining = budget
+    active = list(needs)
+    while active:
+        total = sum(SECTION_WEIGHTS[name] for name in active)
+        fits = [name for name in active if needs[name] <= remaining * SECTION_WEIGHTS[name] / total]
+        if not fits:
+            for name in active:
+                alloc[name] = int(remaining * SECTION_WEIGHTS[name] / total)
+            break
+        for name in fits:
+            alloc[name] = needs[name]
+            remaining -= needs[name]
+        active = [name for name in active if name not in fits]
+    return alloc
+
+
+def _fit(lines: List[str], limit: int) -> List[str]:
+    """Whole lines in order while they fit; the first line is cut rather than dropped."""
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        if used + len(line) + 1 > limit:
+            if not kept and limit > 0:
+                kept.append(line[:limit])
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept
+
+
+def compact_resume(text: str, token_budget: int) -> str:
+    """Resume text for the upload prompt, at most ~token_budget tokens."""
+    sections = scan(_dedupe_lines(clean_text(text))).sections
+    blocks = {name: sections[name] for name in SECTION_ORDER if sections.get(name)}
+    if not blocks:
+        return ""
+
+    # A section costs its lines plus a "NAME:" heading line
+    needs = {
+        name: sum(len(l) + 1 for l in lines) + (0 if name == "header" else len(name) + 2)
+        for name, lines in blocks.items()
+    }
+    alloc = _allocate(needs, token_budget * CHARS_PER_TOKEN)
+
+    out: List[str] = []
+    for name, lines in blocks.items():
+        heading = "" if name == "header" else f"{name.upper()}:"
+        kept = _fit(lines, alloc[name] - (len(heading) + 1 if heading else 0))
+        if not kept:
+            continue
+        if heading:
+            out.append(heading)
+        out.extend(kept)
+    return "\n".join(out)
@@ -0,0 +1,122 @@
+import re
+from typing import Dict, List, NamedTuple
+
+# ========================================
+# RESUME SCANNER
+# ========================================
+# Pulls contact details, profile links and section boundaries out of resume
+# text in one pass over its lines with precompiled patterns. Used for the upload prompt,
+# the regex identity guard and the local generator.
+
+# --- CLEANING ---
+# Keep printable ASCII and newlines (same result as [^\x20-\x7E\n] -> "").
+# Non-ASCII is dropped by the ascii codec, control bytes by one translate.
+_CONTROL_BYTES = bytes(b for b in range(0x20) if b != 0x0A) + b"\x7f"
+
+
+def clean_text(text: str) -> str:
+    return text.encode("ascii", "ignore").translate(None, _CONTROL_BYTES).decode("ascii").strip()
+
+
+# --- SECTIONS ---
+SECTION_ALIASES = {
+    "summary": "summary", "profile": "summary", "objective": "summary", "about me": "summary",
+    "experience": "experience", "work experience": "experience", "employment history": "experience",
+    "professional experience": "experience",
+    "education": "education", "academic background": "education",
+    "skills": "skills", "technical skills": "skills", "core skills": "skills",
+}
+_LONGEST_HEADING = max(len(h) for h in SECTION_ALIASES)
+
+# --- FIELD PATTERNS ---
+# Each runs only on lines that pass a cheap substring check, and email /
+# phone stop being searched once found.
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]")
+_URL_RE = re.compile(
+    r"(?:https?://|www\.)[^\s,;<>()\"']+|(?:[\w-]+\.)*(?:linkedin|github)\.com/[^\s,;<>()\"']+",
+    re.IGNORECASE,
+)
+_HAS_DIGIT_RE = re.compile(r"\d")
+# Header lines that are never a name
+_NAME_BLACKLIST_RE = re.compile(
+    r"curriculum|vitae|resume|page|contact|phone|email|address|education", re.IGNORECASE
+)
+NAME_LINES = 5
+
+
+class ScanResult(NamedTuple):
+    full_name: str
+    email: str
+    phone: str
+    linkedin: str
+    github: str
+    urls: List[str]
+    # Non-empty lines grouped under the last recognised heading ("header" before the first)
+    sections: Dict[str, List[str]]
+
+
+def _is_name(line: str) -> bool:
+    return (len(line.split()) <= 4 and "@" not in line and not _HAS_DIGIT_RE.search(line)
+            and not _NAME_BLACKLIST_RE.search(line))
+
+
+def scan(text: str) -> ScanResult:
+    """
+    One pass over the lines of text: name (first fitting non-heading line of
+    the top NAME_LINES), first email, first phone outside links / emails, profile
+    links, and the lines of each section.
+    """
+    full_name = email = phone = linkedin = github = ""
+    urls: List[str] = []
+    sections: Dict[str, List[str]] = {"header": []}
+    current = sections["header"]
+    seen = 0
+
+    for raw in text.split("\n"):
+        line = raw.strip()
+        if not line:
+            continue
+        name_line = seen < NAME_LINES
+        seen += 1
+
+        # Headings are short: only those lines pay for the lookup
+        if len(line) <= _LONGEST_HEADING + 1:
+            key = line[:-1].rstrip() if line.endswith(":") else line
+            section = SECTION_ALIASES.get(key.lower())
+            if section:
+                current = sections.setdefault(section, [])
+                continue
+        # A heading is never the name, though it counts toward the top lines
+        if name_line and not full_name and _is_name(line):
+            full_name = line
+        current.append(line)
+
+        links: List[str] = []
+        # Plain substring checks; _URL_RE (case-insensitive) confirms
+        if "://" in line or ".com/" in line or "www." in line or "WWW." in line:
+            links = _URL_RE.findall(line)
+            for url in links:
+                url_lower = url.lower()
+                if not linkedin and "linkedin.com/" in url_lower:
+                    linkedin = url
+                elif not github and "github.com/" in url_lower:
+                    github = url
+            urls.extend(links)
+        found_email = _EMAIL_RE.search(line) if "@" in line and not (email and phone) else None
+        if found_email and not email:
+            email = found_email.group(0)
+        if not phone:
+            # Digits inside links and emails are not phone numbers
+            for claimed in links + ([found_email.group(0)] if found_email else []):
+                line = line.replace(claimed, " ")
+            found_phone = _PHONE_RE.search(line)
+            if found_phone:
+                phone = found_phone.group(0).strip()
+
+    return ScanResult(full_name, email, phone, linkedin, github, urls, sections)
+
+
+def split_sections(text: str) -> Dict[str, List[str]]:
+    """Groups non-empty lines under the last recognised heading ("header" before the first)."""
+    return scan(text).sections
@@ -0,0 +1,87 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..core.config import settings
+
+CacheKey = Tuple[str, str, str]
+
+
+class CompiledTemplateCache:
+    """
+    Process-wide LRU of compiled templates.
+
+    Entries are keyed by (template id, updated_at, content hash), so an edit
+    made through /admin/templates produces a new key and the old compiled
+    version of a stored template is dropped as soon as the new one is stored.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(template_id: Any, updated_at: Optional[datetime], *sources: Optional[str]) -> CacheKey:
+        digest = hashlib.sha1()
+        for source in sources:
+            digest.update((source or "").encode("utf-8"))
+            digest.update(b"\0")
+        stamp = updated_at.isoformat() if updated_at else ""
+        return (str(template_id or ""), stamp, digest.hexdigest())
+
+    def get_or_compile(self, key: CacheKey, compile_fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Compile outside the lock; a concurrent miss on the same key just
+        # compiles twice and the last writer wins.
+        compiled = compile_fn()
+
+        with self._lock:
+            # Drop stale versions of the same template right away. Templates
+            # without an id (ad-hoc /generate-pdf sources) share "" and are
+            # only told apart by content, so those are left to the LRU.
+            if key[0]:
+                stale = [k for k in self._entries if k[0] == key[0] and k != key]
+                for k in stale:
+                    del self._entries[k]
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return compiled
+
+    def invalidate(self, template_id: Optional[str] = None) -> None:
+        with self._lock:
+            if template_id is None:
+                self._entries.clear()
+                return
+            for k in [k for k in self._entries if k[0] == str(template_id)]:
+                del self._entries[k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+compiled_templates = CompiledTemplateCache(max_entries=settings.TEMPLATE_CACHE_SIZE)
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud import template as template_crud
+from ..database import SessionLocal
+
+
+@dataclass(frozen=True)
+class TemplateSnapshot:
+    """Detached, read-only copy of a Template row (safe to share across requests)."""
+    id: str
+    name: str
+    category: Optional[str]
+    is_premium: bool
+    html_content: str
+    css_styles: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, obj: Any) -> "TemplateSnapshot":
+        return cls(
+            id=str(obj.id),
+            name=obj.name,
+            category=obj.category,
+            is_premium=bool(obj.is_premium),
+            html_content=obj.html_content or "",
+            css_styles=obj.css_styles or "",
+            created_at=obj.created_at,
+            updated_at=obj.updated_at,
+        )
+
+
+class TemplateRepository:
+    """
+    Read-through, in-memory view of the templates table.
+
+    Loaded once at startup, refreshed after ttl_seconds, and invalidated by the
+    admin template endpoints. A warm repository serves preview and export
+    lookups without opening a database connection. Unknown ids are remembered
+    in a small LRU (max_missing) so arbitrary ids from unauthenticated callers
+    can't grow it without bound.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], ttl_seconds: float = 300, max_missing: int = 256):
+        self._session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.max_missing = max_missing
+        self._templates: Dict[str, TemplateSnapshot] = {}
+        self._missing: "OrderedDict[str, None]" = OrderedDict()
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """(Re)loads every template. Uses the given session or opens a short-lived one."""
+        own_session = db is None
+        session = db or self._session_factory()
+        try:
+            rows = template_crud.get_all_templates(session)
+            snapshot = {str(r.id): TemplateSnapshot.from_model(r) for r in rows}
+        finally:
+            if own_session:
+                session.close()
+
+        with self._lock:
+            self._templates = snapshot
+            self._missing = OrderedDict()
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+        return len(snapshot)
+
+    def _is_stale(self) -> bool:
+        return not self._loaded_at or (time.monotonic() - self._loaded_at) > self.ttl_seconds
+
+    def get(self, template_id: str) -> Optional[TemplateSnapshot]:
+        if self._is_stale():
+            self.load()
+
+        template_id = str(template_id)
+        with self._lock:
+            found = self._templates.get(template_id)
+            if found is not None:
+                self.hits += 1
+                return found
+            if template_id in self._missing:
+                self._missing.move_to_end(template_id)
+                self.hits += 1
+                return None
+            self.misses += 1
+
+        # Read-through for templates added by another process since the last load
+        db = self._session_factory()
+        try:
+            row = template_crud.get_template(db, template_id)
+            found = TemplateSnapshot.from_model(row) if row else None
+        finally:
+            db.close()
+
+        with self._lock:
+            if found:
+                self._templates[template_id] = found
+            else:
+                self._missing[template_id] = None
+                while len(self._missing) > self.max_missing:
+                    self._missing.popitem(last=False)
+        return found
+
+    def get_or_default(self, template_id: str, default_id: str = "modern") -> Optional[TemplateSnapshot]:
+        return self.get(template_id) or self.get(default_id)
+
+    def invalidate(self, template_id: Optional[str] = None) -> None:
+        """Drops one template (or everything) so the next lookup hits the database."""
+        with self._lock:
+            if template_id is None:
+                self._templates = {}
+                self._missing = OrderedDict()
+                self._loaded_at = 0.0
+                return
+            self._templates.pop(str(template_id), None)
+            self._missing.pop(str(template_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._templates),
+                "missing": len(self._missing),
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+template_repository = TemplateRepository(SessionLocal, ttl_seconds=settings.TEMPLATE_REPOSITORY_TTL_SECONDS)
@@ -0,0 +1,36 @@
+import hashlib
+from typing import BinaryIO, Optional
+
+from ..core.config import settings
+from .blob_cache import build_store
+from .parser_service import PARSER_VERSION, kind_for
+
+DIGEST_CHUNK = 1024 * 1024
+
+
+def file_digest(upload: BinaryIO) -> str:
+    """SHA-256 of a (spooled) upload, read in chunks; leaves the file at 0."""
+    digest = hashlib.sha256()
+    upload.seek(0)
+    for chunk in iter(lambda: upload.read(DIGEST_CHUNK), b""):
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+def make_key(digest: str, filename: str, max_chars: Optional[int]) -> str:
+    """
+    Content address of an extraction: file bytes + the parser that reads
+    them + parser version + character budget. Renaming a file doesn't
+    miss; bumping PARSER_VERSION or the budget does.
+    """
+    return f"{digest}:{kind_for(filename)}:{PARSER_VERSION}:{max_chars or 0}"
+
+
+text_cache = build_store(
+    settings.TEXT_CACHE_BACKEND,
+    settings.TEXT_CACHE_MAX_BYTES,
+    sqlite_path=settings.TEXT_CACHE_SQLITE_PATH,
+    table="text_cache",
+    ttl_seconds=settings.TEXT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,104 @@
+"""
+Benchmark: pooled AsyncOpenAI clients vs a fresh client per call.
+
+Starts a local stand-in for the OpenAI chat completions API (fixed
+LATENCY per reply, HTTP/1.1 keep-alive) and fires CONCURRENCY chats at it:
+  before - a new synchronous OpenAI client per call, called from inside an
+           async handler (the old ai_service behaviour: blocks the loop)
+  after  - llm_clients (one long-lived AsyncOpenAI per provider)
+and prints wall time, chats per second and TCP connections opened.
+
+    cd backend && python benchmarks/bench_llm_clients.py [latency seconds]
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LATENCY = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+CONCURRENCY = (1, 8, 32)
+MESSAGES = [{"role": "user", "content": "Write a one-line summary for a backend engineer."}]
+
+REPLY = json.dumps({
+    "id": "chatcmpl-bench", "object": "chat.completion", "created": 0, "model": "bench",
+    "choices": [{"index": 0, "finish_reason": "stop",
+                 "message": {"role": "assistant", "content": "Backend engineer who ships."}}],
+    "usage": {"prompt_tokens": 12, "completion_tokens": 6, "total_tokens": 18},
+}).encode("utf-8")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandInHandler.lock:
+            StandInHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(REPLY)))
+        self.end_headers()
+        self.wfile.write(REPLY)
+
+    def log_message(self, *args):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+server.daemon_threads = True
+threading.Thread(target=server.serve_forever, daemon=True).start()
+BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+# Point the app's Groq provider at the stand-in before settings are loaded
+os.environ["GROQ_API_KEY"] = "bench"
+os.environ["GROQ_BASE_URL"] = BASE_URL
+
+from openai import OpenAI  # noqa: E402
+
+from app.services.llm_client import llm_clients  # noqa: E402
+
+
+async def chat_before() -> str:
+    client = OpenAI(api_key="bench", base_url=BASE_URL)
+    response = client.chat.completions.create(model="bench", messages=MESSAGES)
+    return response.choices[0].message.content or ""
+
+
+async def chat_after() -> str:
+    return await llm_clients.chat(MESSAGES)
+
+
+async def measure(chat, concurrency):
+    StandInHandler.connections = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(chat() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return elapsed, StandInHandler.connections
+
+
+async def main():
+    llm_clients.start()
+    await chat_after()  # open the pool once, as the app lifespan would
+    print(f"stand-in latency {LATENCY * 1000:.0f} ms per reply")
+    print(f"{'chats':>6} {'before s':>9} {'chats/s':>8} {'conns':>6} {'after s':>8} {'chats/s':>8} {'conns':>6}")
+    for concurrency in CONCURRENCY:
+        old, old_conns = await measure(chat_before, concurrency)
+        new, new_conns = await measure(chat_after, concurrency)
+        print(f"{concurrency:>6} {old:>9.2f} {concurrency / old:>8.1f} {old_conns:>6} "
+              f"{new:>8.2f} {concurrency / new:>8.1f} {new_conns:>6}")
+    await llm_clients.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
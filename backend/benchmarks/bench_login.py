@@ -0,0 +1,82 @@
+"""
+Benchmark: login throughput under a sign-in storm.
+
+Fires CONCURRENCY parallel logins (TOTAL in all) at the app in-process and,
+at the same time, probes GET /api/cvs to show how much the storm slows
+unrelated endpoints. Uses a throwaway SQLite database.
+
+    cd backend && python benchmarks/bench_login.py [concurrency] [total]
+
+BCRYPT_ROUNDS / PASSWORD_HASH_WORKERS / PASSWORD_HASH_QUEUE_DEPTH are read
+from the environment as usual.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_login.db")
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+EMAIL = "bench@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+def _pct(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def main(concurrency: int, total: int) -> None:
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            r = await client.post("/api/auth/register", json={"email": EMAIL, "password": PASSWORD, "full_name": "Bench"})
+            headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+            statuses: Counter = Counter()
+            login_latency, probe_latency = [], []
+            remaining = [total]
+            storm_running = [True]
+
+            async def login_worker():
+                while remaining[0] > 0:
+                    remaining[0] -= 1
+                    started = time.perf_counter()
+                    r = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                    login_latency.append(time.perf_counter() - started)
+                    statuses[r.status_code] += 1
+
+            async def probe():
+                while storm_running[0]:
+                    started = time.perf_counter()
+                    await client.get("/api/cvs", headers=headers)
+                    probe_latency.append(time.perf_counter() - started)
+                    await asyncio.sleep(0.05)
+
+            prober = asyncio.ensure_future(probe())
+            started = time.perf_counter()
+            await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+            storm_running[0] = False
+            await prober
+
+    ok = statuses.get(200, 0)
+    print(f"logins: {total} at concurrency {concurrency} in {elapsed:.2f}s "
+          f"-> {ok / elapsed:.1f} successful/s, statuses {dict(statuses)}")
+    print(f"login latency ms: p50 {_pct(login_latency, 0.5):.0f}  p95 {_pct(login_latency, 0.95):.0f}")
+    print(f"GET /api/cvs during storm ms: p50 {_pct(probe_latency, 0.5):.0f}  "
+          f"p95 {_pct(probe_latency, 0.95):.0f}  max {_pct(probe_latency, 1.0):.0f}  ({len(probe_latency)} probes)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args + [32, 128][len(args):])))
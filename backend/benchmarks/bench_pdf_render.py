@@ -0,0 +1,74 @@
+"""
+Benchmark: PDF render time with and without the shared WeasyPrint resources.
+
+Renders every seed template with a sample CV two ways:
+  before - a fresh CSS(string=...) and WeasyPrint's default font handling
+           on every render (the path before stylesheets were cached)
+  after  - file_service.create_pdf_from_template (cached parsed stylesheet,
+           shared FontConfiguration, caching url_fetcher)
+Both use the same compiled HTML/CSS, so only the WeasyPrint side differs.
+Needs WeasyPrint's native libraries (Pango), like the PDF export itself.
+
+    cd backend && python benchmarks/bench_pdf_render.py [renders per template]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weasyprint import CSS, HTML  # noqa: E402
+
+from app.core.seed_data import PERMANENT_TEMPLATES  # noqa: E402
+from app.services import file_service, renderer  # noqa: E402
+
+SAMPLE_CV = {
+    "full_name": "Jane Doe",
+    "email": "jane.doe@example.com",
+    "phone": "+1 555 123 4567",
+    "job_title": "Senior Backend Engineer",
+    "summary": "Backend engineer with ten years of experience building APIs and data pipelines.",
+    "experience": "\n".join(
+        f"Led migration {i} of a Python monolith to services, cutting p95 latency by {10 + i}%" for i in range(8)
+    ),
+    "education": "BSc Computer Science, University of Somewhere, 2014",
+    "skills": ["Python", "FastAPI", "PostgreSQL", "Kubernetes", "Redis", "AWS"],
+    "accent_color": "#2c3e50",
+    "text_color": "#333333",
+    "font_family": "Helvetica",
+}
+
+
+def render_before(tmpl):
+    rendered = renderer.render(tmpl["html_content"], tmpl["css_styles"], SAMPLE_CV, tmpl["id"], None)
+    return HTML(string=rendered.body).write_pdf(stylesheets=[CSS(string=rendered.css)], presentational_hints=True)
+
+
+def render_after(tmpl):
+    return file_service.create_pdf_from_template(
+        tmpl["html_content"], tmpl["css_styles"], SAMPLE_CV, True, tmpl["id"], None
+    )
+
+
+def timed(fn, tmpl, runs):
+    fn(tmpl)  # warm-up: template compile, first font lookup
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn(tmpl)
+    return (time.perf_counter() - started) / runs * 1000
+
+
+def main(runs):
+    print(f"{'template':<14} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    total_old = total_new = 0.0
+    for tmpl in PERMANENT_TEMPLATES:
+        old = timed(render_before, tmpl, runs)
+        new = timed(render_after, tmpl, runs)
+        total_old += old
+        total_new += new
+        print(f"{tmpl['id']:<14} {old:>10.1f} {new:>9.1f} {old / new:>7.2f}x")
+    print(f"{'all':<14} {total_old:>10.1f} {total_new:>9.1f} {total_old / total_new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,109 @@
+"""
+Benchmark: resume_scanner vs the previous regex heuristics.
+
+Builds synthetic resumes from 1 KB to 1 MB and times cleaning + field
+extraction + section split for both implementations.
+
+    cd backend && python benchmarks/bench_resume_scanner.py
+"""
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import resume_scanner  # noqa: E402
+
+SIZES = [1 << 10, 16 << 10, 128 << 10, 1 << 20]
+
+
+# --- previous implementation (ai_service / local_generator) ---
+def legacy_clean(text):
+    text = text.replace('\x00', '')
+    text = re.sub(r'[^\x20-\x7E\n]', '', text)
+    return text.strip()
+
+
+def legacy_info(cv_text):
+    info = {"full_name": "", "email": "", "phone": ""}
+    email_match = re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', cv_text)
+    if email_match:
+        info["email"] = email_match.group(0)
+    phone_match = re.search(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]', cv_text)
+    if phone_match:
+        info["phone"] = phone_match.group(0).strip()
+    lines = [l for l in cv_text.split('\n') if l.strip()]
+    blacklist = ["Curriculum", "Vitae", "Resume", "Page", "Contact", "Phone", "Email", "Address", "Education"]
+    for line in lines[:5]:
+        clean_line = line.strip()
+        if len(clean_line.split()) <= 4 and not any(c.isdigit() for c in clean_line) and "@" not in clean_line:
+            if not any(b.upper() in clean_line.upper() for b in blacklist):
+                info["full_name"] = clean_line
+                break
+    return info
+
+
+_LEGACY_HEADING_RE = re.compile(
+    r"^\s*(summary|profile|objective|about me|experience|work experience|employment history|"
+    r"professional experience|education|academic background|skills|technical skills|core skills)\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+
+def legacy_sections(text):
+    sections = {"header": []}
+    current = "header"
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        heading = _LEGACY_HEADING_RE.match(stripped)
+        if heading:
+            current = resume_scanner.SECTION_ALIASES[heading.group(1).lower()]
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(stripped)
+    return sections
+
+
+def legacy(text):
+    clean = legacy_clean(text)
+    return legacy_info(clean), legacy_sections(clean)
+
+
+def scanner(text):
+    return resume_scanner.scan(resume_scanner.clean_text(text))
+
+
+# --- corpus ---
+WORDS = ("designed built led migrated python kubernetes postgres latency team "
+         "customers revenue pipeline 2019 2021 café résumé reduced by 40% •").split()
+HEADINGS = ["Summary", "Work Experience", "Education", "Technical Skills", "Projects"]
+
+
+def synthetic_resume(size, seed=7):
+    rnd = random.Random(seed)
+    parts = ["Jane Doe", "jane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/jane-doe", ""]
+    length = sum(len(p) + 1 for p in parts)
+    while length < size:
+        line = rnd.choice(HEADINGS) if rnd.random() < 0.05 else \
+            "- " + " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(4, 14)))
+        parts.append(line)
+        length += len(line) + 1
+    return "\n".join(parts)[:size]
+
+
+def main():
+    print(f"{'size':>8} {'legacy ms':>10} {'scanner ms':>11} {'speedup':>8}")
+    for size in SIZES:
+        text = synthetic_resume(size)
+        runs = max(3, (4 << 20) // size)
+        old = min(timeit.repeat(lambda: legacy(text), number=runs, repeat=3)) / runs * 1000
+        new = min(timeit.repeat(lambda: scanner(text), number=runs, repeat=3)) / runs * 1000
+        print(f"{size // 1024:>6}KB {old:>10.3f} {new:>11.3f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
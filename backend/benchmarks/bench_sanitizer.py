@@ -0,0 +1,107 @@
+"""
+Benchmark: per-preview cost of colour/font sanitizing and CSS cleanup.
+
+For every seed template, compares
+  css step  - the old per-request work (uncompiled re.fullmatch colour
+              checks, font strip and the re.sub passes over the rendered
+              stylesheet) against core/sanitizer (colour + font validation
+              only; the CSS fixups now run once, at compile time)
+  preview   - a whole preview the old way (pystache.render of the template
+              source + the passes above) against renderer.render_template_internal
+and prints microseconds per call and previews per second.
+
+    cd backend && python benchmarks/bench_sanitizer.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pystache  # noqa: E402
+
+from app.core import sanitizer  # noqa: E402
+from app.core.seed_data import PERMANENT_TEMPLATES  # noqa: E402
+from app.services import renderer  # noqa: E402
+
+SAMPLE_CV = {
+    "full_name": "Jane Doe",
+    "email": "jane.doe@example.com",
+    "phone": "+1 555 123 4567",
+    "job_title": "Senior Backend Engineer",
+    "summary": "Backend engineer with ten years of experience building APIs and data pipelines.",
+    "experience": "\n".join(f"Led migration {i}, cutting p95 latency by {10 + i}%" for i in range(8)),
+    "education": "BSc Computer Science, University of Somewhere, 2014",
+    "skills": ["Python", "FastAPI", "PostgreSQL", "Kubernetes"],
+    "location": "Berlin",
+    "hobbies": ["Climbing"],
+    "languages": ["English", "German"],
+    "accentColor": "#8e44ad",
+    "textColor": "#222",
+    "fontFamily": "'Roboto', sans-serif",
+}
+
+
+# --- previous implementation (per request, on every preview / PDF) ---
+def legacy_clean_hex(color_value, default_hex="333333"):
+    if not color_value:
+        return default_hex
+    clean_hex = str(color_value).strip().lstrip("#")
+    if re.fullmatch(r"[0-9a-fA-F]{3}|[0-9a-fA-F]{6}", clean_hex):
+        if len(clean_hex) == 3:
+            clean_hex = "".join([c * 2 for c in clean_hex])
+        return clean_hex
+    return default_hex
+
+
+def legacy_css_step(cv, rendered_css):
+    accent = legacy_clean_hex(cv.get("accentColor") or cv.get("accent_color"), "2c3e50")
+    text_col = legacy_clean_hex(cv.get("textColor") or cv.get("text_color"), "333333")
+    font_name = re.sub(r'[;"\'#]+', "", cv.get("fontFamily") or cv.get("font_family") or "sans-serif").strip()
+    rendered_css = re.sub(r"##+", "#", rendered_css)
+    rendered_css = re.sub(r":\s*#\s*;", f": #{text_col};", rendered_css)
+    rendered_css = re.sub(r":\s*#\s*\}", f": #{text_col}", rendered_css)
+    rendered_css = re.sub(r"#\s+([0-9a-fA-F])", r"#\1", rendered_css)
+    return accent, font_name, rendered_css
+
+
+def legacy_preview(tmpl, cv):
+    data = {**cv, "accent_color": legacy_clean_hex(cv.get("accentColor"), "2c3e50"),
+            "text_color": legacy_clean_hex(cv.get("textColor"), "333333")}
+    body = pystache.render(tmpl["html_content"], data)
+    css = pystache.render(tmpl["css_styles"], data)
+    _, _, css = legacy_css_step(cv, css)
+    return f"<!DOCTYPE html><html><head><style>{css}</style></head><body>{body}</body></html>"
+
+
+# --- current implementation ---
+def sanitizer_step(cv):
+    accent = sanitizer.css_color(cv.get("accentColor") or cv.get("accent_color"), sanitizer.DEFAULT_ACCENT)
+    text_col = sanitizer.css_color(cv.get("textColor") or cv.get("text_color"), sanitizer.DEFAULT_TEXT)
+    return accent, text_col, sanitizer.clean_font(cv.get("fontFamily") or cv.get("font_family"))
+
+
+def current_preview(tmpl, cv):
+    return renderer.render_template_internal(tmpl["html_content"], tmpl["css_styles"], cv, tmpl["id"])
+
+
+def best_us(fn, runs):
+    return min(timeit.repeat(fn, number=runs, repeat=5)) / runs * 1e6
+
+
+def main():
+    print(f"{'template':<14} {'css old us':>10} {'css new us':>10} "
+          f"{'preview old/s':>14} {'preview new/s':>14} {'speedup':>8}")
+    for tmpl in PERMANENT_TEMPLATES:
+        rendered_css = renderer.render(tmpl["html_content"], tmpl["css_styles"], SAMPLE_CV, tmpl["id"]).css
+        css_old = best_us(lambda: legacy_css_step(SAMPLE_CV, rendered_css), 2000)
+        css_new = best_us(lambda: sanitizer_step(SAMPLE_CV), 2000)
+        old = best_us(lambda: legacy_preview(tmpl, SAMPLE_CV), 200)
+        new = best_us(lambda: current_preview(tmpl, SAMPLE_CV), 200)
+        print(f"{tmpl['id']:<14} {css_old:>10.1f} {css_new:>10.1f} "
+              f"{1e6 / old:>14.0f} {1e6 / new:>14.0f} {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Tests import the app package the same way the server does (from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time: point the app at a throwaway database,
+# cheap password hashes, one worker per pool and the offline AI backend
+_TMP = tempfile.mkdtemp(prefix="cv-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP}/test.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PDF_RENDER_PROCESSES", "1")
+os.environ.setdefault("PARSE_PROCESSES", "1")
+os.environ.setdefault("AI_BACKEND", "local")
+os.environ.setdefault("AI_USER_RATE_PER_MINUTE", "0")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    response = client.post("/api/auth/register", json={
+        "email": "tester@example.com", "password": "pw123456", "full_name": "Test User",
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def render_pool():
+    """A one-process RenderPool of its own; tests submit picklable stand-in tasks."""
+    from app.services.render_pool import RenderPool
+
+    pool = RenderPool(processes=1, queue_depth=0, timeout_seconds=30)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def export_pool(monkeypatch, render_pool):
+    """render_pool installed for export_service, with the shared PDF cache bypassed."""
+    from app.services import export_service
+
+    monkeypatch.setattr(export_service, "render_pool", render_pool)
+    monkeypatch.setattr(export_service.pdf_cache.pdf_cache, "get", lambda key: None)
+    monkeypatch.setattr(export_service.pdf_cache.pdf_cache, "set", lambda key, value: None)
+    return render_pool
@@ -0,0 +1,165 @@
+"""
+AIAdmission: per-user token bucket, in-flight cap with a bounded queue,
+the up-front deadline estimate, and the chat endpoints giving their slot
+back (429 when shed, release when a stream is cancelled or the client
+disconnects).
+"""
+import asyncio
+import json
+
+import pytest
+
+from app import main_api
+from app.services import ai_service
+from app.services.ai_admission import AIAdmission, AIRateLimited
+
+
+def admission(**overrides) -> AIAdmission:
+    options = dict(max_in_flight=2, queue_depth=1, queue_timeout_seconds=5.0,
+                   user_rate_per_minute=0, user_burst=5)
+    options.update(overrides)
+    return AIAdmission(**options)
+
+
+def test_token_bucket_limits_each_user():
+    async def scenario():
+        gate = admission(max_in_flight=10, user_rate_per_minute=60, user_burst=2)
+        for _ in range(2):
+            await gate.acquire("alice")
+        with pytest.raises(AIRateLimited) as limited:
+            await gate.acquire("alice")
+        await gate.acquire("bob")  # other users have their own bucket
+        return gate, limited.value
+
+    gate, limited = asyncio.run(scenario())
+    assert limited.reason == "Too many AI requests"
+    assert limited.retry_after == 1
+    assert (gate.admitted, gate.rate_limited, gate.in_flight) == (3, 1, 3)
+
+
+def test_over_queue_limit_is_shed_and_queued_request_gets_the_next_slot():
+    async def scenario():
+        gate = admission()
+        await gate.acquire("a")
+        await gate.acquire("b")
+        queued = asyncio.ensure_future(gate.acquire("c"))
+        await asyncio.sleep(0)
+        assert gate.waiting == 1
+        with pytest.raises(AIRateLimited) as shed:
+            await gate.acquire("d")  # queue (depth 1) is full
+        gate.release(0.1)
+        await asyncio.wait_for(queued, 1)
+        return gate, shed.value
+
+    gate, shed = asyncio.run(scenario())
+    assert shed.reason == "AI service busy"
+    assert (gate.in_flight, gate.waiting, gate.shed) == (2, 0, 1)
+
+
+def test_request_that_would_miss_the_deadline_is_shed_up_front():
+    async def scenario():
+        gate = admission(max_in_flight=1, queue_depth=10, queue_timeout_seconds=1.0,
+                         user_rate_per_minute=60, user_burst=1)
+        await gate.acquire("a")
+        # Recent requests take ~2s, so a queued one would wait past the 1s deadline
+        with pytest.raises(AIRateLimited) as shed:
+            await gate.acquire("b")
+        return gate, shed.value
+
+    gate, shed = asyncio.run(scenario())
+    assert shed.retry_after == 2
+    assert gate.waiting == 0
+    # The shed request's token was refunded
+    assert gate._buckets["b"][0] == pytest.approx(1.0)
+
+
+def test_queue_timeout_sheds_and_leaves_no_waiter():
+    async def scenario():
+        gate = admission(max_in_flight=1, queue_timeout_seconds=0.2)
+        gate._avg_seconds = 0.05
+        await gate.acquire("a")
+        with pytest.raises(AIRateLimited):
+            await gate.acquire("b")
+        return gate
+
+    gate = asyncio.run(scenario())
+    assert (gate.in_flight, gate.waiting, gate.shed) == (1, 0, 1)
+
+
+@pytest.mark.parametrize("path", ["/api/ai/chat", "/api/ai/chat/stream"])
+def test_chat_over_queue_limit_gets_429(client, auth_headers, monkeypatch, path):
+    gate = admission(max_in_flight=1, queue_depth=0)
+    gate.in_flight = 1  # every slot taken
+    monkeypatch.setattr(main_api, "ai_admission", gate)
+
+    response = client.post(path, headers=auth_headers, json={"message": "hi", "history": []})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert gate.shed == 1
+
+
+async def _stream_then_disconnect(app, headers, wait_for_body: bool):
+    """Drives /ai/chat/stream as a raw ASGI call and hangs up mid-response."""
+    body = json.dumps({"message": "hi", "history": []}).encode()
+    disconnect = asyncio.Event()
+    started = asyncio.Event()
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and not wait_for_body:
+            started.set()
+        if message["type"] == "http.response.body" and message.get("body"):
+            started.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/ai/chat/stream", "raw_path": b"/api/ai/chat/stream",
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+        "headers": [(b"content-type", b"application/json")]
+                   + [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    call = asyncio.ensure_future(app(scope, receive, send))
+    await asyncio.wait_for(started.wait(), 5)
+    in_flight = main_api.ai_admission.in_flight
+    disconnect.set()
+    await asyncio.wait_for(call, 5)
+    return in_flight
+
+
+@pytest.mark.parametrize("mid_stream", [True, False], ids=["after-first-chunk", "before-first-chunk"])
+def test_stream_disconnect_returns_the_slot(client, auth_headers, monkeypatch, mid_stream):
+    cancelled = []
+
+    async def slow_reply(history, message):
+        try:
+            if mid_stream:
+                yield {"type": "delta", "text": "Hel"}
+            await asyncio.sleep(30)
+            yield {"type": "result", "reply": "Hello", "action": "chat", "data": None}
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(ai_service, "stream_chat_with_user", slow_reply)
+
+    async def scenario():
+        gate = admission()
+        monkeypatch.setattr(main_api, "ai_admission", gate)
+        in_flight = await _stream_then_disconnect(client.app, auth_headers, wait_for_body=mid_stream)
+        return gate, in_flight
+
+    gate, in_flight = asyncio.run(scenario())
+    assert in_flight == 1
+    assert (gate.in_flight, gate.admitted) == (0, 1)
+    assert cancelled == [True]
+    # The permit really is free again, not just the counter
+    assert gate._slots._value == gate.max_in_flight
@@ -0,0 +1,65 @@
+"""
+generate_cv_content_from_ai against a stubbed LLM: the generation cache in
+upload mode is keyed on what ends up in the answer, including the contact
+fields the regex pulls from the whole document.
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.schemas import ai as ai_schemas
+from app.services import ai_service, resume_compactor
+from app.services.blob_cache import MemoryBlobStore
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Stubbed provider: returns a draft without contact details, so the identity guard fills them in."""
+    calls = []
+
+    async def chat(messages, **kwargs):
+        calls.append(messages)
+        return json.dumps({
+            "full_name": "Resume", "email": "", "phone": "", "desired_job_title": "Engineer",
+            "professional_summary": "Builds things.", "experience_points": ["Built APIs"],
+            "education_formatted": "BSc", "suggested_skills": ["Python"],
+        })
+
+    monkeypatch.setattr(settings, "AI_BACKEND", "llm")
+    monkeypatch.setattr(ai_service, "get_client", lambda: object())
+    monkeypatch.setattr(ai_service.llm_router, "chat", chat)
+    monkeypatch.setattr(ai_service.ai_cache, "ai_cache", MemoryBlobStore(1024 * 1024))
+    # The contact lines don't survive compaction: the prompt text is identical
+    monkeypatch.setattr(resume_compactor, "compact_resume", lambda text, budget: "Experience\nBuilt APIs")
+    return calls
+
+
+def upload(resume: str) -> ai_schemas.AIGeneratedContent:
+    request = ai_schemas.AIGenerationRequest(
+        full_name="x", email="x@example.com", desired_job_title="Engineer", experience_level="Senior",
+        top_skills=[], personal_strengths="SUMMARIZE THIS RESUME:" + resume,
+    )
+    response = asyncio.run(ai_service.generate_cv_content_from_ai(request))
+    assert response.success, response.error
+    return response.data
+
+
+def test_upload_cache_is_keyed_on_extracted_contact_fields(llm):
+    jane = upload("Jane Doe\njane@example.com\n+44 7700 900123\n\nExperience\nBuilt APIs\n")
+    john = upload("John Roe\njohn@example.com\n+44 7700 900999\n\nExperience\nBuilt APIs\n")
+
+    assert (jane.full_name, jane.email, jane.phone) == ("Jane Doe", "jane@example.com", "+44 7700 900123")
+    assert (john.full_name, john.email, john.phone) == ("John Roe", "john@example.com", "+44 7700 900999")
+    assert len(llm) == 2
+
+
+def test_same_upload_is_served_from_cache(llm):
+    resume = "Jane Doe\njane@example.com\n+44 7700 900123\n\nExperience\nBuilt APIs\n"
+
+    first = upload(resume)
+    again = upload(resume)
+
+    assert again == first
+    assert len(llm) == 1
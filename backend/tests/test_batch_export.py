@@ -0,0 +1,79 @@
+"""
+/cvs/export/batch: the streamed ZIP opens as a normal archive with one entry
+per CV, in request order even when later renders finish first, and a CV that
+fails to render becomes an error entry instead of ending the archive.
+"""
+import io
+import os
+import time
+import zipfile
+
+import pytest
+
+from app.services import export_service
+from app.services.render_pool import RenderPool
+
+
+def slow_pdf(name: str, delay: float):
+    """Render stand-in (runs in a worker process, so it must be importable)."""
+    time.sleep(delay)
+    return f"%PDF-{name}".encode(), None
+
+
+def stub_task(cv_dict, tmpl):
+    name = cv_dict["full_name"]
+    if name == "Broken":
+        return (os._exit, 1)  # the worker dies mid-render
+    return (slow_pdf, name, 1.0 if name == "First" else 0.0)
+
+
+@pytest.fixture
+def two_workers(monkeypatch):
+    pool = RenderPool(processes=2, queue_depth=0, timeout_seconds=30)
+    monkeypatch.setattr(export_service, "render_pool", pool)
+    monkeypatch.setattr(export_service.pdf_cache.pdf_cache, "get", lambda key: None)
+    monkeypatch.setattr(export_service.pdf_cache.pdf_cache, "set", lambda key, value: None)
+    monkeypatch.setattr(export_service, "_pdf_task", stub_task)
+    yield pool
+    pool.shutdown()
+
+
+def create_cv(client, auth_headers, name):
+    response = client.post("/api/cvs", headers=auth_headers, json={
+        "title": name, "template_id": "modern", "data": {"full_name": name},
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_streamed_zip_has_one_entry_per_cv_in_request_order(client, auth_headers, two_workers):
+    ids = [create_cv(client, auth_headers, name) for name in ("Second", "Broken", "Third", "First")]
+    requested = [ids[3], ids[0], ids[1], ids[2], ids[0]]  # duplicates keep their first position
+
+    response = client.post("/api/cvs/export/batch", headers=auth_headers,
+                           json={"cv_ids": requested, "type": "pdf"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+        assert names == [f"{ids[3]}-First.pdf", f"{ids[0]}-Second.pdf",
+                         f"{ids[1]}-Broken.error.txt", f"{ids[2]}-Third.pdf"]
+        assert zf.read(names[0]) == b"%PDF-First"
+        assert zf.read(names[1]) == b"%PDF-Second"
+        assert zf.read(names[2]).startswith(b"PDF rendering failed")
+        assert zf.read(names[3]) == b"%PDF-Third"
+    assert two_workers.stats()["recycled"] == 1
+
+
+def test_streamed_zip_of_html_exports(client, auth_headers):
+    ids = [create_cv(client, auth_headers, name) for name in ("Ann", "Ben")]
+
+    response = client.post("/api/cvs/export/batch", headers=auth_headers,
+                           json={"cv_ids": [ids[1], ids[0]], "type": "html"})
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.namelist() == [f"{ids[1]}-Ben.html", f"{ids[0]}-Ann.html"]
+        assert b"Ben" in zf.read(f"{ids[1]}-Ben.html")
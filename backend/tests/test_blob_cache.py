@@ -0,0 +1,123 @@
+"""
+Blob stores behind the PDF / text / AI caches: LRU eviction and TTL on every
+backend, the disk store doing file I/O outside its lock, and the renderer
+version in the PDF cache key.
+"""
+import builtins
+import time
+
+import pytest
+
+from app.services import blob_cache, pdf_cache
+
+
+@pytest.fixture(params=["memory", "disk", "sqlite"])
+def make_store(request, tmp_path):
+    def make(max_bytes=100, ttl_seconds=0):
+        return blob_cache.build_store(request.param, max_bytes, directory=str(tmp_path / "blobs"),
+                                      sqlite_path=str(tmp_path / "blobs.db"), ttl_seconds=ttl_seconds)
+    return make
+
+
+def test_hooks_are_abstract():
+    class Partial(blob_cache.BlobStore):
+        def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial(100)
+
+
+def test_least_recently_used_is_evicted(make_store):
+    store = make_store(max_bytes=100)
+    store.set("a", b"a" * 40)
+    store.set("b", b"b" * 40)
+    assert store.get("a") == b"a" * 40  # b is now the oldest
+    store.set("c", b"c" * 40)
+
+    assert store.get("b") is None
+    assert store.get("a") == b"a" * 40
+    assert store.get("c") == b"c" * 40
+    stats = store.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 80, 1)
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+
+
+def test_oversized_value_is_not_stored(make_store):
+    store = make_store(max_bytes=10)
+    store.set("big", b"x" * 11)
+    assert store.get("big") is None
+    assert store.stats()["entries"] == 0
+
+
+def test_expired_entry_is_dropped(make_store, monkeypatch):
+    store = make_store(ttl_seconds=60)
+    store.set("k", b"value")
+    assert store.get("k") == b"value"
+
+    later = time.time() + 61
+    monkeypatch.setattr(blob_cache.time, "time", lambda: later)
+
+    assert store.get("k") is None
+    assert store.stats()["expired"] == 1
+    assert store.stats()["entries"] == 0
+
+
+def test_clear_and_delete(make_store):
+    store = make_store()
+    store.set("a", b"1")
+    store.set("b", b"2")
+    store.delete("a")
+    assert store.get("a") is None
+    store.clear()
+    assert store.get("b") is None
+    assert store.stats()["bytes"] == 0
+
+
+def test_disk_store_does_file_io_outside_the_lock(tmp_path, monkeypatch):
+    store = blob_cache.DiskBlobStore(str(tmp_path), max_bytes=100)
+    held = []
+    real_open, real_remove = builtins.open, blob_cache.os.remove
+
+    def checked_open(*args, **kwargs):
+        held.append(store._lock.locked())
+        return real_open(*args, **kwargs)
+
+    def checked_remove(path):
+        held.append(store._lock.locked())
+        return real_remove(path)
+
+    monkeypatch.setattr(blob_cache, "open", checked_open, raising=False)
+    monkeypatch.setattr(blob_cache.os, "remove", checked_remove)
+    monkeypatch.setattr(blob_cache.os, "fdopen", lambda fd, mode: checked_open(fd, mode))
+
+    store.set("a", b"a" * 60)
+    store.get("a")
+    store.set("b", b"b" * 60)  # evicts a
+    store.delete("b")
+
+    assert len(held) == 5
+    assert not any(held)
+    assert store.stats()["entries"] == 0
+
+
+def test_disk_store_reloads_index_in_lru_order(tmp_path):
+    store = blob_cache.DiskBlobStore(str(tmp_path), max_bytes=100)
+    store.set("old", b"o" * 40)
+    time.sleep(0.01)
+    store.set("new", b"n" * 40)
+
+    reloaded = blob_cache.DiskBlobStore(str(tmp_path), max_bytes=50)
+
+    assert reloaded.get("old") is None
+    assert reloaded.get("new") == b"n" * 40
+
+
+def test_pdf_key_changes_with_the_renderer_version(monkeypatch):
+    cv = {"full_name": "Jane", "accentColor": "#ABCDEF"}
+    key = pdf_cache.make_key(cv, "modern", None)
+    assert pdf_cache.make_key(dict(cv, accentColor="abcdef"), "modern", None) == key
+
+    monkeypatch.setattr(pdf_cache, "RENDERER", "2/weasyprint-99")
+
+    assert pdf_cache.make_key(cv, "modern", None) != key
@@ -0,0 +1,98 @@
+"""
+/ai/chat and /ai/chat/stream against the offline (local) AI backend:
+what the server-side session stores, and the scripted question flow.
+"""
+import json
+
+from app.services.chat_sessions import chat_sessions
+
+GREETING = "Hi Test! I'm your AI Resume Architect.\n\nFirst: What is your target **Job Title**?"
+
+
+def sse_events(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        event, data = "message", ""
+        for line in frame.split("\n"):
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data += line[5:].strip()
+        events.append((event, json.loads(data)))
+    return events
+
+
+def user_key(client, auth_headers):
+    return str(client.get("/api/auth/profile", headers=auth_headers).json()["id"])
+
+
+def test_seeded_first_turn_is_stored_once(client, auth_headers):
+    # Older clients send history that already ends with the new message
+    response = client.post("/api/ai/chat/stream", headers=auth_headers, json={
+        "history": [{"role": "assistant", "content": GREETING}, {"role": "user", "content": "Data Scientist"}],
+        "message": "Data Scientist",
+    })
+    assert response.status_code == 200
+    done = dict(sse_events(response.text))["done"]
+
+    turns = chat_sessions.history(user_key(client, auth_headers), done["session_id"])
+
+    assert turns == [
+        {"role": "assistant", "content": GREETING},
+        {"role": "user", "content": "Data Scientist"},
+        {"role": "assistant", "content": done["reply"]},
+    ]
+
+
+def test_history_without_the_new_message_is_stored_the_same(client, auth_headers):
+    response = client.post("/api/ai/chat", headers=auth_headers, json={
+        "history": [{"role": "assistant", "content": GREETING}],
+        "message": "Data Scientist",
+    })
+    body = response.json()
+
+    turns = chat_sessions.history(user_key(client, auth_headers), body["session_id"])
+
+    assert [t["content"] for t in turns] == [GREETING, "Data Scientist", body["reply"]]
+
+
+def run_flow(client, auth_headers, send):
+    """Greeting -> job title -> skills -> level, as the chat page drives it."""
+    history = [{"role": "assistant", "content": GREETING}]
+    session_id = None
+    body = None
+    for answer in ("Data Scientist", "Python, SQL", "Senior"):
+        body = send({"history": [] if session_id else history, "message": answer, "session_id": session_id})
+        session_id = body["session_id"]
+        history += [{"role": "user", "content": answer}, {"role": "assistant", "content": body["reply"]}]
+    return history, body
+
+
+def assert_generated(history, body):
+    assert "**Key Skills**" in history[2]["content"]
+    assert "**Experience Level**" in history[4]["content"]
+    assert body["action"] == "generate"
+    cv = body["cv_data"]
+    assert cv["desired_job_title"] == "Data Scientist"
+    assert cv["suggested_skills"] == ["Python", "SQL"]
+    assert cv["professional_summary"].startswith("Senior Data Scientist with hands-on experience in Python, SQL")
+
+
+def test_local_flow_through_chat(client, auth_headers):
+    def send(payload):
+        response = client.post("/api/ai/chat", headers=auth_headers, json=payload)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    assert_generated(*run_flow(client, auth_headers, send))
+
+
+def test_local_flow_through_chat_stream(client, auth_headers):
+    def send(payload):
+        response = client.post("/api/ai/chat/stream", headers=auth_headers, json=payload)
+        assert response.status_code == 200, response.text
+        events = sse_events(response.text)
+        assert [name for name, _ in events][0] == "delta"
+        return dict(events)["done"]
+
+    assert_generated(*run_flow(client, auth_headers, send))
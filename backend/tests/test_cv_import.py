@@ -0,0 +1,77 @@
+"""
+/cvs/import: the NDJSON progress stream (per-file lines in order, partial
+failures, batch commits) and the per-file / archive checks.
+"""
+import io
+import json
+import zipfile
+
+import pytest
+
+from app.core.config import settings
+
+
+def resume(name: str, email: str) -> bytes:
+    return (f"{name}\n{email}\n+44 7700 900123\n\nSummary\nBackend engineer.\n\n"
+            "Experience\n- Built APIs\n\nSkills\nPython, SQL\n").encode()
+
+
+def ndjson(body: str):
+    return [json.loads(line) for line in body.splitlines() if line]
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    # One file in flight keeps the per-file lines in request order
+    monkeypatch.setattr(settings, "IMPORT_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1024 * 1024)
+
+
+def test_import_streams_files_failures_and_batches(client, auth_headers, small_batches):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("c.txt", resume("Carol Example", "carol@example.com"))
+    files = [
+        ("files", ("a.txt", resume("Alice Example", "alice@example.com"))),
+        ("files", ("fake.pdf", b"MZ\x90 not a pdf")),
+        ("files", ("huge.txt", b"x" * (1024 * 1024 + 1))),
+        ("files", ("b.txt", resume("Bob Example", "bob@example.com"))),
+        ("files", ("more.zip", archive.getvalue())),
+    ]
+
+    response = client.post("/api/cvs/import", headers=auth_headers, files=files)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = ndjson(response.text)
+    assert events[0] == {"type": "start", "files": 5, "structure": "regex"}
+    assert events[-1]["type"] == "done"
+    assert (events[-1]["imported"], events[-1]["failed"]) == (3, 2)
+
+    file_lines = [e for e in events if e["type"] == "file"]
+    assert [e["file"] for e in file_lines] == ["a.txt", "fake.pdf", "huge.txt", "b.txt", "c.txt"]
+    assert [e["index"] for e in file_lines] == [1, 2, 3, 4, 5]
+    status = {e["file"]: (e["status"], e.get("error")) for e in file_lines}
+    assert status["fake.pdf"] == ("failed", "File is not a valid PDF")
+    assert status["huge.txt"] == ("failed", "File too large (max 1 MB)")
+    assert status["a.txt"][0] == status["b.txt"][0] == status["c.txt"][0] == "parsed"
+
+    batches = [e for e in events if e["type"] == "batch"]
+    assert [(b["status"], b["files"]) for b in batches] == [
+        ("committed", ["a.txt", "b.txt"]),
+        ("committed", ["c.txt"]),
+    ]
+    # Each batch line comes after the file lines it commits
+    assert events.index(batches[0]) > events.index(file_lines[3])
+
+    ids = [cv_id for b in batches for cv_id in b["cv_ids"]]
+    titles = [client.get(f"/api/cvs/{cv_id}", headers=auth_headers).json()["title"] for cv_id in ids]
+    assert titles == ["Alice Example", "Bob Example", "Carol Example"]
+
+
+def test_corrupt_archive_is_rejected(client, auth_headers):
+    response = client.post("/api/cvs/import", headers=auth_headers,
+                           files=[("files", ("broken.zip", b"PK\x03\x04 truncated"))])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Not a valid ZIP archive"
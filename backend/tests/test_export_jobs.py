@@ -0,0 +1,168 @@
+"""
+ExportJobQueue: jobs are claimed atomically (one render per job however many
+queues share the table), no DB session is held across the render, expired
+jobs are purged while the queue is busy, and /export-jobs caps the jobs a
+user may have in progress.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import main_api
+from app.core.config import settings
+from app.crud import export_job as export_job_crud
+from app.database import SessionLocal
+from app.models.export_job import ExportJob
+from app.services import export_service
+from app.services.export_jobs import ExportJobQueue
+
+
+class TrackedSessions:
+    """Session factory that counts sessions currently open."""
+
+    def __init__(self):
+        self.open = 0
+
+    def __call__(self):
+        db = SessionLocal()
+        self.open += 1
+        close = db.close
+
+        def tracked_close():
+            self.open -= 1
+            close()
+
+        db.close = tracked_close
+        return db
+
+
+@pytest.fixture
+def cv(client, auth_headers):
+    response = client.post("/api/cvs", headers=auth_headers, json={
+        "title": "Job test", "template_id": "modern",
+        "data": {"personal_info": {"full_name": "Job Tester", "email": "jobs@example.com"}},
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def new_job(cv, status="queued", finished_at=None):
+    db = SessionLocal()
+    try:
+        job = export_job_crud.create_job(db, cv["user_id"], cv["id"], "html")
+        if status != "queued":
+            job.status, job.finished_at = status, finished_at
+            db.commit()
+        return job.id
+    finally:
+        db.close()
+
+
+def job_status(job_id):
+    db = SessionLocal()
+    try:
+        job = export_job_crud.get_job_by_id(db, job_id)
+        return job.status if job else None
+    finally:
+        db.close()
+
+
+def test_job_is_rendered_once_by_competing_queues(cv, monkeypatch):
+    renders = []
+    real_render = export_service.render_export
+
+    def slow_render(cv_dict, tmpl, fmt):
+        renders.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return real_render(cv_dict, tmpl, fmt)
+
+    monkeypatch.setattr(export_service, "render_export", slow_render)
+    job_id = new_job(cv)
+    queues = [ExportJobQueue(SessionLocal, workers=1) for _ in range(3)]
+
+    threads = [threading.Thread(target=q.process, args=(job_id,)) for q in queues]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(renders) == 1
+    assert job_status(job_id) == "done"
+    assert sorted(q.stats()["skipped"] for q in queues) == [0, 1, 1]
+    assert sum(q.stats()["completed"] for q in queues) == 1
+
+
+def test_no_session_is_held_during_the_render(cv, monkeypatch):
+    sessions = TrackedSessions()
+    open_during_render = []
+    real_render = export_service.render_export
+
+    def render(cv_dict, tmpl, fmt):
+        open_during_render.append(sessions.open)
+        return real_render(cv_dict, tmpl, fmt)
+
+    monkeypatch.setattr(export_service, "render_export", render)
+    job_id = new_job(cv)
+
+    ExportJobQueue(sessions, workers=1).process(job_id)
+
+    assert open_during_render == [0]
+    assert sessions.open == 0
+    assert job_status(job_id) == "done"
+
+
+def test_busy_queue_still_purges_expired_jobs(cv):
+    expired = new_job(cv, status="done", finished_at=datetime.utcnow() - timedelta(hours=2))
+    jobs = ExportJobQueue(SessionLocal, workers=1, job_ttl_seconds=3600)
+    jobs.start()
+    try:
+        assert job_status(expired) is None  # start() sweeps
+
+        expired = new_job(cv, status="done", finished_at=datetime.utcnow() - timedelta(hours=2))
+        jobs._last_sweep = time.monotonic() - jobs.PURGE_INTERVAL_SECONDS
+        job_id = new_job(cv)
+        jobs.enqueue(job_id)
+        deadline = time.monotonic() + 5
+        while job_status(job_id) != "done" and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        jobs.stop()
+
+    assert job_status(job_id) == "done"
+    assert job_status(expired) is None
+
+
+def test_stale_running_job_is_requeued(cv):
+    job_id = new_job(cv)
+    db = SessionLocal()
+    try:
+        assert export_job_crud.claim_job(db, job_id)
+        assert not export_job_crud.claim_job(db, job_id)
+        db.query(ExportJob).filter(ExportJob.id == job_id).update(
+            {ExportJob.started_at: datetime.utcnow() - timedelta(hours=1)})
+        db.commit()
+    finally:
+        db.close()
+
+    jobs = ExportJobQueue(SessionLocal, workers=1, stale_seconds=600)
+    jobs._sweep()
+
+    assert job_status(job_id) == "queued"
+    assert jobs._queue.get_nowait() == job_id
+
+
+def test_user_cap_on_jobs_in_progress(client, cv, auth_headers, monkeypatch):
+    monkeypatch.setattr(main_api.export_jobs, "enqueue", lambda job_id: None)  # keep them queued
+    db = SessionLocal()
+    try:
+        in_progress = export_job_crud.count_unfinished_jobs(db, cv["user_id"])
+    finally:
+        db.close()
+    monkeypatch.setattr(settings, "EXPORT_JOB_MAX_PER_USER", in_progress + 2)
+
+    statuses = [client.post(f"/api/cvs/{cv['id']}/export-jobs/html", headers=auth_headers).status_code
+                for _ in range(3)]
+
+    assert statuses == [202, 202, 429]
@@ -0,0 +1,277 @@
+"""
+ProviderRouter against stand-in OpenAI-compatible providers: hedging after
+the primary's p95 (time to first chunk for streams), failover on errors and
+the circuit breaker with its single half-open probe.
+
+Each provider is a local HTTP server (GROQ_BASE_URL / OPENAI_BASE_URL point
+the clients at it) whose latency and status are set per test.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_client import LLMClients
+from app.services.llm_router import LatencyWindow, ProviderRouter
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients of cancelled (hedged) calls hang up mid-reply
+
+
+class StandIn:
+    """One fake provider: replies with its own name after `delay` seconds."""
+
+    def __init__(self, name):
+        self.name = name
+        self.delay = 0.0
+        self.status = 200
+        self.calls = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                stand_in.calls += 1
+                time.sleep(stand_in.delay)
+                if stand_in.status != 200:
+                    return self._send(stand_in.status, {"error": {"message": "stand-in failure"}})
+                if body.get("stream"):
+                    return self._stream()
+                return self._send(200, {
+                    "id": "x", "object": "chat.completion", "created": 0, "model": "m",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": stand_in.name}}],
+                })
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for piece in (stand_in.name, " done"):
+                    chunk = {"id": "x", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                             "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = QuietServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    groq, openai = StandIn("groq"), StandIn("openai")
+    for stand_in in (groq, openai):
+        prefix = stand_in.name.upper()
+        monkeypatch.setattr(settings, f"{prefix}_API_KEY", "test")
+        monkeypatch.setattr(settings, f"{prefix}_BASE_URL", stand_in.base_url)
+    yield groq, openai
+    groq.close()
+    openai.close()
+
+
+def make_router(**overrides):
+    options = dict(hedge_enabled=True, hedge_default_delay=0.2, hedge_min_delay=0.05,
+                   window=50, failure_threshold=2, cooldown_seconds=0.3)
+    options.update(overrides)
+    return ProviderRouter(LLMClients(max_connections=10, max_keepalive=5, keepalive_seconds=5,
+                                     timeout_seconds=5), **options)
+
+
+def run(scenario):
+    async def main():
+        router = make_router()
+        try:
+            return await scenario(router)
+        finally:
+            await router.clients.aclose()
+    return asyncio.run(main())
+
+
+def seed_latency(window: LatencyWindow, seconds: float) -> None:
+    for _ in range(LatencyWindow.MIN_SAMPLES):
+        window.record(seconds)
+
+
+def test_fast_primary_is_not_hedged(providers):
+    async def scenario(router):
+        return await router.chat(MESSAGES), router.hedges
+
+    assert run(scenario) == ("groq", 0)
+    assert providers[1].calls == 0
+
+
+def test_hedge_fires_after_primary_p95(providers):
+    groq, openai = providers
+    groq.delay = 1.0
+
+    async def scenario(router):
+        seed_latency(router.health["groq"].latency, 0.3)
+        started = time.monotonic()
+        reply = await router.chat(MESSAGES)
+        return reply, time.monotonic() - started, router
+
+    reply, elapsed, router = run(scenario)
+    assert reply == "openai"
+    assert router.hedges == 1
+    # Secondary started at the primary's p95 (0.3s), not before and not after the primary finished
+    assert 0.3 <= elapsed < 0.9
+    assert router.health["openai"].wins == 1
+    # The cancelled primary call is kept as a censored sample
+    assert router.health["groq"].stats()["censored"] == 1
+
+
+def test_primary_within_p95_wins_without_hedge(providers):
+    groq, openai = providers
+    groq.delay = 0.1
+
+    async def scenario(router):
+        seed_latency(router.health["groq"].latency, 0.5)
+        return await router.chat(MESSAGES), router.hedges
+
+    assert run(scenario) == ("groq", 0)
+    assert openai.calls == 0
+
+
+def test_error_fails_over_to_secondary(providers):
+    groq, openai = providers
+    groq.status = 500
+
+    async def scenario(router):
+        return await router.chat(MESSAGES), router
+
+    reply, router = run(scenario)
+    assert reply == "openai"
+    assert router.failovers == 1
+    assert router.hedges == 0
+    assert router.health["groq"].errors == 1
+
+
+def test_stream_fails_over_before_first_chunk(providers):
+    groq, openai = providers
+    groq.status = 500
+
+    async def scenario(router):
+        return "".join([piece async for piece in router.stream_chat(MESSAGES)]), router.failovers
+
+    assert run(scenario) == ("openai done", 1)
+
+
+def test_breaker_opens_then_closes_after_cooldown(providers):
+    groq, openai = providers
+    groq.status = 500
+
+    async def scenario(router):
+        health = router.health["groq"]
+        for _ in range(2):
+            assert await router.chat(MESSAGES) == "openai"
+        assert health.state == "open"
+        assert router.route() == ["openai", "groq"]
+
+        # While open, the primary is skipped entirely
+        calls = groq.calls
+        assert await router.chat(MESSAGES) == "openai"
+        assert groq.calls == calls
+
+        await asyncio.sleep(0.35)
+        assert health.state == "half_open"
+        groq.status = 200
+        assert await router.chat(MESSAGES) == "groq"
+        return health.state
+
+    assert run(scenario) == "closed"
+
+
+def test_half_open_lets_exactly_one_probe_through(providers):
+    groq, openai = providers
+    groq.status = 500
+
+    async def scenario(router):
+        health = router.health["groq"]
+        for _ in range(2):
+            await router.chat(MESSAGES)
+        await asyncio.sleep(0.35)
+        assert health.state == "half_open"
+
+        # Still broken (and slow enough to overlap the other calls, but not to
+        # be hedged): one probe, everything else goes to the secondary
+        groq.delay = 0.1
+        calls = groq.calls
+        replies = await asyncio.gather(*(router.chat(MESSAGES) for _ in range(5)))
+        assert replies == ["openai"] * 5
+        assert groq.calls == calls + 1
+        assert health.probes == 1
+        # The failed probe re-opens the breaker for another cooldown
+        return health.state, health.probing
+
+    assert run(scenario) == ("open", False)
+
+
+def stream_text(router):
+    async def collect():
+        return "".join([piece async for piece in router.stream_chat(MESSAGES)])
+    return collect()
+
+
+def test_stream_hedges_on_time_to_first_chunk(providers):
+    groq, openai = providers
+    groq.delay = 1.0
+
+    async def scenario(router):
+        seed_latency(router.health["groq"].first_chunk, 0.3)
+        started = time.monotonic()
+        text = await stream_text(router)
+        return text, time.monotonic() - started, router
+
+    text, elapsed, router = run(scenario)
+    assert text == "openai done"
+    assert router.hedges == 1
+    assert 0.3 <= elapsed < 0.9
+    assert router.health["groq"].first_chunk.stats()["censored"] == 1
+
+
+def test_fast_stream_is_not_hedged_and_keeps_chat_window_clean(providers):
+    groq, openai = providers
+
+    async def scenario(router):
+        seed_latency(router.health["groq"].first_chunk, 0.5)
+        return await stream_text(router), router
+
+    text, router = run(scenario)
+    assert text == "groq done"
+    assert router.hedges == 0
+    assert openai.calls == 0
+    health = router.health["groq"]
+    # Streams feed the first-chunk window only; the chat hedge delay is untouched
+    assert len(health.latency.samples) == 0
+    assert len(health.first_chunk.samples) == LatencyWindow.MIN_SAMPLES + 1
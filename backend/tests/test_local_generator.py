@@ -0,0 +1,51 @@
+"""local_generator.local_chat_reply: answers land in the slot of the question they reply to."""
+from app.services import local_generator
+from app.services.local_generator import _QUESTIONS, local_chat_reply
+
+GREETING = "Hi! First: What is your target **Job Title**?"
+
+
+def turn(role, content):
+    return {"role": role, "content": content}
+
+
+def test_asks_the_questions_in_order():
+    assert local_chat_reply([turn("assistant", GREETING)], "Data Scientist")["reply"] == _QUESTIONS[1]
+    history = [turn("assistant", GREETING), turn("user", "Data Scientist"), turn("assistant", _QUESTIONS[1])]
+    assert local_chat_reply(history, "Python, SQL")["reply"] == _QUESTIONS[2]
+
+
+def test_duplicated_answer_does_not_shift_slots():
+    history = [
+        turn("assistant", GREETING),
+        turn("user", "Data Scientist"),
+        turn("user", "Data Scientist"),  # re-sent with the seed
+        turn("assistant", _QUESTIONS[1]),
+    ]
+    result = local_chat_reply(history, "Python, SQL")
+    assert result == {"reply": _QUESTIONS[2], "action": "chat", "data": None}
+
+    history += [turn("user", "Python, SQL"), turn("assistant", _QUESTIONS[2])]
+    data = local_chat_reply(history, "Senior")["data"]
+    assert data["desired_job_title"] == "Data Scientist"
+    assert data["top_skills"] == ["Python", "SQL"]
+    assert data["experience_level"] == "Senior"
+
+
+def test_trimmed_history_keeps_answers_with_their_questions():
+    # The greeting and first answer fell out of the history window
+    history = [turn("assistant", _QUESTIONS[1]), turn("user", "Go, Rust"), turn("assistant", _QUESTIONS[2])]
+    result = local_chat_reply(history, "Mid")
+    assert result["reply"] == _QUESTIONS[0]
+
+    history += [turn("user", "Mid"), turn("assistant", result["reply"])]
+    data = local_chat_reply(history, "Platform Engineer")["data"]
+    assert (data["desired_job_title"], data["top_skills"], data["experience_level"]) == (
+        "Platform Engineer", ["Go", "Rust"], "Mid")
+
+
+def test_same_answer_to_different_questions_is_kept():
+    history = [turn("assistant", GREETING), turn("user", "Senior Engineer"), turn("assistant", _QUESTIONS[1]),
+               turn("user", "Python"), turn("assistant", _QUESTIONS[2])]
+    assert local_chat_reply(history, "Senior Engineer")["action"] == "generate"
+    assert local_generator._asked("random chatter") is None
@@ -0,0 +1,63 @@
+"""
+parse_pool.extract_text_async: page-parallel PDF extraction and its
+fallback to the in-thread parser when a pool worker fails.
+"""
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from app.services import parse_pool as parse_pool_module
+from app.services import parser_service
+from app.services.render_pool import RenderPool
+
+
+def make_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    font = DictionaryObject({NameObject("/Type"): NameObject("/Font"), NameObject("/Subtype"): NameObject("/Type1"),
+                             NameObject("/BaseFont"): NameObject("/Helvetica")})
+    for n in range(pages):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 10 Tf 40 700 Td (Page {n} built scalable Python services) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+PDF = make_pdf(12)  # above PARSE_PARALLEL_MIN_PAGES
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    test_pool = RenderPool(processes=1, queue_depth=2, timeout_seconds=1.0)
+    test_pool.start()
+    monkeypatch.setattr(parse_pool_module, "parse_pool", test_pool)
+    yield test_pool
+    test_pool.shutdown()
+
+
+def extract(max_chars=None):
+    return asyncio.run(parse_pool_module.extract_text_async(io.BytesIO(PDF), "cv.pdf", max_chars))
+
+
+def test_parallel_extraction_matches_sequential(pool):
+    assert extract() == parser_service.extract_text(PDF, "cv.pdf")
+    assert pool.stats()["completed"] >= 1
+
+
+@pytest.mark.parametrize("task", [(os._exit, 1), (time.sleep, 5)], ids=["crash", "timeout"])
+def test_failed_worker_falls_back_to_thread_parser(pool, monkeypatch, task):
+    # Every page-range task is swapped for one that kills or hangs the worker
+    monkeypatch.setattr(pool, "submit", lambda fn, *args: RenderPool.submit(pool, *task))
+
+    text = extract()
+
+    assert "Page 11 built scalable Python services" in text
+    assert text == parser_service.extract_text(PDF, "cv.pdf")
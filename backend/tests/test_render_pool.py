@@ -0,0 +1,101 @@
+"""
+RenderPool with one worker process: a hung task gets its worker killed and
+replaced, a crashed worker is replaced, and a full pool is refused up front
+(503 + Retry-After from the export route).
+
+Tasks are picklable builtins standing in for the WeasyPrint render: time.sleep
+hangs, os._exit crashes the worker and os.getpid tells workers apart.
+"""
+import os
+import time
+
+import pytest
+
+from app.services import export_service
+from app.services.render_pool import RenderPoolFull, RenderTimeout, RenderWorkerCrashed
+
+
+def test_timeout_kills_and_replaces_the_worker(render_pool):
+    first = render_pool.run(os.getpid)  # spawn the worker before timing anything
+
+    render_pool.timeout_seconds = 0.5
+    started = time.monotonic()
+    with pytest.raises(RenderTimeout):
+        render_pool.run(time.sleep, 30)
+    assert time.monotonic() - started < 5
+
+    render_pool.timeout_seconds = 30
+    second = render_pool.run(os.getpid)
+    assert second != first
+    stats = render_pool.stats()
+    assert (stats["timeouts"], stats["recycled"], stats["workers"], stats["in_flight"]) == (1, 1, 1, 0)
+
+
+def test_crashed_worker_is_replaced(render_pool):
+    first = render_pool.run(os.getpid)
+
+    with pytest.raises(RenderWorkerCrashed):
+        render_pool.run(os._exit, 1)
+
+    assert render_pool.run(os.getpid) != first
+    assert render_pool.run(pow, 2, 10) == 1024
+    stats = render_pool.stats()
+    assert (stats["recycled"], stats["workers"], stats["in_flight"]) == (1, 1, 0)
+
+
+def test_full_pool_refuses_instead_of_queueing(render_pool):
+    busy = render_pool.submit(time.sleep, 1)
+
+    with pytest.raises(RenderPoolFull) as full:
+        render_pool.submit(os.getpid)
+
+    assert full.value.retry_after >= 1
+    assert render_pool.stats()["rejected"] == 1
+    busy.result()
+    render_pool.run(os.getpid)  # the slot came back
+
+
+@pytest.fixture
+def cv_id(client, auth_headers):
+    response = client.post("/api/cvs", headers=auth_headers, json={
+        "title": "Export test", "template_id": "modern",
+        "data": {"full_name": "Export Tester", "email": "export@example.com"},
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def stub_render(monkeypatch, *task):
+    monkeypatch.setattr(export_service, "_pdf_task", lambda cv_dict, tmpl: task)
+
+
+def test_export_renders_on_the_pool(client, auth_headers, cv_id, export_pool, monkeypatch):
+    stub_render(monkeypatch, tuple, (b"%PDF-stub", None))
+
+    response = client.get(f"/api/cvs/{cv_id}/export/pdf", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.content == b"%PDF-stub"
+    assert export_pool.stats()["completed"] == 1
+
+
+def test_export_is_503_while_the_pool_is_full(client, auth_headers, cv_id, export_pool, monkeypatch):
+    stub_render(monkeypatch, tuple, (b"%PDF-stub", None))
+    busy = export_pool.submit(time.sleep, 1)
+
+    response = client.get(f"/api/cvs/{cv_id}/export/pdf", headers=auth_headers)
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    busy.result()
+
+
+def test_export_is_504_when_the_render_hangs(client, auth_headers, cv_id, export_pool, monkeypatch):
+    export_pool.run(os.getpid)
+    export_pool.timeout_seconds = 0.5
+    stub_render(monkeypatch, time.sleep, 30)
+
+    response = client.get(f"/api/cvs/{cv_id}/export/pdf", headers=auth_headers)
+
+    assert response.status_code == 504
+    assert export_pool.stats()["recycled"] == 1
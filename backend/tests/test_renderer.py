@@ -0,0 +1,159 @@
+"""
+Parity tests for services/renderer.
+
+Every seed template, rendered through the shared precompiled renderer, must
+produce the same body and stylesheet as the pystache PDF path it replaced
+(legacy_render below is that path, minus the WeasyPrint call). camelCase
+input from the editor must render like the equivalent stored snake_case CV.
+"""
+import re
+
+import pystache
+import pytest
+
+from app.core.seed_data import PERMANENT_TEMPLATES
+from app.services import renderer
+
+
+# --- previous PDF path (file_service.create_pdf_from_template before renderer.py) ---
+def legacy_clean_hex(color_value, default_hex="333333"):
+    if not color_value:
+        return default_hex
+    clean_hex = str(color_value).strip().lstrip("#")
+    if re.fullmatch(r"[0-9a-fA-F]{3}|[0-9a-fA-F]{6}", clean_hex):
+        if len(clean_hex) == 3:
+            clean_hex = "".join([c * 2 for c in clean_hex])
+        return clean_hex
+    return default_hex
+
+
+def legacy_render(template_html, template_css, cv_data):
+    accent = legacy_clean_hex(cv_data.get("accentColor") or cv_data.get("accent_color"), "2c3e50")
+    text_col = legacy_clean_hex(cv_data.get("textColor") or cv_data.get("text_color"), "333333")
+    font_name = cv_data.get("fontFamily") or cv_data.get("font_family") or "sans-serif"
+    font_name = re.sub(r'[;"\'#]+', "", font_name).strip()
+
+    render_data = {
+        **cv_data,
+        "accent_color": accent,
+        "text_color": text_col,
+        "font_family": font_name,
+        "experience": (cv_data.get("experience") or "").replace("\n", "<br/>"),
+        "education": (cv_data.get("education") or "").replace("\n", "<br/>"),
+        "summary": (cv_data.get("summary") or "").replace("\n", "<br/>"),
+        "skills": cv_data.get("skills") if isinstance(cv_data.get("skills"), list) else [],
+    }
+    if isinstance(cv_data.get("skills"), str):
+        render_data["skills"] = [s.strip() for s in cv_data.get("skills").split(",") if s.strip()]
+
+    compiled_html = pystache.render(template_html, render_data)
+    compiled_css = pystache.render(template_css, render_data)
+    if "##" in compiled_css:
+        compiled_css = compiled_css.replace("##", "#")
+    compiled_css = re.sub(r":\s*#\s*;", f": #{text_col};", compiled_css)
+    compiled_css = re.sub(r":\s*#\s*\}", f": #{text_col}", compiled_css)
+    compiled_css = re.sub(r"#\s+([0-9a-fA-F])", r"#\1", compiled_css)
+    return compiled_html, compiled_css
+
+
+# --- sample CVs (stored snake_case shape, see schemas.cv.CVData) ---
+FULL_CV = {
+    "full_name": "Jane Doe",
+    "email": "jane.doe@example.com",
+    "phone": "+1 555 123 4567",
+    "job_title": "Senior Backend Engineer",
+    "summary": "Backend engineer.\nTen years of APIs & data pipelines.",
+    "experience": "Acme Corp - Lead Engineer\nMigrated the monolith <b>twice</b>\nCut p95 latency by 40%",
+    "education": "BSc Computer Science\nUniversity of Somewhere, 2014",
+    "skills": ["Python", "FastAPI", "PostgreSQL"],
+    "location": "Berlin, Germany",
+    "hobbies": ["Climbing", "Chess"],
+    "languages": ["English", "German"],
+    "certifications": ["AWS Solutions Architect"],
+    "linkedin": "linkedin.com/in/janedoe",
+    "github": "github.com/janedoe",
+    "portfolio": "janedoe.dev",
+    "profile_image": "data:image/png;base64,iVBORw0KGgo=",
+    "accentColor": "#8e44ad",
+    "textColor": "#222222",
+    "fontFamily": "Georgia, serif",
+}
+
+MINIMAL_CV = {
+    "full_name": "Sam Lee",
+    "email": "sam@example.com",
+    "phone": "",
+    "job_title": "",
+    "summary": "",
+    "experience": "",
+    "education": "",
+    "skills": [],
+}
+
+SHORTHAND_CV = {
+    **MINIMAL_CV,
+    "job_title": "Designer",
+    "skills": "Figma, Sketch , ,Illustrator",
+    "accentColor": "#a1b",
+    "textColor": "not-a-colour",
+    "fontFamily": "'Roboto', sans-serif",
+}
+
+SNAKE_CVS = {"full": FULL_CV, "minimal": MINIMAL_CV, "shorthand": SHORTHAND_CV}
+
+# Editor (React) field names for the snake_case keys that differ
+CAMEL_KEYS = {"full_name": "fullName", "job_title": "jobTitle"}
+
+
+def to_camel(cv):
+    return {CAMEL_KEYS.get(k, k): v for k, v in cv.items()}
+
+
+TEMPLATES = {t["id"]: t for t in PERMANENT_TEMPLATES}
+
+
+def test_every_seed_template_is_covered():
+    assert len(TEMPLATES) == len(PERMANENT_TEMPLATES) == 5
+
+
+@pytest.mark.parametrize("cv_name", sorted(SNAKE_CVS))
+@pytest.mark.parametrize("template_id", sorted(TEMPLATES))
+def test_snake_case_matches_legacy_pdf_path(template_id, cv_name):
+    tmpl, cv = TEMPLATES[template_id], SNAKE_CVS[cv_name]
+    expected_body, expected_css = legacy_render(tmpl["html_content"], tmpl["css_styles"], cv)
+
+    rendered = renderer.render(tmpl["html_content"], tmpl["css_styles"], cv, template_id)
+
+    assert rendered.body == expected_body
+    assert rendered.css == expected_css
+
+
+@pytest.mark.parametrize("cv_name", sorted(SNAKE_CVS))
+@pytest.mark.parametrize("template_id", sorted(TEMPLATES))
+def test_camel_case_matches_legacy_pdf_path(template_id, cv_name):
+    tmpl, cv = TEMPLATES[template_id], SNAKE_CVS[cv_name]
+    expected_body, expected_css = legacy_render(tmpl["html_content"], tmpl["css_styles"], cv)
+
+    rendered = renderer.render(tmpl["html_content"], tmpl["css_styles"], to_camel(cv), template_id)
+
+    assert rendered.body == expected_body
+    assert rendered.css == expected_css
+
+
+@pytest.mark.parametrize("template_id", sorted(TEMPLATES))
+def test_preview_document_embeds_the_same_render(template_id):
+    tmpl = TEMPLATES[template_id]
+    rendered = renderer.render(tmpl["html_content"], tmpl["css_styles"], FULL_CV, template_id)
+
+    document = renderer.render_template_internal(tmpl["html_content"], tmpl["css_styles"], FULL_CV, template_id)
+
+    assert rendered.body in document
+    assert rendered.css in document
+    assert "Error generating preview" not in document
+
+
+def test_compiled_template_is_reused_across_renders():
+    tmpl = TEMPLATES["modern"]
+    first = renderer.get_compiled(tmpl["html_content"], tmpl["css_styles"], "modern")
+    renderer.render(tmpl["html_content"], tmpl["css_styles"], FULL_CV, "modern")
+    assert renderer.get_compiled(tmpl["html_content"], tmpl["css_styles"], "modern") is first
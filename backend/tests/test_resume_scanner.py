@@ -0,0 +1,87 @@
+"""
+resume_scanner.scan() against the regex heuristics it replaced (kept here
+verbatim as the reference): same name / email / phone and cleaned text on
+sample resumes, plus the one intended difference (digits inside links and
+email addresses are not a phone number).
+"""
+import re
+
+import pytest
+
+from app.services import ai_service, resume_scanner
+
+
+def legacy_clean_pdf_text(text: str) -> str:
+    text = text.replace('\x00', '')
+    text = re.sub(r'[^\x20-\x7E\n]', '', text)
+    return text.strip()
+
+
+def legacy_extract_personal_info_regex(cv_text: str) -> dict:
+    info = {"full_name": "", "email": "", "phone": "", "job_title": ""}
+
+    email_match = re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', cv_text)
+    if email_match:
+        info["email"] = email_match.group(0)
+
+    phone_match = re.search(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]', cv_text)
+    if phone_match:
+        info["phone"] = phone_match.group(0).strip()
+
+    lines = [l for l in cv_text.split('\n') if l.strip()]
+    blacklist = ["Curriculum", "Vitae", "Resume", "Page", "Contact", "Phone", "Email", "Address", "Education"]
+
+    for line in lines[:5]:
+        clean_line = line.strip()
+        if len(clean_line.split()) <= 4 and not any(c.isdigit() for c in clean_line) and "@" not in clean_line:
+            if not any(b.upper() in clean_line.upper() for b in blacklist):
+                info["full_name"] = clean_line
+                break
+
+    return info
+
+
+SAMPLES = {
+    "plain": (
+        "Jane Doe\njane.doe@example.com\n+44 7700 900123\n\n"
+        "Summary\nBackend engineer with 8 years of Python.\n\n"
+        "Experience\n- Built APIs at Acme (2016-2024)\n\nSkills\nPython, SQL, Docker\n"
+    ),
+    "title-first": (
+        "CURRICULUM VITAE\n\n   Page 1 of 2\nJohn  Q. Public\nContact: john@mail.co.uk | (555) 123-4567\n"
+        "Address: 1 Main St\nEducation\nBSc Computer Science, 2012\n"
+    ),
+    "no-name-in-header": (
+        "Senior Software Engineer at Example Corporation Ltd\nemail: a.b+cv@sub.example.org\n"
+        "Phone 0161 496 0000\nExperience: 10 years\nResume available on request\nMaria Garcia\n"
+    ),
+    "pdf-noise": (
+        "\x00\x00Anaïs Dupont\x07\n• anais@example.fr • 06 12 34 56 78\n"
+        "ﬁnance analyst\tParis\r\nSkills\r\nExcel; VBA\n"
+    ),
+    "nothing-found": "resume\n\n12345\nwork@\n",
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize("text", SAMPLES.values(), ids=SAMPLES.keys())
+def test_scan_matches_the_legacy_extraction(text):
+    cleaned = legacy_clean_pdf_text(text)
+    assert ai_service.clean_pdf_text(text) == cleaned
+
+    expected = legacy_extract_personal_info_regex(cleaned)
+    found = resume_scanner.scan(cleaned)
+    assert (found.full_name, found.email, found.phone) == (
+        expected["full_name"], expected["email"], expected["phone"])
+
+    info = ai_service.extract_personal_info_regex(cleaned)
+    assert {k: info[k] for k in expected} == expected
+
+
+def test_digits_in_links_and_emails_are_not_a_phone():
+    text = "Sam Lee\nlinkedin.com/in/sam-lee-1234567890\nsam.2024123456@example.com\n+1 415 555 0100\n"
+
+    assert legacy_extract_personal_info_regex(text)["phone"] == "1234567890"
+    found = resume_scanner.scan(text)
+    assert found.phone == "+1 415 555 0100"
+    assert found.linkedin == "linkedin.com/in/sam-lee-1234567890"
@@ -0,0 +1,40 @@
+"""
+CompiledTemplateCache: a new version of a stored template replaces the old
+one, while templates without an id (ad-hoc sources) coexist by content.
+"""
+from datetime import datetime
+
+from app.services.template_cache import CompiledTemplateCache
+
+
+def lookup(cache, key, calls):
+    return cache.get_or_compile(key, lambda: calls.append(key) or len(calls))
+
+
+def test_new_version_of_a_template_drops_the_old_one():
+    cache = CompiledTemplateCache(max_entries=8)
+    calls = []
+    v1 = cache.make_key("modern", datetime(2024, 1, 1), "<p>{{a}}</p>", "p {}")
+    v2 = cache.make_key("modern", datetime(2024, 2, 1), "<p>{{b}}</p>", "p {}")
+    other = cache.make_key("classic", None, "<p>{{a}}</p>", "p {}")
+
+    lookup(cache, v1, calls)
+    lookup(cache, other, calls)
+    lookup(cache, v2, calls)
+
+    assert set(cache._entries) == {other, v2}
+    assert cache.stats()["evictions"] == 0
+
+
+def test_templates_without_id_do_not_evict_each_other():
+    cache = CompiledTemplateCache(max_entries=8)
+    calls = []
+    first = cache.make_key("", None, "<p>one</p>", "")
+    second = cache.make_key(None, None, "<p>two</p>", "")
+
+    for _ in range(3):
+        lookup(cache, first, calls)
+        lookup(cache, second, calls)
+
+    assert calls == [first, second]
+    assert cache.stats()["hits"] == 4
@@ -0,0 +1,108 @@
+"""
+Streaming multipart uploads (main_api._receive_form): early magic-byte
+rejection, size caps, and closing whatever was spooled before a rejection.
+"""
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app import main_api
+from app.services import parser_service
+
+BOUNDARY = "testboundary"
+CHUNK = 64 * 1024
+
+
+def multipart(filename: str, content: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def streaming_request(body: bytes):
+    """A request streamed in CHUNK pieces without Content-Length; returns it and the chunks handed out."""
+    chunks = [body[i:i + CHUNK] for i in range(0, len(body), CHUNK)]
+    sent = []
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        sent.append(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/", "query_string": b"",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    return Request(scope, receive), sent
+
+
+@pytest.fixture
+def spooled(monkeypatch):
+    """Every UploadFile the parser creates."""
+    files = []
+    original = main_api._UploadParser.on_headers_finished
+
+    def record(self):
+        original(self)
+        if self._current_part.file is not None:
+            files.append(self._current_part.file)
+
+    monkeypatch.setattr(main_api._UploadParser, "on_headers_finished", record)
+    return files
+
+
+def receive(request, limit=10 * 1024 * 1024, sniff=None):
+    return asyncio.run(main_api._receive_form(request, limit, max_files=1, sniff=sniff))
+
+
+def test_disguised_file_is_rejected_at_its_first_chunk(spooled):
+    body = multipart("cv.pdf", b"MZ" + b"\x90" * (4 * 1024 * 1024))
+    request, sent = streaming_request(body)
+
+    with pytest.raises(parser_service.UploadRejected) as rejected:
+        receive(request, sniff=parser_service.sniff)
+
+    assert rejected.value.status_code == 415
+    assert len(sent) == 1  # the other ~63 chunks were never read
+    assert spooled and all(f.file.closed for f in spooled)
+
+
+def test_oversized_stream_closes_spooled_file(spooled):
+    body = multipart("cv.pdf", b"%PDF-1.7\n" + b"x" * (512 * 1024))
+    request, sent = streaming_request(body)
+
+    with pytest.raises(parser_service.UploadRejected) as rejected:
+        receive(request, limit=128 * 1024, sniff=parser_service.sniff)
+
+    assert rejected.value.status_code == 413
+    assert len(sent) < len(body) // CHUNK
+    assert spooled and all(f.file.closed for f in spooled)
+
+
+def test_valid_file_is_spooled_whole():
+    content = b"%PDF-1.7\n" + b"y" * (200 * 1024)
+    request, _ = streaming_request(multipart("cv.pdf", content))
+
+    form = receive(request, sniff=parser_service.sniff)
+
+    upload = form["file"]
+    upload.file.seek(0)
+    assert upload.file.read() == content
+    asyncio.run(form.close())
+
+
+def test_upload_endpoint_refuses_disguised_file(client, auth_headers):
+    response = client.post("/api/ai/upload-resume", headers=auth_headers,
+                           files={"file": ("cv.pdf", b"MZ\x90\x00 not a pdf")})
+    assert response.status_code == 415
+    assert response.json()["detail"] == "File is not a valid PDF"
+
+
+def test_upload_endpoint_extracts_text(client, auth_headers):
+    response = client.post("/api/ai/upload-resume", headers=auth_headers,
+                           files={"file": ("notes.txt", b"Jane Doe\nPython engineer")})
+    assert response.status_code == 200
+    assert response.json()["extracted_text"] == "Jane Doe\nPython engineer"
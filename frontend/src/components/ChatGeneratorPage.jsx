@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/useAuth';
-import api from '../services/api';
+import api, { streamChat, isSessionReset } from '../services/api';
 import './ChatGeneratorPage.css';
 
 const ChatGeneratorPage = () => {
@@ -13,6 +13,7 @@ const ChatGeneratorPage = () => {
   const [inputText, setInputText] = useState("");
   const [isTyping, setIsTyping] = useState(false);
   const [uploadedCVText, setUploadedCVText] = useState(""); // Store extracted CV text
+  const [sessionId, setSessionId] = useState(null); // Server-side chat session (history lives there)
 
   useEffect(() => {
     // Only greet if empty history
@@ -35,30 +36,56 @@ const ChatGeneratorPage = () => {
     setMessages(newHistory);
     setIsTyping(true);
 
-    try {
-        // Build API history - include CV context if available
-        let apiHistory = newHistory.slice(-10).map(m => ({
+    // Build API history (the turns before this message, which is sent on its own) - include CV context if available
+    const buildHistory = () => {
+        const apiHistory = messages.slice(-10).map(m => ({
             role: m.sender === 'user' ? 'user' : 'assistant',
             content: m.text
         }));
 
         // If CV was uploaded, prepend it to the conversation context
-        if (uploadedCVText) {
-            apiHistory = [
-                { role: 'system', content: `User has uploaded their CV. Extracted content:\n${uploadedCVText}` },
-                ...apiHistory
-            ];
-        }
+        return uploadedCVText
+            ? [{ role: 'system', content: `User has uploaded their CV. Extracted content:\n${uploadedCVText}` }, ...apiHistory]
+            : apiHistory;
+    };
 
-        const response = await api.post('/ai/chat', {
-            history: apiHistory,
-            message: txt
-        });
+    try {
+        // Stream the reply into a bot bubble as it is generated
+        let started = false;
+        let streamed = "";
+        // Once the server holds the session only the new message is sent
+        const send = (sid) => streamChat(
+            { history: sid ? [] : buildHistory(), message: txt, session_id: sid },
+            (chunk) => {
+                streamed += chunk;
+                const text = streamed;
+                const first = !started;
+                started = true;
+                setIsTyping(false);
+                setMessages(prev => first
+                    ? [...prev, { sender: 'bot', text }]
+                    : [...prev.slice(0, -1), { sender: 'bot', text }]);
+            },
+            () => setIsTyping(true)
+        );
 
-        setIsTyping(false);
-        const { reply, action, cv_data } = response.data;
+        let result;
+        try {
+            result = await send(sessionId);
+        } catch (err) {
+            if (!isSessionReset(err)) throw err;
+            // The server lost our session - rebuild it from the local history
+            setSessionId(null);
+            result = await send(null);
+        }
+        const { reply, action, cv_data, session_id } = result;
 
-        setMessages(prev => [...prev, { sender: 'bot', text: reply }]);
+        setIsTyping(false);
+        if (session_id) setSessionId(session_id);
+        // Replace the streamed text with the final (trimmed) reply
+        setMessages(prev => started
+            ? [...prev.slice(0, -1), { sender: 'bot', text: reply }]
+            : [...prev, { sender: 'bot', text: reply }]);
 
         if (action === 'generate') {
             const safeData = cv_data.data ? cv_data.data : cv_data;
@@ -96,7 +123,7 @@ const ChatGeneratorPage = () => {
         // Create a proper context message for the AI
         const contextMessage = `I just uploaded my CV. Please analyze it and tell me what you found. Here's the content:\n\n${extractedText.substring(0, 2000)}`;
         
-        // Build history with the uploaded CV context
+        // Build history with the uploaded CV context (not needed once the server has the session)
         const apiHistory = [
             ...messages.map(m => ({ 
                 role: m.sender === 'user' ? 'user' : 'assistant', 
@@ -106,13 +133,24 @@ const ChatGeneratorPage = () => {
         ];
         
         // Ask AI to analyze the uploaded CV
-        const chatRes = await api.post('/ai/chat', {
-            history: apiHistory,
-            message: contextMessage
+        const ask = (sid) => api.post('/ai/chat', {
+            history: sid ? [] : apiHistory,
+            message: contextMessage,
+            session_id: sid
         });
+        let chatRes;
+        try {
+            chatRes = await ask(sessionId);
+        } catch (err) {
+            if (!isSessionReset(err)) throw err;
+            // The server lost our session - rebuild it from the local history
+            setSessionId(null);
+            chatRes = await ask(null);
+        }
         
         setIsTyping(false);
-        const { reply, action, cv_data } = chatRes.data;
+        const { reply, action, cv_data, session_id } = chatRes.data;
+        if (session_id) setSessionId(session_id);
         
         setMessages(prev => [...prev, { sender: 'bot', text: reply }]);
         
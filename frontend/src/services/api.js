@@ -58,10 +58,79 @@ export const getProfile = async () => {
     return response.data;
 };
 
+// --- AI CHAT ---
+
+/**
+ * True when a chat call failed because the server no longer has the
+ * session (expired, evicted or restarted): resend the recent history
+ * without a session_id. Works for axios and streamChat errors.
+ */
+export const isSessionReset = (err) => {
+    const status = err?.response?.status ?? err?.status;
+    const detail = err?.response?.data?.detail ?? err?.detail;
+    return status === 409 && Boolean(detail?.session_reset);
+};
+
+/**
+ * Streams an /ai/chat reply over Server-Sent Events.
+ * @param {object} payload - { history, message, session_id }
+ * @param {function} onDelta - called with each chunk of reply text
+ * @returns {object} the final { reply, action, cv_data } payload
+ */
+export const streamChat = async (payload, onDelta, onStatus) => {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${API_URL}/ai/chat/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        body: JSON.stringify(payload),
+    });
+    if (!response.ok || !response.body) {
+        const err = new Error(`Chat stream failed (${response.status})`);
+        err.status = response.status;
+        err.detail = (await response.json().catch(() => null))?.detail;
+        throw err;
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+            let event = 'message';
+            let data = '';
+            frame.split('\n').forEach((line) => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (!data) continue;
+            const parsed = JSON.parse(data);
+            if (event === 'delta') onDelta?.(parsed.text);
+            else if (event === 'status') onStatus?.(parsed.phase);
+            else if (event === 'done') result = parsed;
+        }
+    }
+    if (!result) throw new Error('Chat stream ended early');
+    return result;
+};
+
 // --- TEMPLATE FUNCTIONS ---
 
 export const getTemplates = async () => {
-    const response = await api.get('/templates');
+    // Summary listing: id, name, category, is_premium (no html/css bodies)
+    const response = await api.get('/templates/summary');
     return response.data;
 };
 